@@ -0,0 +1,239 @@
+'''
+Simulate many games in lockstep with array operations
+
+Every game in the batch is at the same stage of the same hand, so each stage is a handful
+    of numpy operations over all the games instead of a Python loop per game:
+    * deal: one row of 13 cards per game, in the order Game pops them from the deck
+    * discard: HandScorer.score_batch scores the 15 possible hands of every game, over the
+        46 turn cards for the expected values
+    * pegging: each step every game lays the first card that fits or calls a go
+    * counting: one score_batch call per hand/hand/crib count
+
+The rules and their order are the same as Game, including the dealer laying and counting
+    first and the win check after every card laid and every count.
+
+Supported player types, both lay the first card that fits when pegging, like RandomPlayer:
+    * 'random': keeps the first 4 cards dealt, same as RandomPlayer
+    * 'best4cardhand': keeps the 4 cards that score the most without the turn card,
+        same as Best4CardHandPlayer except ties go to the first discard in dealt order
+    * 'bestexpectedvalue': keeps the hand with the highest expected points of the hand plus
+        (dealer) or minus (not dealer) the crib, same values as DiscardOptimizer and the same
+        choice as BestExpectedValuePlayer, up to rounding between equal discards
+'''
+import numpy as np
+from itertools import combinations
+
+from Cribbage.DiscardOptimizer import cribCompletions
+from Cribbage.HandScorer import getDefaultScorer
+
+_countValues = np.minimum(np.arange(52) % 13 + 1,10)
+_runPoints = np.array([0,0,0,3,4,5,6,7,8,9,10,11,12,13])
+_pairPoints = np.array([0,2,6,12,12])
+# cards kept and dropped for each discard, in the order of HandScorer._keptHands
+_dropIdxs = np.array(list(combinations(range(6),2)))
+_keepIdxs = np.array([[idx for idx in range(6) if idx not in drop] for drop in _dropIdxs])
+# the expected values score 15*46 hands per game, this many games at a time keeps the arrays small
+_expectedValueGames = 1024
+
+playerTypes = ('random','best4cardhand','bestexpectedvalue')
+
+class BatchSim:
+    '''
+    Plays a batch of games at once between 2 player types
+    '''
+
+    def __init__(self, player1Type='random', player2Type='random', scorer=None):
+        '''
+        player<1,2>Type: one of playerTypes
+        scorer: HandScorer, None uses the scorer shared by the process
+        '''
+        self.playerTypes = []
+        for playerType in (player1Type,player2Type):
+            if playerType.lower() not in playerTypes:
+                raise ValueError("Invalid player type {}, options are {}".format(playerType,playerTypes))
+            self.playerTypes.append(playerType.lower())
+        self.scorer = scorer if scorer is not None else getDefaultScorer()
+        self.handsPlayed = 0
+
+    def playGames(self, games, seed=None):
+        '''
+        Play games to 121
+        games: int, number of games in the batch
+        seed: int or None, seed for dealing, the deals are not the same as Game with the same seed
+        Returns np.array (games,2) of the final scores of player1 and player2
+        '''
+        rng = np.random.default_rng(seed)
+        scores = np.zeros((games,2),dtype=np.int64)
+        done = np.zeros(games,dtype=bool)
+        player1Dealer = False
+        while not done.all():
+            player1Dealer = not player1Dealer # player1 deals first, same as Game
+            active = np.flatnonzero(~done)
+            decks = rng.permuted(np.broadcast_to(np.arange(52),(active.shape[0],52)),axis=1)
+            activeScores = scores[active]
+            done[active] = self.playHand(decks[:,:13],player1Dealer,activeScores)
+            scores[active] = activeScores
+        return scores
+
+    def _discard(self, playerType, dealt, isDealer=False):
+        '''
+        Choose the hands to keep
+        dealt: (G,6) cards in the order they were dealt
+        isDealer: bool, the player gets the crib
+        Returns (hands (G,4), cardsForCrib (G,2))
+        '''
+        if playerType == 'random':
+            return dealt[:,:4], dealt[:,4:]
+        keptHands = dealt[:,_keepIdxs] # (G,15,4)
+        if playerType == 'best4cardhand':
+            handScores = self.scorer.score_batch(keptHands.reshape(-1,4),np.full(keptHands.shape[0]*15,-1))
+            choice = handScores.reshape(-1,15).argmax(axis=1)
+        else:
+            choice = np.empty(dealt.shape[0],dtype=np.int64)
+            for start in range(0,dealt.shape[0],_expectedValueGames):
+                handValues, cribValues = self.expectedValues(dealt[start:start+_expectedValueGames])
+                totalValues = handValues + cribValues if isDealer else handValues - cribValues
+                choice[start:start+_expectedValueGames] = totalValues.argmax(axis=1)
+        return keptHands[np.arange(dealt.shape[0]),choice], dealt[np.arange(dealt.shape[0])[:,None],_dropIdxs[choice]]
+
+    def expectedValues(self, dealt):
+        '''
+        Expected hand and crib points of every discard of many deals, see DiscardOptimizer
+            * hand: score_batch of the 15 kept hands with each of the 46 turn cards
+            * crib: the counting of DiscardOptimizer._computeExpectedValues, with the rank scores of
+                every pair of discarded faces summed over the completions in one matrix product
+        dealt: (G,6) cards dealt
+        Returns (handValues (G,15), cribValues (G,15)) float64, in the order of combinations(range(6),2)
+        '''
+        scorer = self.scorer
+        if scorer.rankScores is None:
+            scorer.buildRankScoreTables()
+        dealt = np.asarray(dealt)
+        gameCount = dealt.shape[0]
+        games = np.arange(gameCount)[:,None]
+
+        unknown = np.ones((gameCount,52),dtype=bool)
+        unknown[games,dealt] = False
+        turnCards = np.nonzero(unknown)[1].reshape(gameCount,46)
+        hands = np.broadcast_to(dealt[:,_keepIdxs][:,:,None,:],(gameCount,15,46,4)).reshape(-1,4)
+        turns = np.broadcast_to(turnCards[:,None,:],(gameCount,15,46)).reshape(-1)
+        handValues = scorer.score_batch(hands,turns).reshape(gameCount,15,46).mean(axis=2,dtype=np.float64)
+
+        faceCounts = (turnCards[:,:,None] % 13 == np.arange(13)).sum(axis=1).astype(np.float64) # (G,13)
+        suiteCounts = (turnCards[:,:,None] // 13 == np.arange(4)).sum(axis=1) # (G,4)
+        # completions[g,a,b,c]: number of (unordered crib pair, turn) with faces a,b and turn c
+        same = np.eye(13)
+        completions = faceCounts[:,:,None,None] * (faceCounts[:,None,:,None] - same[None,:,:,None]) * \
+                        (faceCounts[:,None,None,:] - same[None,:,None,:] - same[None,None,:,:]) / 2
+        # pairTotals[g,13*f1+f2]: rank points of the crib over every completion when f1,f2 are discarded
+        pairTotals = completions.reshape(gameCount,-1) @ scorer.rankScores.reshape(169,-1).T.astype(np.float64)
+
+        drops = dealt[:,_dropIdxs] # (G,15,2)
+        dropFaces = drops % 13
+        dropSuites = drops // 13
+        totals = pairTotals[games,dropFaces[:,:,0]*13 + dropFaces[:,:,1]]
+
+        # flushes, both added cards of the suite of a suited discard
+        count = suiteCounts[games,dropSuites[:,:,0]]
+        pairs = count*(count-1)/2
+        totals += (dropSuites[:,:,0] == dropSuites[:,:,1])*(4*pairs*44 + pairs*(count-2))
+        # knobs from a discarded jack, any turn of its suite
+        totals += ((dropFaces == 10)*suiteCounts[games[:,:,None],dropSuites]*990).sum(axis=2)
+        # knobs from a jack the other player adds, the same for every discard
+        unknownKnobs = (unknown[:,10::13]*(suiteCounts - 1)*44).sum(axis=1)
+
+        return handValues, (totals + unknownKnobs[:,None])/cribCompletions
+
+    def playHand(self, dealt, player1Dealer, scores):
+        '''
+        Play one hand of every game
+        dealt: (G,13) cards in the order they are drawn, player1's 6, player2's 6, then the turn card
+        player1Dealer: bool, same for every game
+        scores: (G,2) int array of the scores, updated in place
+        Returns np.array (G,) bool, True for games that were won during the hand
+        '''
+        dealt = np.asarray(dealt)
+        gameCount = dealt.shape[0]
+        games = np.arange(gameCount)
+        dealer = 0 if player1Dealer else 1
+        won = np.zeros(gameCount,dtype=bool)
+
+        def checkWon(idxs):
+            # games already won are never scored again, so only idxs need checking
+            newlyWon = idxs[(scores[idxs] >= 121).any(axis=1)]
+            won[newlyWon] = True
+            return newlyWon
+
+        hands = np.empty((gameCount,2,4),dtype=np.int64)
+        cribCards = []
+        for playerIdx in (0,1):
+            hands[:,playerIdx], cardsForCrib = self._discard(self.playerTypes[playerIdx],dealt[:,6*playerIdx:6*playerIdx+6],
+                                                               playerIdx == dealer)
+            cribCards.append(cardsForCrib)
+        crib = np.concatenate(cribCards,axis=1)
+        turnCards = dealt[:,12]
+        self.handsPlayed += gameCount
+
+        # his heels
+        scores[:,dealer] += 2*(turnCards % 13 == 10)
+        checkWon(games)
+
+        # pegging, every game steps through the same turns, the dealer lays first
+        unplayed = np.ones((gameCount,2,4),dtype=bool)
+        count = np.zeros(gameCount,dtype=np.int64)
+        lastFace = np.zeros(gameCount,dtype=np.int64)
+        pairCount = np.zeros(gameCount,dtype=np.int64)
+        runLength = np.zeros(gameCount,dtype=np.int64)
+        lastWasGo = np.zeros(gameCount,dtype=bool)
+        inGo = np.zeros(gameCount,dtype=bool)
+        cardsLeft = np.full(gameCount,8)
+        pegging = ~won
+        turn = dealer
+        while pegging.any():
+            idxs = np.flatnonzero(pegging)
+            hand = hands[idxs,turn]
+            legal = unplayed[idxs,turn] & (count[idxs,None] + _countValues[hand] <= 31)
+            canLay = legal.any(axis=1)
+
+            # go: the first go of a go state scores for the other player, a second resets the table
+            goIdxs = idxs[~canLay]
+            bothGo = lastWasGo[goIdxs]
+            resetIdxs = goIdxs[bothGo]
+            count[resetIdxs] = lastFace[resetIdxs] = pairCount[resetIdxs] = runLength[resetIdxs] = 0
+            lastWasGo[resetIdxs] = inGo[resetIdxs] = False
+            goIdxs = goIdxs[~bothGo]
+            scores[goIdxs[~inGo[goIdxs]],1-turn] += 1
+            lastWasGo[goIdxs] = inGo[goIdxs] = True
+
+            # lay the first card that fits
+            layIdxs = idxs[canLay]
+            cardIdxs = legal[canLay].argmax(axis=1)
+            cards = hands[layIdxs,turn,cardIdxs]
+            unplayed[layIdxs,turn,cardIdxs] = False
+            lastWasGo[layIdxs] = False
+            faces = cards % 13 + 1
+            count[layIdxs] += _countValues[cards]
+            pairCount[layIdxs] = np.where(faces == lastFace[layIdxs],pairCount[layIdxs]+1,0)
+            runLength[layIdxs] = np.where(faces == lastFace[layIdxs]+1,runLength[layIdxs]+1,1)
+            lastFace[layIdxs] = faces
+            points = _pairPoints[pairCount[layIdxs]] + _runPoints[runLength[layIdxs]]
+            points += 2*((count[layIdxs] == 15) | (count[layIdxs] == 31))
+            is31 = layIdxs[count[layIdxs] == 31]
+            count[is31] = lastFace[is31] = pairCount[is31] = runLength[is31] = 0
+            scores[layIdxs,turn] += points
+            cardsLeft[layIdxs] -= 1
+            pegging[checkWon(layIdxs)] = False
+
+            # point for last
+            lastIdxs = layIdxs[(cardsLeft[layIdxs] == 0) & pegging[layIdxs]]
+            scores[lastIdxs,turn] += 1
+            pegging[lastIdxs] = False
+            turn = 1 - turn
+
+        # count the hands, dealer first then the crib
+        pone = 1 - dealer
+        for playerIdx, cardsToScore in ((dealer,hands[:,dealer]),(pone,hands[:,pone]),(dealer,crib)):
+            idxs = np.flatnonzero(~won)
+            scores[idxs,playerIdx] += self.scorer.score_batch(cardsToScore[idxs],turnCards[idxs])
+            checkWon(idxs)
+        return won
@@ -0,0 +1,349 @@
+'''
+Reproducible timing of the scorer, the players and whole games
+
+Every benchmark is a setup function that returns the work to time:
+    * setup is called before every trial and is not timed, it builds fresh players,
+        scorers and seeded decks so every trial does exactly the same work
+    * each benchmark runs warmup untimed trials, then the timed trials
+    * the garbage collector is off while a trial is timed, the same as timeit
+Results are plain dicts so they can be written to JSON and compared against a saved
+    baseline with compareResults. Benchmarks with a time limit per operation, such as the
+    game budgets in budgetBenchmarks, are checked with checkLimits, and benchmarks that must be
+    some times faster than another, such as SimEngine against Game, with checkSpeedups.
+    tools/benchmark.py runs the suite from the command line
+'''
+import gc
+import platform
+import random
+import statistics
+import sys
+import time
+import numpy as np
+
+from Cribbage.Deck import Deck
+from Cribbage.DiscardOptimizer import getDiscardOptimizer
+from Cribbage.Game import Game
+from Cribbage.HandScorer import HandScorer
+from Cribbage.PeggingState import PeggingState
+from Cribbage.PlayerRegistry import createPlayer, playerTypes, specName
+from Cribbage.SimEngine import SimEngine
+
+resultsVersion = 1
+
+class Benchmark:
+    '''
+    A named piece of work to time
+    '''
+
+    def __init__(self, name, setup, operations, limit=None):
+        '''
+        name: str, dotted name, the first part is the group (scorer, players, game, budget, sim)
+        setup: function with no arguments returning the function to time
+        operations: int, number of operations the timed function does, for the time per operation
+        limit: float or None, most seconds per operation the benchmark is allowed
+        '''
+        self.name = name
+        self.setup = setup
+        self.operations = operations
+        self.limit = limit
+
+def runBenchmark(benchmark, trials=5, warmup=1):
+    '''
+    Time a benchmark
+    Returns dict with the seconds of each trial and their min, median, mean and stdev
+        * perOperation is the median divided by the number of operations
+    '''
+    times = []
+    for trial in range(warmup + trials):
+        run = benchmark.setup()
+        gcEnabled = gc.isenabled()
+        gc.disable()
+        try:
+            startTime = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - startTime
+        finally:
+            if gcEnabled:
+                gc.enable()
+        if trial >= warmup:
+            times.append(elapsed)
+    median = statistics.median(times)
+    return {"operations":benchmark.operations,
+            "limit":benchmark.limit,
+            "trials":times,
+            "min":min(times),
+            "median":median,
+            "mean":statistics.fmean(times),
+            "stdev":statistics.stdev(times) if len(times) > 1 else 0.,
+            "perOperation":median/benchmark.operations}
+
+def runBenchmarks(benchmarks, trials=5, warmup=1, progress=None):
+    '''
+    Time every benchmark
+    progress: function or None, called as progress(name, result) after each benchmark
+    Returns dict with the machine details under "meta" and the results by name under "benchmarks"
+    '''
+    results = {"meta":{"version":resultsVersion,
+                        "python":sys.version.split()[0],
+                        "numpy":np.__version__,
+                        "platform":platform.platform(),
+                        "processor":platform.processor(),
+                        "time":time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        "trials":trials,
+                        "warmup":warmup},
+                "benchmarks":{}}
+    for benchmark in benchmarks:
+        result = runBenchmark(benchmark,trials=trials,warmup=warmup)
+        results["benchmarks"][benchmark.name] = result
+        if progress is not None:
+            progress(benchmark.name,result)
+    return results
+
+def compareResults(results, baseline, tolerance=0.1):
+    '''
+    Compare the median times of results against a baseline from runBenchmarks
+    tolerance: float, a median more than this fraction slower than the baseline is a regression
+    Returns list of (name, baselineMedian, median, ratio, status) sorted by name
+        * status is 'regression', 'improvement', 'ok', 'new' (not in the baseline)
+            or 'missing' (only in the baseline)
+        * medians are per operation, so runs with a different scale can still be compared
+    '''
+    current = results["benchmarks"]
+    previous = baseline["benchmarks"]
+    comparison = []
+    for name in sorted(set(current) | set(previous)):
+        if name not in previous:
+            comparison.append((name,None,current[name]["perOperation"],None,"new"))
+            continue
+        if name not in current:
+            comparison.append((name,previous[name]["perOperation"],None,None,"missing"))
+            continue
+        ratio = current[name]["perOperation"]/previous[name]["perOperation"]
+        if ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1/(1 + tolerance):
+            status = "improvement"
+        else:
+            status = "ok"
+        comparison.append((name,previous[name]["perOperation"],current[name]["perOperation"],ratio,status))
+    return comparison
+
+def checkLimits(results):
+    '''
+    Return list of (name, perOperation, limit) of the benchmarks slower than their limit, sorted by name
+    '''
+    return [(name,result["perOperation"],result["limit"])
+            for name, result in sorted(results["benchmarks"].items())
+            if result.get("limit") is not None and result["perOperation"] > result["limit"]]
+
+# (benchmark, reference benchmark, least times faster per operation than the reference)
+defaultSpeedups = [("sim.random.vs.random","game.random.vs.random",10.)]
+
+def checkSpeedups(results, speedups=None):
+    '''
+    Return list of (name, reference, speedup, required) of the benchmarks less than required times
+        faster than their reference, sorted by name
+    speedups: list of (name, reference, required), None uses defaultSpeedups
+        * pairs that are not both in results are skipped
+    '''
+    speedups = defaultSpeedups if speedups is None else speedups
+    current = results["benchmarks"]
+    slow = []
+    for name, reference, required in sorted(speedups):
+        if name not in current or reference not in current:
+            continue
+        speedup = current[reference]["perOperation"]/current[name]["perOperation"]
+        if speedup < required:
+            slow.append((name,reference,speedup,required))
+    return slow
+
+def _randomHands(seed, count, cards):
+    '''
+    Return count lists of cards distinct cardIds
+    '''
+    rng = random.Random(seed)
+    return [rng.sample(range(52),cards) for idx in range(count)]
+
+def _warmScorer():
+    '''
+    Return a scorer with the rank score tables built and empty memos
+    '''
+    scorer = HandScorer()
+    scorer.warmCaches()
+    return scorer
+
+def _clearMemos(scorer):
+    '''
+    Empty the per deal memos so a trial does not reuse the work of the trials before it
+    '''
+    scorer.canonicalHandScores.clear()
+    getDiscardOptimizer(scorer).cache.clear()
+
+def scorerBenchmarks(scale=1., seed=0):
+    '''
+    HandScorer.__call__ with new and warm scorers and each scorePossible* method
+    '''
+    handCount = max(int(2000*scale),1)
+    dealCount = max(int(50*scale),1)
+    hands = _randomHands(seed,handCount,5)
+    deals = _randomHands(seed,dealCount,6)
+    warmScorer = _warmScorer()
+
+    def scoreHands(scorer):
+        def run():
+            for cards in hands:
+                scorer(cards[:4],cards[4])
+        return run
+
+    def scorePossible(methodName):
+        def setup():
+            _clearMemos(warmScorer)
+            method = getattr(warmScorer,methodName)
+            def run():
+                for deal in deals:
+                    method(deal)
+            return run
+        return Benchmark("scorer.{}".format(methodName),setup,dealCount)
+
+    return [Benchmark("scorer.call.cold",lambda: scoreHands(HandScorer()),handCount),
+            Benchmark("scorer.call.warm",lambda: scoreHands(warmScorer),handCount),
+            scorePossible("scorePossible4CardHand"),
+            scorePossible("scorePossible5CardHand"),
+            scorePossible("scorePossibleCribHands")]
+
+def _dealHand(spec, seed, scorer):
+    '''
+    Deal a seeded hand to 2 new players of spec, the first player deals
+    Returns the 2 players
+    '''
+    deck = Deck(seed=seed)
+    players = [createPlayer(spec,name="Player1"),createPlayer(spec,name="Player2")]
+    cribCards = players[1].deal(deck,False,scorer)
+    players[0].deal(deck,True,scorer)
+    players[0].recieveCardsForCrib(cribCards)
+    return players
+
+def _pegHand(players):
+    '''
+    Peg a dealt hand the same way Game does, the first player deals and lays first
+    '''
+    peggingState = PeggingState()
+    turn = 1
+    cardsLeft = 8
+    while cardsLeft:
+        turn = 1 - turn
+        cardId = players[turn].playCard(peggingState.cardsPlayed,peggingState.cardTotal,
+                                        peggingState.cardsSinceReset,peggingState=peggingState)
+        if cardId is None:
+            peggingState.go()
+            continue
+        peggingState.play(cardId)
+        cardsLeft -= 1
+
+def playerBenchmarks(specs=None, scale=1., seed=0):
+    '''
+    deal and playCard of each player type
+        * deal: new players are dealt seeded hands, both as dealer and not
+        * playCard: seeded hands are dealt before the trial, then pegged with the player type in
+            both seats, so the time includes the table updates between plays
+    specs: list of player specs, None is every registered type
+    '''
+    specs = playerTypes() if specs is None else specs
+    handCount = max(int(20*scale),1)
+    seeds = [seed + idx for idx in range(handCount)]
+    scorer = _warmScorer()
+    benchmarks = []
+    for spec in specs:
+        def setupDeal(spec=spec):
+            _clearMemos(scorer)
+            decks = [Deck(seed=handSeed) for handSeed in seeds]
+            players = [createPlayer(spec,name="Player") for handSeed in seeds]
+            def run():
+                for idx, (player, deck) in enumerate(zip(players,decks)):
+                    player.deal(deck,idx % 2 == 0,scorer)
+            return run
+
+        def setupPlayCard(spec=spec):
+            _clearMemos(scorer)
+            hands = [_dealHand(spec,handSeed,scorer) for handSeed in seeds]
+            def run():
+                for players in hands:
+                    _pegHand(players)
+            return run
+
+        benchmarks.append(Benchmark("players.{}.deal".format(specName(spec)),setupDeal,handCount))
+        benchmarks.append(Benchmark("players.{}.playCard".format(specName(spec)),setupPlayCard,handCount))
+    return benchmarks
+
+defaultGameMatchups = [("random","random"),
+                        ("bestexpectedvalueandscorepegging","random"),
+                        ("bestexpectedvalueandsearchpegging","bestexpectedvalueandscorepegging")]
+
+def gameBenchmarks(matchups=None, scale=1., seed=0):
+    '''
+    Game.playGame for seeded games between pairs of player specs
+    matchups: list of (player1Spec, player2Spec), None uses defaultGameMatchups
+    '''
+    matchups = defaultGameMatchups if matchups is None else matchups
+    gameCount = max(int(10*scale),1)
+    scorer = _warmScorer()
+    benchmarks = []
+    for player1Type, player2Type in matchups:
+        def setup(player1Type=player1Type, player2Type=player2Type):
+            _clearMemos(scorer)
+            games = [Game(player1Type,player2Type,scorer=scorer,verbose=False,seed=seed+idx) for idx in range(gameCount)]
+            def run():
+                for game in games:
+                    game.playGame()
+            return run
+        name = "game.{}.vs.{}".format(specName(player1Type),specName(player2Type))
+        benchmarks.append(Benchmark(name,setup,gameCount))
+    return benchmarks
+
+# (player spec, most seconds per game when it plays itself)
+defaultGameBudgets = [("searchpegging",0.05),
+                        ("bestexpectedvalueandsearchpegging",0.05),
+                        ("winprobability",0.1)] # the search plus the win table for every discard
+
+def budgetBenchmarks(budgets=None, scale=1., seed=0):
+    '''
+    Game.playGame for seeded games of a player spec against itself, with a limit on the time per game
+    budgets: list of (player spec, seconds per game), None uses defaultGameBudgets
+    '''
+    budgets = defaultGameBudgets if budgets is None else budgets
+    gameCount = max(int(20*scale),1)
+    scorer = _warmScorer()
+    benchmarks = []
+    for spec, limit in budgets:
+        def setup(spec=spec):
+            _clearMemos(scorer)
+            games = [Game(spec,spec,scorer=scorer,verbose=False,seed=seed+idx) for idx in range(gameCount)]
+            def run():
+                for game in games:
+                    game.playGame()
+            return run
+        benchmarks.append(Benchmark("budget.{}".format(specName(spec)),setup,gameCount,limit=limit))
+    return benchmarks
+
+def simBenchmarks(scale=1., seed=0):
+    '''
+    SimEngine.playGame between the built in random players, the same players as game.random.vs.random
+        * the engine is seeded once and the deals carry on from game to game, the way it is used
+            to simulate many games
+    '''
+    gameCount = max(int(200*scale),1)
+    def setup():
+        engine = SimEngine(seed=seed)
+        def run():
+            for idx in range(gameCount):
+                engine.playGame()
+        return run
+    return [Benchmark("sim.random.vs.random",setup,gameCount)]
+
+def standardBenchmarks(scale=1., seed=0):
+    '''
+    The whole suite, scale multiplies the amount of work in every benchmark
+    '''
+    return scorerBenchmarks(scale,seed) + playerBenchmarks(scale=scale,seed=seed) + \
+        gameBenchmarks(scale=scale,seed=seed) + budgetBenchmarks(scale=scale,seed=seed) + \
+        simBenchmarks(scale=scale,seed=seed)
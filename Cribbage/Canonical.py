@@ -0,0 +1,96 @@
+'''
+Canonical forms of hands under suite relabeling
+
+Only flushes and knobs depend on suites, and they only depend on which cards share a suite,
+    not on which suite it is. So relabeling the suites of a hand does not change any score.
+    Every hand is mapped to a representative of its class by ordering the suites:
+    * Each suite gets a key made of the bitmask of face values it holds in each group of
+        cards (ex: the hand, then the turn card)
+    * Suites are sorted by their keys, largest first, and relabeled 0,1,2,3 in that order
+    * Suites with equal keys hold the same cards, so the order between them does not matter
+
+Class counts: the 20358520 6 card deals fall in to 962988 classes, and the 12994800
+    (4 card hand, turn card) pairs fall in to 652353 classes, ~20x fewer in both cases.
+'''
+
+from Cribbage.CardSet import suiteBits
+
+def canonicalSuiteMap(*cardGroups):
+    '''
+    Return the suite relabeling that puts the cards in canonical form
+    Inputs:
+        * cardGroups: one or more lists of cardIds, cards in different groups are never
+            swapped with each other (ex: a hand and its turn card)
+    Returns:
+        * list of 4 ints, suiteMap[suite] is the canonical suite
+    '''
+    keys = [[0]*len(cardGroups) for suite in range(4)]
+    for groupIdx, cards in enumerate(cardGroups):
+        for cardId in cards:
+            keys[cardId//13][groupIdx] |= 1 << (cardId%13)
+
+    suiteOrder = sorted(range(4),key=lambda suite: keys[suite],reverse=True)
+    suiteMap = [0]*4
+    for canonicalSuite, suite in enumerate(suiteOrder):
+        suiteMap[suite] = canonicalSuite
+    return suiteMap
+
+def relabelCards(cards,suiteMap):
+    '''
+    Apply a suite relabeling to a list of cardIds
+    '''
+    return [suiteMap[cardId//13]*13 + cardId%13 for cardId in cards]
+
+def inverseSuiteMap(suiteMap):
+    '''
+    Return the relabeling that undoes suiteMap
+    '''
+    inverse = [0]*4
+    for suite, canonicalSuite in enumerate(suiteMap):
+        inverse[canonicalSuite] = suite
+    return inverse
+
+def canonicalHand(cards):
+    '''
+    Return the canonical form of a set of cards (hand, crib or deal) as a sorted tuple
+    '''
+    return tuple(sorted(relabelCards(cards,canonicalSuiteMap(cards))))
+
+def canonicalHandAndTurn(cardsInHand,turnCard):
+    '''
+    Return the canonical form of a hand and turn card as (sorted tuple of the hand, turn card)
+    '''
+    suiteMap = canonicalSuiteMap(cardsInHand,[turnCard])
+    return tuple(sorted(relabelCards(cardsInHand,suiteMap))), suiteMap[turnCard//13]*13 + turnCard%13
+
+def canonicalDeal(cards):
+    '''
+    Return the canonical form of a dealt hand along with how to map back to it
+    Returns:
+        * tuple of the canonical cardIds, sorted
+        * suiteMap: list of 4 ints, the relabeling from the dealt cards to the canonical cards
+    '''
+    suiteMap = canonicalSuiteMap(cards)
+    return tuple(sorted(relabelCards(cards,suiteMap))), suiteMap
+
+def isCanonical(cards):
+    '''
+    Return True if the suites of the cards are already in canonical order
+    '''
+    masks = [0]*4
+    for cardId in cards:
+        masks[cardId//13] |= 1 << (cardId%13)
+    return all(masks[suite] >= masks[suite+1] for suite in range(3))
+
+def canonicalPositions(cards):
+    '''
+    Return the canonical form of a dealt hand and where each dealt card ends up in it
+    Returns:
+        * tuple of the canonical cardIds, sorted
+        * suiteMap: list of 4 ints, the relabeling from the dealt cards to the canonical cards
+        * positions: list, positions[idx] is the index in the canonical tuple of cards[idx]
+    '''
+    suiteMap = canonicalSuiteMap(cards)
+    relabeled = relabelCards(cards,suiteMap)
+    canonical = tuple(sorted(relabeled))
+    return canonical, suiteMap, [canonical.index(cardId) for cardId in relabeled]
@@ -0,0 +1,103 @@
+# Bits of every card in the deck, and of every card of each face value
+fullDeckBits = (1 << 52) - 1
+suiteBits = (1 << 13) - 1
+faceValueBits = [sum(1 << (faceIdx + suite*13) for suite in range(4)) for faceIdx in range(13)]
+
+class CardSet:
+    '''
+    A set of cards stored as a 52 bit int, bit cardId is set when the card is in the set
+        * Membership, add and remove are a single bit operation, no list scans or copies
+        * Iterating returns the cardIds in increasing order
+        * Suite and face value histograms are computed with bit counts
+    '''
+    __slots__ = ("bits",)
+
+    def __init__(self,cardIds=()):
+        '''
+        cardIds: iterable of cardIds in the set
+        '''
+        bits = 0
+        for cardId in cardIds:
+            bits |= 1 << cardId
+        self.bits = bits
+
+    @classmethod
+    def fromBits(cls,bits):
+        '''
+        Create a set from its int representation
+        '''
+        cardSet = cls()
+        cardSet.bits = bits
+        return cardSet
+
+    def add(self,cardId):
+        self.bits |= 1 << cardId
+
+    def remove(self,cardId):
+        '''
+        Remove a card, raises KeyError if it is not in the set
+        '''
+        if not (self.bits >> cardId) & 1:
+            raise KeyError(cardId)
+        self.bits ^= 1 << cardId
+
+    def discard(self,cardId):
+        self.bits &= ~(1 << cardId)
+
+    def complement(self):
+        '''
+        Return the set of cards in the deck that are not in this set
+        '''
+        return CardSet.fromBits(fullDeckBits & ~self.bits)
+
+    def copy(self):
+        return CardSet.fromBits(self.bits)
+
+    def __contains__(self,cardId):
+        return bool((self.bits >> cardId) & 1)
+
+    def __len__(self):
+        return bin(self.bits).count("1")
+
+    def __iter__(self):
+        bits = self.bits
+        while bits:
+            lowestBit = bits & -bits
+            yield lowestBit.bit_length() - 1
+            bits ^= lowestBit
+
+    def __eq__(self,other):
+        return isinstance(other,CardSet) and (self.bits == other.bits)
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __or__(self,other):
+        return CardSet.fromBits(self.bits | other.bits)
+
+    def __and__(self,other):
+        return CardSet.fromBits(self.bits & other.bits)
+
+    def __sub__(self,other):
+        return CardSet.fromBits(self.bits & ~other.bits)
+
+    def __repr__(self):
+        return "CardSet({})".format(list(self))
+
+    def cards(self):
+        '''
+        Return a sorted list of the cardIds in the set
+        '''
+        return list(self)
+
+    def suiteHistogram(self):
+        '''
+        Return a list of the number of cards of each suite
+        '''
+        return [bin((self.bits >> (suite*13)) & suiteBits).count("1") for suite in range(4)]
+
+    def faceValueHistogram(self):
+        '''
+        Return a list of the number of cards of each face value, index 0 is aces
+        '''
+        return [bin(self.bits & bits).count("1") for bits in faceValueBits]
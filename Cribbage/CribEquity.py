@@ -0,0 +1,84 @@
+from Cribbage.cribbage import cardIdToFaceValue, cardIdToSuite
+from Cribbage.CardSet import CardSet
+
+from itertools import combinations
+import os
+import numpy as np
+
+# Table shipped with the package, rebuild with tools/buildCribEquityTable.py
+cribEquityPath = os.path.join(os.path.dirname(os.path.abspath(__file__)),"data","cribEquity.npy")
+
+_cribEquityTable = None
+
+def buildCribEquityTable(scorer):
+    '''
+    Compute the expected points in the crib for every 2 card discard
+        * The other 2 crib cards and the turn card are drawn from the 50 unknown cards,
+            every combination is scored so the expectation is exact for that model
+        * Only the ranks of the discards and if they are the same suite matter,
+            so one representative discard is scored per (rank, rank, suited)
+    Inputs:
+        * scorer: HandScorer instance, used for score_batch
+    Returns:
+        * np.array float32 of shape (2,13,13,2) indexed by [isDealer, faceValue1-1, faceValue2-1, suited]
+            * isDealer = 1: points the player gets from their own crib (positive)
+            * isDealer = 0: points given to the other players crib (negative)
+            * suited = 1 is NaN for pairs, they can never be the same suite
+    '''
+    expected = np.full((13,13,2),np.NaN,dtype=np.float32)
+    for face1 in range(13):
+        for face2 in range(face1,13):
+            for suited in [0,1]:
+                if suited and (face1 == face2):
+                    continue
+                discard = [face1, face2 + (0 if suited else 13)] # hearts for card 1, hearts or diamonds for card 2
+                unknownCards = CardSet(discard).complement().cards()
+
+                cribs = []
+                turns = []
+                for cribCard1, cribCard2 in combinations(unknownCards,2):
+                    for turnCard in unknownCards:
+                        if (turnCard == cribCard1) or (turnCard == cribCard2):
+                            continue
+                        cribs.append(discard + [cribCard1,cribCard2])
+                        turns.append(turnCard)
+
+                scores = scorer.score_batch(np.array(cribs),np.array(turns))
+                expected[face1,face2,suited] = scores.mean()
+                expected[face2,face1,suited] = expected[face1,face2,suited]
+
+    return np.stack([-expected,expected])
+
+def loadCribEquityTable(path=cribEquityPath):
+    '''
+    Load a table saved from buildCribEquityTable
+    '''
+    table = np.load(path)
+    if table.shape != (2,13,13,2):
+        raise ValueError("Crib equity table in {} has shape {}, expected (2,13,13,2)".format(path,table.shape))
+    return table
+
+def getCribEquityTable():
+    '''
+    Return the shipped crib equity table, it is loaded once per process
+    '''
+    global _cribEquityTable
+    if _cribEquityTable is None:
+        _cribEquityTable = loadCribEquityTable()
+    return _cribEquityTable
+
+def cribEquity(cardsForCrib,isDealer,table=None):
+    '''
+    Look up the expected crib points for putting 2 cards in the crib
+    Inputs:
+        * cardsForCrib: list of the 2 cardIds to discard
+        * isDealer: bool, if the player owns the crib
+        * table: crib equity table, defaults to the shipped table
+    Returns:
+        * float, positive when the points go to the player, negative when they go to the opponent
+    '''
+    if table is None:
+        table = getCribEquityTable()
+    card1, card2 = cardsForCrib
+    suited = int(cardIdToSuite[card1] == cardIdToSuite[card2])
+    return float(table[int(isDealer),cardIdToFaceValue[card1]-1,cardIdToFaceValue[card2]-1,suited])
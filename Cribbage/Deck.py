@@ -1,6 +1,22 @@
 import random
+import hashlib
 from Cribbage.cribbage import cardIdToSuite,cardIdToFaceValue,cardIdToCountValue
 
+def spawnSeeds(seed,count):
+    '''
+    Split a seed into count independent child seeds
+        * Each child is the first 8 bytes of sha256("<seed>:<index>"), so the streams do not
+            overlap and a child only depends on the parent seed and its index
+        * Children can be split again to get seeds for nested parallel runs
+        * Reusing the same seeds for 2 different strategies gives them identical deals,
+            (common random numbers) which reduces the games needed to tell them apart
+    '''
+    seeds = []
+    for index in range(count):
+        digest = hashlib.sha256("{}:{}".format(seed,index).encode()).digest()
+        seeds.append(int.from_bytes(digest[:8],"little"))
+    return seeds
+
 class Deck:
     '''
     Define a deck of cards, return hands, pull individual cards
@@ -16,10 +32,14 @@ class Deck:
         * countValue = min(faceValue,10)
     '''
 
-    def __init__(self):
+    def __init__(self,seed=None,rng=None):
         '''
         Create a deck of cards in a random order
+        seed: int or None, seed for the decks random number generator
+        rng: random.Random or None, generator to shuffle with, takes priority over seed
+            * With neither, the deck gets its own randomly seeded generator
         '''
+        self.rng = rng if rng is not None else random.Random(seed)
         self.shuffle()
 
     def shuffle(self):
@@ -27,7 +47,7 @@ class Deck:
         shuffle the cards
         '''
         self.cards = list(range(52))
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
     
     def getCards(self,count):
         '''
@@ -0,0 +1,136 @@
+from Cribbage.HandScorer import getDefaultScorer, discardIndex
+from Cribbage.Canonical import canonicalPositions
+from Cribbage.CardSet import CardSet
+from Cribbage.cribbage import cardIdToFaceValue, cardIdToSuite
+
+from itertools import combinations
+import weakref
+import numpy as np
+
+# Each discard has 46 turn cards, then 45 choose 2 pairs of cards the other player adds to the crib
+cribCompletions = 46*990
+
+_optimizers = weakref.WeakKeyDictionary()
+
+def getDiscardOptimizer(scorer=None):
+    '''
+    Return the DiscardOptimizer for a scorer, one is made per scorer so the memo is shared
+        by every player using the same scorer
+    '''
+    if scorer is None:
+        scorer = getDefaultScorer()
+    if scorer not in _optimizers:
+        _optimizers[scorer] = DiscardOptimizer(scorer)
+    return _optimizers[scorer]
+
+class DiscardOptimizer:
+    '''
+    Computes the exact expected points of each of the 15 discards from a 6 card deal
+        * Hand: mean score of the kept hand over the 46 possible turn cards
+        * Crib: mean score of the crib over the 46 turn cards and the 990 pairs of cards the
+            other player could add from the remaining 45 unknown cards. The other players
+            discards are treated as random unknown cards
+    The crib expectation is not enumerated, it is computed from counts of the unknown cards:
+        * 15s, pairs and straights only depend on face values, so the sum over every completion
+            is the rankScores table dotted with the number of completions of each face values
+        * Flushes and knobs are counted from the number of unknown cards of each suite
+    Results are memoized on the suite isomorphic class of the deal
+    '''
+
+    def __init__(self,scorer=None,cacheSize=50000):
+        '''
+        scorer: HandScorer, defaults to the shared scorer
+        cacheSize: int, the memo is cleared when it reaches this many deals
+        '''
+        self.scorer = scorer if scorer is not None else getDefaultScorer()
+        self.cacheSize = cacheSize
+        self.cache = {}
+
+    def expectedValues(self,hand):
+        '''
+        Return the expected hand and crib points of every discard
+        Inputs:
+            * hand: list of the 6 cardIds dealt
+        Returns:
+            * handValues: np.array float64 (15,) expected points in the kept hand
+            * cribValues: np.array float64 (15,) expected points in the crib
+            * both are in the order of discardIndex / combinations(range(6),2)
+        '''
+        canonical, suiteMap, positions = canonicalPositions(hand)
+        values = self.cache.get(canonical)
+        if values is None:
+            values = self._computeExpectedValues(list(canonical))
+            if len(self.cache) >= self.cacheSize:
+                self.cache.clear()
+            self.cache[canonical] = values
+
+        rows = np.array([discardIndex[min(positions[ii],positions[jj])][max(positions[ii],positions[jj])]
+                            for ii, jj in combinations(range(6),2)])
+        return values[0][rows], values[1][rows]
+
+    def _computeExpectedValues(self,hand):
+        '''
+        Compute the expected hand and crib points for the discards of hand, see expectedValues
+        '''
+        scorer = self.scorer
+        if scorer.rankScores is None:
+            scorer.buildRankScoreTables()
+
+        scores, turnCards = scorer.possibleHandScores(hand)
+        handValues = scores.mean(axis=1,dtype=np.float64)
+
+        unknownCards = CardSet(hand).complement()
+        faceCounts = np.array(unknownCards.faceValueHistogram(),dtype=np.float64)
+        suiteCounts = unknownCards.suiteHistogram()
+
+        # completions[a,b,c] is the number of (unordered crib pair, turn) with face values a,b
+        #   for the crib cards and c for the turn, faces are 0 indexed
+        same = np.eye(13)
+        completions = faceCounts[:,None,None] * (faceCounts[None,:,None] - same[:,:,None]) * \
+                        (faceCounts[None,None,:] - same[:,None,:] - same[None,:,:]) / 2
+
+        # knobs from a jack the other player adds, the same for every discard
+        unknownKnobs = 0
+        for suite in range(4):
+            if (10 + suite*13) in unknownCards:
+                unknownKnobs += (suiteCounts[suite]-1)*44 # turn of the same suite, any other crib card
+
+        cribValues = np.empty(15,dtype=np.float64)
+        for idx, (ii,jj) in enumerate(combinations(range(6),2)):
+            card1, card2 = hand[ii], hand[jj]
+            total = (scorer.rankScores[cardIdToFaceValue[card1]-1,cardIdToFaceValue[card2]-1]*completions).sum()
+
+            if cardIdToSuite[card1] == cardIdToSuite[card2]:
+                count = suiteCounts[cardIdToSuite[card1]]
+                pairs = count*(count-1)/2 # both added cards of the suite
+                total += 4*pairs*44 + pairs*(count-2)
+
+            for cardId in [card1,card2]:
+                if cardIdToFaceValue[cardId] == 11: # jack in the discard, any turn of its suite
+                    total += suiteCounts[cardIdToSuite[cardId]]*990
+
+            cribValues[idx] = (total + unknownKnobs)/cribCompletions
+
+        return handValues, cribValues
+
+    def scorePossibleDiscards(self,hand,isDealer):
+        '''
+        Return the expected points of every discard in the (5,6) layout of the HandScorer
+            scorePossible methods, the crib points are added for the dealer and subtracted otherwise
+        Returns dict:
+            * dropForBestHand: [idx1, idx2, expected points] of the best discard
+            * handValues, cribValues, totalValues: (5,6) masked arrays
+        '''
+        handValues, cribValues = self.expectedValues(hand)
+        totalValues = handValues + cribValues if isDealer else handValues - cribValues
+
+        dropIdxs1, dropIdxs2 = np.triu_indices(6,k=1)
+        maps = np.full((3,5,6),np.NaN) # cannot have option 5,5 so just ignore it all together.
+        maps[:,dropIdxs1,dropIdxs2] = [handValues,cribValues,totalValues]
+        maps = np.ma.masked_invalid(maps)
+
+        best = int(np.argmax(totalValues))
+        return {"dropForBestHand":[dropIdxs1[best],dropIdxs2[best],totalValues[best]],
+                "handValues":maps[0],
+                "cribValues":maps[1],
+                "totalValues":maps[2]}
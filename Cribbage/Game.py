@@ -1,77 +1,71 @@
 
 import sys
+import time
 
-from Cribbage import HandScorer, Deck
+from Cribbage import Deck
+from Cribbage.HandScorer import getDefaultScorer
 from Cribbage.Exceptions import EndOfGameException
-from Cribbage.Players import RandomPlayer, Best4CardHandPlayer,BestMinimalScorePlayer, BestHandAndCribPlayer, ScorePeggingPlayer, BestHandAndCribAndScorePeggingPlayer, BestMinimalHandAndScorePeggingPlayer
+from Cribbage.PeggingState import PeggingState
+from Cribbage.PlayerRegistry import createPlayer
 from Cribbage.cribbage import cardIdToCountValue,cardIdToFaceValue, cardIdToSuiteName
 
+def _peggingStateAttribute(name):
+    '''
+    Property that reads and writes an attribute of self.peggingState
+    Keeps the table attributes Game has always had
+    '''
+    return property(lambda self: getattr(self.peggingState,name),
+                    lambda self, value: setattr(self.peggingState,name,value))
+
 class Game:
     '''
     Defines an entire game of cribbage
     '''
+    cardsPlayed = _peggingStateAttribute('cardsPlayed')
+    cardsSinceReset = _peggingStateAttribute('cardsSinceReset')
+    cardTotal = _peggingStateAttribute('cardTotal')
+    go_lastPlayWasGo = _peggingStateAttribute('lastPlayWasGo')
+    go_inGoState = _peggingStateAttribute('inGoState')
+
     def __init__(self,player1Type,
                         player2Type,
                         player1Name="Player1",
                         player2Name="Player2",
                         scorer=None,
-                        verbose=True):
+                        verbose=True,
+                        seed=None,
+                        rng=None,
+                        recorder=None,
+                        stats=None):
         '''
-        player<1,2>Type is the type of player, options are:
-            * 'random'
-            * 'HighestAverageHandPlayer'
+        player<1,2>Type is a player spec, the name of a registered player type or a dict
+            with the name under 'type' and constructor parameters, see PlayerRegistry
         scorer: Instance of a Scorer class. Can pass in one so the cache is primed
+            * None uses the scorer shared by the process
+        seed: int or None, seed for shuffling the deck. Games with the same seed are dealt
+            the same cards every hand, no matter what the players do
+        rng: random.Random or None, generator for shuffling the deck, takes priority over seed
+        recorder: GameLogWriter or None, every hand is written to it, including a hand the game ends in
+        stats: Stats or None, times the phases of every hand, see _playHand
+            * pass the same Stats to the scorer to collect its cache and scoring stats too
         '''
-        if player1Type.lower() == "random":
-            self.player1 = RandomPlayer(name=player1Name)
-        elif player1Type.lower() == 'bestminimalscore':
-            self.player1 = BestMinimalScorePlayer(name=player1Name)
-        elif player1Type.lower() == 'best4cardhand':
-            self.player1 = Best4CardHandPlayer(name=player1Name)
-        elif player1Type.lower() == 'besthandandcrib':
-            self.player1 = BestHandAndCribPlayer(name=player1Name)
-        elif player1Type.lower() == 'scorepegging':
-            self.player1 = ScorePeggingPlayer(name=player1Name)
-        elif player1Type.lower() == 'besthandandcribandscorepegging':
-            self.player1 = BestHandAndCribAndScorePeggingPlayer(name=player1Name)
-        elif player1Type.lower() == 'bestminimalhandandscorepegging':
-            self.player1 = BestMinimalHandAndScorePeggingPlayer(name=player1Name)
-        else:
-            raise ValueError("Invalid player type {} for player1".format(player1Type))
-        
-        if player2Type.lower() == "random":
-            self.player2 = RandomPlayer(name=player2Name)
-        elif player2Type.lower() == 'bestminimalscore':
-            self.player2 = BestMinimalScorePlayer(name=player2Name)
-        elif player2Type.lower() == 'best4cardhand':
-            self.player2 = Best4CardHandPlayer(name=player2Name)
-        elif player2Type.lower() == 'besthandandcrib':
-            self.player2 = BestHandAndCribPlayer(name=player2Name)
-        elif player2Type.lower() == 'scorepegging':
-            self.player2 = ScorePeggingPlayer(name=player2Name)
-        elif player2Type.lower() == 'besthandandcribandscorepegging':
-            self.player2 = BestHandAndCribAndScorePeggingPlayer(name=player2Name)
-        elif player2Type.lower() == 'bestminimalhandandscorepegging':
-            self.player2 = BestMinimalHandAndScorePeggingPlayer(name=player2Name)
-        else:
-            raise ValueError("Invalid player type {} for player2".format(player2Type))
-
-        if type(scorer) is HandScorer:
-            self.handScorer = scorer
-        elif type(scorer) is str: 
-            # check the testing case, prevents from allocating/deallocating 100's of MB of RAM
-            #   when running tests
-            # As of 20200608, using this takes test time from 2.5s to 1.7s
-            if scorer.lower() == "do-not-create":
-                self.handScorer = None
-            else:
-                self.handScorer = HandScorer()
-        else:
-            self.handScorer = HandScorer()
+        self.player1 = createPlayer(player1Type,name=player1Name)
+        self.player2 = createPlayer(player2Type,name=player2Name)
+
+        self.handScorer = scorer if scorer is not None else getDefaultScorer()
 
         self.verbose = verbose
 
-        self.deck = Deck.Deck()
+        self.peggingState = PeggingState()
+
+        self.recorder = recorder
+        self.gameId = recorder.newGame() if recorder is not None else None
+        self.handNumber = 0
+        self._phaseScores = []
+
+        self.stats = stats
+
+        self.deck = Deck.Deck(seed=seed,rng=rng)
 
         self.player1Score = 0
         self.player2Score = 0
@@ -109,24 +103,62 @@ class Game:
     def playHand(self):
         '''
         Play through a single hand
+        When there is a recorder the hand is recorded even if the game ends part way through it
         ''' 
         self._resetHands()
         self.player1Dealer = not self.player1Dealer
-        
+        self.handNumber += 1
+
+        if self.recorder is None:
+            self._playHand()
+            return
+        startScores = (self.player1Score,self.player2Score)
+        try:
+            self._playHand()
+        finally:
+            self.recorder.recordHand(self,startScores,self._phaseScores)
+
+    def _playHand(self):
+        '''
+        Deal, peg and count a hand
+        The scores at the end of each phase but the last are kept in self._phaseScores for the recorder
+        When there is a stats object the time of each phase is added to it
+            * game.deal, includes game.discard which is the time the players take to choose their discards
+            * game.pegging, includes game.playCard which is the time the players take to choose their cards
+            * game.counting
+            * the phase the game is won in is not timed
+        '''
+        stats = self.stats
+        if stats is not None:
+            startTime = time.perf_counter()
+        self.player1.updateScores(self.player1Score,self.player2Score)
+        self.player2.updateScores(self.player2Score,self.player1Score)
         self._deal()
+        self._phaseScores.append((self.player1Score,self.player2Score))
+        if stats is not None:
+            peggingStartTime = time.perf_counter()
+            stats.addTime("game.deal",peggingStartTime-startTime)
         #print("player1 hand: {}".format(self.player1.hand))
         #print("player2 hand: {}".format(self.player2.hand))
 
         while len(self.cardsPlayed) < 8 and not self.gameOver:
             self.player1Turn = not self.player1Turn # invert so the next player goes
+            if stats is not None:
+                startTime = time.perf_counter()
             if self.player1Turn:
+                self.player1.updateScores(self.player1Score,self.player2Score)
                 cardPlayed = self.player1.playCard(self.cardsPlayed,
                                                 self.cardTotal,
-                                                self.cardsSinceReset)
+                                                self.cardsSinceReset,
+                                                peggingState=self.peggingState)
             else:
+                self.player2.updateScores(self.player2Score,self.player1Score)
                 cardPlayed = self.player2.playCard(self.cardsPlayed,
                                                 self.cardTotal,
-                                                self.cardsSinceReset)
+                                                self.cardsSinceReset,
+                                                peggingState=self.peggingState)
+            if stats is not None:
+                stats.addTime("game.playCard",time.perf_counter()-startTime)
             # run the checks for scoring and reseting the game stated based on a go
             # Then if None card was played, go to the next iterations
             self._checkGo(cardPlayed)
@@ -138,11 +170,7 @@ class Game:
                     "when player {} laid card {}".format(self.player1.name if self.player1Turn else self.player2.name,cardPlayed)+\
                     "which brought total from {} to {}".format(self.cardTotal,self.cardTotal+cardIdToCountValue[cardPlayed]))
 
-            self.cardsPlayed.append(cardPlayed)
-            self.cardTotal += cardIdToCountValue[cardPlayed]
-            self.cardsSinceReset += 1
-
-            score = self._scorePegging()
+            score = self.peggingState.play(cardPlayed)
             self.player1Score += score if self.player1Turn else 0
             self.player2Score += score if not self.player1Turn else 0
             self._checkGameOver()
@@ -150,6 +178,10 @@ class Game:
         # point for last
         self.player1Score += 1 if self.player1Turn else 0
         self.player2Score += 1 if not self.player1Turn else 0
+        self._phaseScores.append((self.player1Score,self.player2Score))
+        if stats is not None:
+            countingStartTime = time.perf_counter()
+            stats.addTime("game.pegging",countingStartTime-peggingStartTime)
 
         # Count the hands
         # Dealer always counts first
@@ -158,25 +190,31 @@ class Game:
             #player1StartingScore = self.player1Score # debugging use only
             self.player1Score += self.handScorer(self.player1.hand, self.turnCard)
             self._checkGameOver()
+            self._phaseScores.append((self.player1Score,self.player2Score))
             self.player2Score += self.handScorer(self.player2.hand, self.turnCard)
             self._checkGameOver()
+            self._phaseScores.append((self.player1Score,self.player2Score))
             self.player1Score += self.handScorer(self.player1.crib, self.turnCard)
             self._checkGameOver()
         else:
             #player1StartingScore = self.player1Score #debugging use only
             self.player2Score += self.handScorer(self.player2.hand, self.turnCard)
             self._checkGameOver()
+            self._phaseScores.append((self.player1Score,self.player2Score))
             self.player1Score += self.handScorer(self.player1.hand, self.turnCard)
             self._checkGameOver()
+            self._phaseScores.append((self.player1Score,self.player2Score))
             self.player2Score += self.handScorer(self.player2.crib, self.turnCard)
             self._checkGameOver()
+        if stats is not None:
+            stats.addTime("game.counting",time.perf_counter()-countingStartTime)
 
         '''
         # Useful for debugging players
         scored = self.player1Score-player1StartingScore
         print("\tPlayer 1 expected {} scored {}".format(self.player1.predictedScore,scored))
         if self.player1.predictedScore > scored:
-            print("Original hand: {}\n\tcardIds: {}".format(printCards(self.player1.originalDealtHand),self.player1.originalDealtHand))
+            print("Original hand: {}\n\tcardIds: {}".format(printCards(self.player1.dealtCards),self.player1.dealtCards))
             print("Hand Ids: {} Turn Id: {}".format(self.player1.hand,self.turnCard))
             
             print("Scorer output from when hand was chosen")
@@ -194,11 +232,10 @@ class Game:
         self.player1.resetHands()
         self.player2.resetHands()
 
-        self.cardsPlayed = [] # cardIds of all the cards shown, in order of play
-        self.cardsSinceReset = 0 # the number of cards since 31 or since game reset from a 'go'
-        self.cardTotal = 0 # current total of the cards
-        self.go_lastPlayWasGo = False # flag for checking of rest by 'gos'
-        self.go_inGoState = False # flag for checking if the game is in a state of 'go'
+        # cardsPlayed, cardsSinceReset, cardTotal and the go flags are kept in the pegging state
+        self.peggingState.reset()
+        self._phaseScores = []
+        self.poneDiscards = None # cards the player that is not the dealer put in the crib
        
     def _checkGameOver(self):
         '''
@@ -224,9 +261,14 @@ class Game:
 
         Sets the turn card value
         '''
+        if self.stats is not None:
+            startTime = time.perf_counter()
         player1Crib = self.player1.deal(self.deck,self.player1Dealer,self.handScorer)
         player2Crib = self.player2.deal(self.deck,not self.player1Dealer,self.handScorer)
+        if self.stats is not None:
+            self.stats.addTime("game.discard",time.perf_counter()-startTime,calls=2)
 
+        self.poneDiscards = player2Crib if self.player1Dealer else player1Crib
         self.turnCard = self.deck.getCards(1)[0]
 
         if self.player1Dealer:
@@ -265,61 +307,72 @@ class Game:
         if cardPlayed is not None:
             self.go_lastPlayWasGo = False
             return
-        elif (cardPlayed is None) and self.go_lastPlayWasGo: 
-            # both players are in a go, so reset the game state and go to next hand
-            self.cardsSinceReset = 0
-            self.cardTotal = 0
-            self.go_lastPlayWasGo = False
-            self.go_inGoState = False
-            return
-        elif cardPlayed is None:
-            # See if someone gets a point for the go
-            # Then go to the next hand
-            if not self.go_inGoState:
-                # when entering a go state, the other player gets a point
-                self.player1Score += 1 if not self.player1Turn else 0
-                self.player2Score += 1 if self.player1Turn else 0
-            self.go_lastPlayWasGo = True
-            self.go_inGoState = True
-            return
-            
+        # PeggingState.go resets the table when both players are in a go,
+        # otherwise the other player gets a point when entering a go state
+        points = self.peggingState.go()
+        self.player1Score += points if not self.player1Turn else 0
+        self.player2Score += points if self.player1Turn else 0
+
     def _scorePegging(self):
         '''
         Return the score for the last card played 
+        playHand scores each card as it is laid with PeggingState.play, this rebuilds
+            the table from cardsPlayed and cardsSinceReset when they are set directly
         '''
-        score = 0
+        previous = PeggingState.fromTable(self.cardsPlayed[:-1],self.cardsSinceReset-1)
+        score = previous.pointsFor(self.cardsPlayed[-1])
 
-        faceValues = [cardIdToFaceValue[card] for card in self.cardsPlayed]
-        faceValues = faceValues[::-1] # reverse order to make searching logic easier
-        
-        # count the pairs that are on the table. Must be in order played
-        # Need at least 2 cards to have a pair
-        if self.cardsSinceReset >= 2:
-            pairCount = 0
-            for idx in range(self.cardsSinceReset-1):
-                if faceValues[idx] == faceValues[idx+1]:
-                    pairCount += 1
-                else:
-                    break
-            score += [0,2,6,12][pairCount]
-
-        # Score a run on the table, must be in increasing order
-        # Need at least 3 cards for a run
-        if self.cardsSinceReset >= 3:
-            runCount = 1
-            for idx in range(self.cardsSinceReset-1):
-                if faceValues[idx] == (faceValues[idx+1] + 1):
-                    runCount += 1
-                else:
-                    break
-            score += [0,0,0,3,4,5,6,7,8][runCount]
-
-        # 31 must be counted after runs and pairs as it resets cardsSinceReset
-        if self.cardTotal == 15:
-            score += 2
-        elif self.cardTotal == 31:
-            score += 2
+        if self.cardTotal == 31:
             self.cardTotal = 0
             self.cardsSinceReset = 0
         
-        return score
\ No newline at end of file
+        return score
+
+class DuplicateGame:
+    '''
+    Plays the same decks twice with the players in swapped seats, for comparing 2 player types
+        * Game 1: playerA is player1 and playerB is player2
+        * Game 2: playerB is player1 and playerA is player2, with the same seed
+        * Each hand the seats are dealt the same cards in both games, so the luck of the deal
+            cancels out in the paired differences
+    '''
+    def __init__(self,playerAType,
+                        playerBType,
+                        seed,
+                        scorer=None,
+                        verbose=False):
+        '''
+        player<A,B>Type: the player types being compared, same options as Game
+        seed: int, seed for the decks, shared by both games
+        scorer: Instance of a Scorer class, shared by both games
+        '''
+        self.playerAType = playerAType
+        self.playerBType = playerBType
+        self.seed = seed
+        self.verbose = verbose
+
+        self.games = [Game(playerAType,playerBType,"PlayerA","PlayerB",scorer=scorer,verbose=verbose,seed=seed),
+                        Game(playerBType,playerAType,"PlayerB","PlayerA",scorer=scorer,verbose=verbose,seed=seed)]
+
+    def playGame(self):
+        '''
+        Play both games and compute the paired differences between the players
+            * winDifference: playerA wins minus playerB wins from the same seat, -1, 0 or 1
+            * spreadDifference: playerA's point spread minus playerB's from the same seat
+        '''
+        for game in self.games:
+            game.playGame()
+
+        seat1Wins = [int(game.player1Score > game.player2Score) for game in self.games]
+        seat1Spreads = [game.player1Score - game.player2Score for game in self.games]
+
+        self.playerAWins = seat1Wins[0] + 1 - seat1Wins[1]
+        self.winDifference = seat1Wins[0] - seat1Wins[1]
+        self.spreadDifference = seat1Spreads[0] - seat1Spreads[1]
+
+    def scores(self):
+        '''
+        Return the final scores as [game1Player1, game1Player2, game2Player1, game2Player2]
+        '''
+        return [self.games[0].player1Score,self.games[0].player2Score,
+                self.games[1].player1Score,self.games[1].player2Score]
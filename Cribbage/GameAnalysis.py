@@ -0,0 +1,152 @@
+'''
+Statistics over hands recorded with GameLog
+
+The records are split into columns with one row per player per hand, so every statistic
+    is a group-by over whole arrays:
+    * group keys are packed into a single integer per row and grouped with np.unique
+    * counts, sums and sums of squares per group come from np.bincount
+'''
+import numpy as np
+
+from Cribbage.GameLog import readGameLog
+
+class HandColumns:
+    '''
+    Column arrays with a row for each player in each recorded hand
+        * gameId, handNumber: which hand the row is from
+        * seat: 0 for player1, 1 for player2
+        * isDealer: bool, the player dealt the hand
+        * startScore, oppStartScore: scores at the start of the hand
+        * keptHand: (N,4) cardIds the player kept
+        * discard: (N,2) cardIds the player put in the crib
+        * turnCard: cardId of the turn card
+        * handPoints, peggingPoints: points the player scored
+        * cribPoints: points scored by the crib, for the dealer's or the opponent's crib
+        * heelsPoints: points the player scored for his heels
+        * discardPoints: hand points plus the crib when dealing and minus it otherwise,
+            the value of the discard choice
+        * netPoints: points the player scored in the hand less the points the opponent scored
+        * gameOver: bool, the game was won during the hand
+    '''
+
+    def __init__(self, records, completeOnly=True):
+        '''
+        records: np.ndarray of GameLog.handRecordDtype, or a path to a game log
+        completeOnly: bool, drop the hands the game was won in, they were not played to the end
+        '''
+        if isinstance(records,str):
+            records = readGameLog(records)
+        if completeOnly:
+            records = records[records['gameOver'] == 0]
+        handCount = records.shape[0]
+        seats = np.arange(2)
+
+        self.gameId = np.repeat(np.asarray(records['gameId'],dtype=np.int64),2)
+        self.handNumber = np.repeat(np.asarray(records['handNumber'],dtype=np.int64),2)
+        self.seat = np.tile(seats,handCount)
+        dealer = np.asarray(records['dealer'],dtype=np.int64)
+        self.isDealer = (np.repeat(dealer,2) == self.seat)
+
+        startScores = np.asarray(records['startScores'],dtype=np.int64)
+        self.startScore = startScores.ravel()
+        self.oppStartScore = startScores[:,::-1].ravel()
+
+        self.keptHand = np.asarray(records['hands'],dtype=np.int64).reshape(-1,4)
+        # the crib holds the dealer's discards first
+        crib = np.asarray(records['crib'],dtype=np.int64).reshape(-1,2,2)
+        discardIdx = np.where(self.isDealer.reshape(-1,2),0,1)
+        self.discard = crib[np.arange(handCount)[:,None],discardIdx].reshape(-1,2)
+        self.turnCard = np.repeat(np.asarray(records['turnCard'],dtype=np.int64),2)
+
+        self.handPoints = np.asarray(records['handPoints'],dtype=np.int64).ravel()
+        self.peggingPoints = np.asarray(records['peggingPoints'],dtype=np.int64).ravel()
+        self.cribPoints = np.repeat(np.asarray(records['cribPoints'],dtype=np.int64),2)
+        self.heelsPoints = np.where(self.isDealer,np.repeat(np.asarray(records['heelsPoints'],dtype=np.int64),2),0)
+        self.discardPoints = self.handPoints + np.where(self.isDealer,self.cribPoints,-self.cribPoints)
+        points = self.handPoints + self.peggingPoints + self.heelsPoints + np.where(self.isDealer,self.cribPoints,0)
+        self.netPoints = points - points.reshape(-1,2)[:,::-1].ravel()
+        self.gameOver = np.repeat(np.asarray(records['gameOver'],dtype=bool),2)
+
+    def __len__(self):
+        return self.seat.shape[0]
+
+class GroupStats:
+    '''
+    Count, mean and variance of a value for each group
+        * keys: (groups,) or (groups,columns) array of the distinct keys, sorted
+        * counts, means, variances: (groups,) arrays, variances are population variances
+    '''
+
+    def __init__(self, keys, counts, means, variances):
+        self.keys = keys
+        self.counts = counts
+        self.means = means
+        self.variances = variances
+
+    def __len__(self):
+        return self.counts.shape[0]
+
+    def asDict(self):
+        '''
+        Return {key: (count, mean, variance)}, keys with several columns are tuples
+        '''
+        keys = [tuple(int(item) for item in key) if np.ndim(key) else int(key) for key in self.keys]
+        return {key:(int(count),float(mean),float(variance))
+                for key, count, mean, variance in zip(keys,self.counts,self.means,self.variances)}
+
+def groupBy(keys, values):
+    '''
+    Group values by keys without a Python loop over the rows
+    keys: (N,) or (N,columns) integer array, or a list of (N,) arrays used as columns
+    values: (N,) array
+    Returns GroupStats
+    '''
+    if isinstance(keys,(list,tuple)):
+        keys = np.stack([np.asarray(key,dtype=np.int64) for key in keys],axis=1)
+    keys = np.asarray(keys,dtype=np.int64)
+    values = np.asarray(values,dtype=np.float64)
+    if keys.ndim == 1:
+        uniqueKeys, inverse = np.unique(keys,return_inverse=True)
+    else:
+        # pack each row into one integer, np.unique on a 1d array is much faster than on rows
+        lows = keys.min(axis=0) if keys.shape[0] > 0 else np.zeros(keys.shape[1],dtype=np.int64)
+        dims = tuple(int(dim) for dim in (keys.max(axis=0) - lows + 1)) if keys.shape[0] > 0 else (1,)*keys.shape[1]
+        packed = np.ravel_multi_index(tuple((keys - lows).T),dims)
+        uniquePacked, inverse = np.unique(packed,return_inverse=True)
+        uniqueKeys = np.stack(np.unravel_index(uniquePacked,dims),axis=1) + lows
+    counts = np.bincount(inverse,minlength=uniqueKeys.shape[0])
+    means = np.bincount(inverse,weights=values,minlength=uniqueKeys.shape[0])/np.maximum(counts,1)
+    variances = np.bincount(inverse,weights=values*values,minlength=uniqueKeys.shape[0])/np.maximum(counts,1) - means**2
+    return GroupStats(uniqueKeys,counts,means,np.maximum(variances,0.))
+
+def discardStats(columns, byDealer=True):
+    '''
+    Mean discard points, hand plus or minus crib, for each pair of face values discarded
+    columns: HandColumns
+    byDealer: bool, group by the dealer flag as well, the first key column
+    Returns GroupStats keyed on ([isDealer,] lowFace, highFace)
+    '''
+    faces = np.sort(columns.discard % 13 + 1,axis=1)
+    keys = [faces[:,0],faces[:,1]]
+    if byDealer:
+        keys.insert(0,columns.isDealer)
+    return groupBy(keys,columns.discardPoints)
+
+def peggingStats(columns):
+    '''
+    Pegging points by position, keyed on the dealer flag, the dealer lays first in Game
+    Returns GroupStats
+    '''
+    return groupBy(columns.isDealer,columns.peggingPoints)
+
+def scoreDistribution(values, maxScore=None):
+    '''
+    Fraction of values equal to each score from 0 to maxScore
+    values: integer array, such as HandColumns.handPoints
+    Returns np.array (maxScore+1,)
+    '''
+    values = np.asarray(values,dtype=np.int64)
+    counts = np.bincount(values,minlength=0 if maxScore is None else maxScore+1)
+    if maxScore is not None:
+        counts = counts[:maxScore+1]
+    return counts/max(values.shape[0],1)
@@ -0,0 +1,171 @@
+import numpy as np
+import json
+import struct
+
+# Game log file layout:
+#   * magic bytes, version (uint32) and header length (uint32)
+#   * json header with the record dtype
+#   * fixed width records, one per hand, starting at the first aligned byte after the header
+#       a log that is still being written can be read, a partly written last record is ignored
+# Bump logVersion whenever the layout or the meaning of a field changes
+logMagic = b"CRIBLOG\0"
+logVersion = 1
+logAlignment = 64
+
+# 255 marks a card slot that was never filled, such as the pegging after the game was won
+noCard = 255
+
+# One record per hand, every field is little endian and the record is packed to 37 bytes
+#   * players are in seat order, index 0 is player1, dealer is the index of the dealer
+#   * crib is the dealer's 2 discards then the other player's 2
+#   * pegging is the cards in the order they were laid
+#   * the points fields are what each phase scored, they add up to the scores at the end of the hand
+#   * gameOver is 1 when the game was won during the hand
+handRecordDtype = np.dtype([('gameId','<u4'),
+                            ('handNumber','<u2'),
+                            ('dealer','u1'),
+                            ('startScores','u1',(2,)),
+                            ('hands','u1',(2,4)),
+                            ('crib','u1',(4,)),
+                            ('turnCard','u1'),
+                            ('pegging','u1',(8,)),
+                            ('heelsPoints','u1'),
+                            ('peggingPoints','u1',(2,)),
+                            ('handPoints','u1',(2,)),
+                            ('cribPoints','u1'),
+                            ('gameOver','u1')])
+_recordStruct = struct.Struct("<IHB2B21B7B")
+assert _recordStruct.size == handRecordDtype.itemsize
+
+def _padded(cards, length):
+    '''
+    Return cards as a list of length, filled out with noCard
+    '''
+    cards = list(cards) if cards is not None else []
+    return cards + [noCard]*(length-len(cards))
+
+def _dataStart(headerLength):
+    '''
+    Return the file offset of the first record for a header of headerLength bytes
+    '''
+    headerEnd = len(logMagic) + 8 + headerLength
+    return -(-headerEnd//logAlignment)*logAlignment
+
+class GameLogWriter:
+    '''
+    Streams a record of every hand played to a binary file
+    Pass it to Game as the recorder, one writer can take the hands of any number of games
+        * records are packed into a buffer and written out bufferRecords at a time
+    '''
+
+    def __init__(self, path, bufferRecords=65536):
+        '''
+        path: file to write, any existing file is replaced
+        bufferRecords: int, number of records held in memory before they are written
+        '''
+        self.path = path
+        header = json.dumps({"dtype":handRecordDtype.descr}).encode()
+        self._fp = open(path,'wb')
+        self._fp.write(logMagic)
+        self._fp.write(struct.pack("<II",logVersion,len(header)))
+        self._fp.write(header)
+        self._fp.write(b"\0"*(_dataStart(len(header)) - self._fp.tell()))
+        self._fp.flush() # so the log can be read as soon as the first records are written
+
+        self._buffer = bytearray(_recordStruct.size*bufferRecords)
+        self._bufferEnd = 0
+        self.gamesStarted = 0
+        self.handsWritten = 0
+
+    def newGame(self):
+        '''
+        Return the id for the next game, ids count up from 0
+        '''
+        gameId = self.gamesStarted
+        self.gamesStarted += 1
+        return gameId
+
+    def recordHand(self, game, startScores, phaseScores):
+        '''
+        Add a record for the hand game just played
+        game: Game, read for the cards, the scores at the end of the hand and the game state
+        startScores: (player1Score, player2Score) at the start of the hand
+        phaseScores: list of the scores after the deal, the pegging and each of the hands were counted
+            * shorter when the game was won during the hand, the rest of the phases score nothing
+        '''
+        endScores = (game.player1Score,game.player2Score)
+        dealer = 0 if game.player1Dealer else 1
+        dealerPlayer = game.player1 if game.player1Dealer else game.player2
+        if len(phaseScores) == 4:
+            dealt, pegged, dealerCounted, poneCounted = phaseScores
+            # the hands, crib, turn card and pegging are next to each other in the record
+            cards = game.player1.hand + game.player2.hand + dealerPlayer.crib + [game.turnCard] + game.cardsPlayed
+        else: # the game was won during the hand, the phases after that scored nothing
+            dealt, pegged, dealerCounted, poneCounted = (list(phaseScores) + [endScores]*4)[:4]
+            cards = _padded(game.player1.hand,4) + _padded(game.player2.hand,4) + _padded(dealerPlayer.crib,4) + \
+                [getattr(game,'turnCard',noCard)] + _padded(game.cardsPlayed,8)
+
+        _recordStruct.pack_into(self._buffer,self._bufferEnd,
+            game.gameId,
+            game.handNumber,
+            dealer,
+            startScores[0],
+            startScores[1],
+            *cards,
+            dealt[dealer] - startScores[dealer],
+            pegged[0] - dealt[0],
+            pegged[1] - dealt[1],
+            dealerCounted[0] - pegged[0] if dealer == 0 else poneCounted[0] - dealerCounted[0],
+            dealerCounted[1] - pegged[1] if dealer == 1 else poneCounted[1] - dealerCounted[1],
+            endScores[dealer] - poneCounted[dealer],
+            1 if game.gameOver else 0)
+        self._bufferEnd += _recordStruct.size
+        self.handsWritten += 1
+        if self._bufferEnd == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        '''
+        Write the buffered records to the file
+        '''
+        self._fp.write(memoryview(self._buffer)[:self._bufferEnd])
+        self._fp.flush()
+        self._bufferEnd = 0
+
+    def close(self):
+        '''
+        Write the buffered records and close the file
+        '''
+        if not self._fp.closed:
+            self.flush()
+            self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+def readGameLog(path):
+    '''
+    Memory map the records of a file written by GameLogWriter
+        * records written so far are included, a partly written record at the end is not
+    Returns:
+        * np.memmap of handRecordDtype, one element per hand, read only
+    '''
+    with open(path,'rb') as fp:
+        magic = fp.read(len(logMagic))
+        if magic != logMagic:
+            raise ValueError("{} is not a game log file".format(path))
+        version, headerLength = struct.unpack("<II",fp.read(8))
+        if version != logVersion:
+            raise ValueError("Game log {} is version {}, expected version {}".format(path,version,logVersion))
+        header = json.loads(fp.read(headerLength).decode())
+        fileSize = fp.seek(0,2)
+    dtype = np.dtype([(field[0],field[1]) if len(field) == 2 else (field[0],field[1],tuple(field[2]))
+                      for field in header["dtype"]])
+    dataStart = _dataStart(headerLength)
+    records = (fileSize - dataStart)//dtype.itemsize
+    if records == 0:
+        return np.zeros(0,dtype=dtype)
+    return np.memmap(path,dtype=dtype,mode='r',offset=dataStart,shape=(records,))
@@ -1,6 +1,141 @@
 from Cribbage.cribbage import cardIdToCountValue,cardIdToFaceValue,cardIdToName,cardIdToSuite,cardIdToSuiteName
-import numpy as np
-from itertools import combinations
+from Cribbage.CardSet import CardSet
+from Cribbage.Canonical import canonicalPositions, relabelCards
+from itertools import combinations, combinations_with_replacement
+from math import comb
+import os
+import time
+
+class _LazyNumpy:
+    '''
+    Stands in for numpy until a numeric path first uses it, then puts numpy itself in the
+        module globals, so importing the package does not import numpy
+        * only the modules imported with the package need it, the rest, such as Players,
+            are imported once a game is created and import numpy at the top like any module
+    '''
+
+    def __getattr__(self, name):
+        import numpy
+        globals()['np'] = numpy
+        return getattr(numpy,name)
+
+np = _LazyNumpy()
+
+# The score table has an entry for every sorted 4 card hand (52 choose 4) and each of
+#   the 48 cards that could be turned once the hand is removed from the deck
+scoreTableHands = comb(52,4)
+scoreTableTurns = 48
+scoreTableSize = scoreTableHands*scoreTableTurns
+
+# binomial[n][k] for n in 0-52 and k in 0-4, used to rank sorted hands
+binomial = [[comb(n,k) for k in range(5)] for n in range(53)]
+
+# discardIndex[ii][jj] is the index of discarding cards ii and jj (ii < jj) in the 15 discards,
+#   the discards are in the order of combinations(range(6),2)
+discardIndex = [[None]*6 for ii in range(6)]
+for idx, (ii,jj) in enumerate(combinations(range(6),2)):
+    discardIndex[ii][jj] = idx
+
+# Highest possible score of a hand with the turn card, 3 fives and a jack with a five turned
+maxHandScore = 29
+
+def scoreTableIndex(cardsInHand,turnCard):
+    '''
+    Return the index in the score table for a 4 card hand and turn card
+        * The sorted hand is ranked with the combinatorial number system, this maps
+            every set of 4 cards to a unique int in [0,scoreTableHands)
+        * The turn card is ranked among the 48 cards that are not in the hand
+    '''
+    c0,c1,c2,c3 = sorted(cardsInHand)
+    handRank = binomial[c0][1] + binomial[c1][2] + binomial[c2][3] + binomial[c3][4]
+    turnRank = turnCard - (c0 < turnCard) - (c1 < turnCard) - (c2 < turnCard) - (c3 < turnCard)
+    return handRank*scoreTableTurns + turnRank
+
+def fifteenCombinations(countValues):
+    '''
+    Return the number of sets of cards that add up to 15, for any number of cards
+    countValues: list of the count values of the cards, 1-10
+        * subset-sum dynamic program, ways[total] is the number of sets of the cards seen so
+            far that add up to total. Adding a card with value v adds ways[total-v] to ways[total]
+        * totals over 15 can never come back down so only 16 totals are kept
+        * the 16 counts are packed into the fields of one int, width bits each, so adding a
+            card is a shift, an add and a mask instead of a loop over the totals
+    '''
+    width = len(countValues) + 1 # there are at most 2^n sets
+    ways = 1 # one way to make a total of 0
+    mask = (1 << 16*width) - 1
+    for value in countValues:
+        ways = (ways + (ways << value*width)) & mask
+    return ways >> 15*width
+
+def fifteenCombinationsFromHistogram(histogram):
+    '''
+    Return the number of sets of cards that add up to 15
+    histogram: list of 11, histogram[value] is the number of cards with count value value
+        * the dynamic program of fifteenCombinations with one step per count value instead of
+            per card: n cards of value v add comb(n,k)*ways[total-k*v] to ways[total] for each
+            k of them in the set
+    '''
+    width = sum(histogram) + 1
+    ways = 1
+    mask = (1 << 16*width) - 1
+    for value in range(1,11):
+        count = histogram[value]
+        previous = ways
+        for taken in range(1,min(count,15//value)+1):
+            ways += comb(count,taken)*(previous << taken*value*width)
+        ways &= mask
+    return ways >> 15*width
+
+def faceHistogram(faceValues):
+    '''
+    Return a list of 15, the number of cards with each face value 1-13
+        * index 0 and 14 are always 0 so runs end at the ace and the king
+    '''
+    histogram = [0]*15
+    for face in faceValues:
+        histogram[face] += 1
+    return histogram
+
+def scorePairsFromHistogram(histogram):
+    '''
+    Score the pairs of a face value histogram, n cards of a face make comb(n,2) pairs worth 2 each
+    '''
+    return sum(count*(count-1) for count in histogram) # 2*comb(count,2)
+
+def scoreRunsFromHistogram(histogram):
+    '''
+    Score the runs of a face value histogram, for any number of cards
+        * a run is a stretch of 3 or more consecutive faces that are all in the hand
+        * each way of picking one card of every face in the stretch is a run, so a stretch
+            scores its length times the product of the counts of its faces
+        * the shorter runs inside a stretch are not counted
+    '''
+    score = 0
+    length = 0
+    multiplicity = 1
+    for face in range(1,15):
+        count = histogram[face]
+        if count > 0:
+            length += 1
+            multiplicity *= count
+            continue
+        if length >= 3:
+            score += length*multiplicity
+        length = 0
+        multiplicity = 1
+    return score
+
+_defaultScorer = None
+
+def getDefaultScorer():
+    '''
+    Return the HandScorer shared by the process, it is created on the first call
+    '''
+    global _defaultScorer
+    if _defaultScorer is None:
+        _defaultScorer = HandScorer()
+    return _defaultScorer
 
 class HandScorer:
     '''
@@ -9,38 +144,68 @@ class HandScorer:
         * Cache size is 52^5, but will only fill 52*51*50*49*52 spots at max
             because the hand is sorted before checking the cache. this removes
             the cases where the same hand is given, but in a different order
+    Caches are allocated the first time they are needed and numpy is only imported by the
+        methods that use it, so creating a scorer is cheap. getDefaultScorer() returns a
+        scorer shared by the whole process
+    The scores of the possible hands from a deal are memoized per suite isomorphic class
+        of deals (see Canonical), there are ~20x fewer classes than deals
+    Optionally uses a fully precomputed score table
+        * There is one int8 entry for every (sorted 4 card hand, turn card) pair, ~13MB
+        * Indexed by scoreTableIndex(), so a score is a single array lookup
+        * Loaded from scoreTablePath if it exists, otherwise it is built (a few seconds)
+            and saved to scoreTablePath if one is given
+    The caches and tables can be saved to a single file with save() and memory mapped back
+        by passing cachePath, so worker processes share one warm copy of the tables
+    Pass a Stats as stats to count the hits and misses of each cache and time each scoring
+        component, with the default of None the only cost is checking for it
     '''
 
-    def __init__(self,useCacheLarge=False,useCache15=True,useCachePair=True,useCacheStraight=True):
+    def __init__(self,useCacheLarge=False,useCachePair=True,useCacheStraight=True,useScoreTable=False,scoreTablePath=None,cachePath=None,useCanonicalCache=True,canonicalCacheSize=50000,stats=None):
         
         self.useCacheLarge = useCacheLarge
-        self.useCache15 = useCache15
         self.useCachePair = useCachePair
         self.useCacheStraight = useCacheStraight
 
-        if self.useCacheLarge:
-            self.scores = np.empty((52,52,52,52,52),dtype=np.int8)
-            self.scores.fill(-1)
-            self.scores_4card = np.empty((52,52,52,52),dtype=np.int8)
-            self.scores_4card.fill(-1)
-
-        if self.useCache15:
-            self.scores_15s = np.empty((11,11,11,11,11),dtype=np.int8)
-            self.scores_15s.fill(-1)
-            self.scores_15s_4card = np.empty((11,11,11,11),dtype=np.int8)
-            self.scores_15s_4card.fill(-1)
-    
-        if self.useCachePair:
-            self.scores_pairs = np.empty((14,14,14,14,14),dtype=np.int8)
-            self.scores_pairs.fill(-1)
-            self.scores_pairs_4card = np.empty((14,14,14,14),dtype=np.int8)
-            self.scores_pairs_4card.fill(-1)
-
-        if self.useCacheStraight:
-            self.scores_straight = np.empty((14,14,14,14,14),dtype=np.int8)
-            self.scores_straight.fill(-1)
-            self.scores_straight_4card = np.empty((14,14,14,14),dtype=np.int8)
-            self.scores_straight_4card.fill(-1)
+        # The caches are allocated the first time they are used
+        self.scores = None
+        self.scores_4card = None
+        self.scores_pairs = None
+        self.scores_pairs_4card = None
+        self.scores_straight = None
+        self.scores_straight_4card = None
+
+        # Scores of the rank dependent parts of a hand (15s, pairs, straights) indexed by the
+        #   face values - 1 of the cards in any order. Built on first use
+        self.rankScores = None
+        self.rankScores_4card = None
+
+        # Scores of possible hands for each suite isomorphic class of deals, see possibleHandScores
+        #   Cleared when it reaches canonicalCacheSize entries (~1KB each)
+        self.useCanonicalCache = useCanonicalCache
+        self.canonicalCacheSize = canonicalCacheSize
+        self.canonicalHandScores = {}
+
+        self.stats = stats
+
+        self.useScoreTable = useScoreTable
+        self.scoreTable = None
+        if cachePath is not None:
+            self.load(cachePath)
+        if self.useScoreTable and (self.scoreTable is None):
+            if (scoreTablePath is not None) and os.path.isfile(scoreTablePath):
+                self.loadScoreTable(scoreTablePath)
+            else:
+                self.buildScoreTable()
+                if scoreTablePath is not None:
+                    self.saveScoreTable(scoreTablePath)
+
+    def _allocateCache(self,name,shape):
+        '''
+        Create an empty cache filled with -1 and store it as attribute name
+        '''
+        cache = np.empty(shape,dtype=np.int8)
+        cache.fill(-1)
+        setattr(self,name,cache)
 
     def __call__(self,cardsInHand,turnCard):
         '''
@@ -52,6 +217,11 @@ class HandScorer:
         turnCard: int, the cardId for the turn card
         Checks to see if it has already been computed and cached, then computes if needed
         ''' 
+        if self.useScoreTable and (turnCard is not None):
+            if self.stats is not None:
+                self.stats.hit("scorer.scoreTable")
+            return self.scoreTable.item(scoreTableIndex(cardsInHand,turnCard))
+
         # the score can vary based on weather a card is in the hand or is the turn card,
         #   so keeping the order is important
         allCards = sorted(cardsInHand)
@@ -62,38 +232,64 @@ class HandScorer:
         #print("\n----\nHand: {}\nValue: {}\n----".format(allCards,values))
         
         # first check the cache
+        if self.useCacheLarge and (self.scores is None):
+            self._allocateCache("scores",(52,52,52,52,52))
+            self._allocateCache("scores_4card",(52,52,52,52))
         if self.useCacheLarge and (len(allCards) == 5):
             if self.scores.item(*allCards) != -1:
+                if self.stats is not None:
+                    self.stats.hit("scorer.scores")
                 return self.scores.item(*allCards)
         elif self.useCacheLarge and (len(allCards) == 4):
             if self.scores_4card.item(*allCards) != -1:
+                if self.stats is not None:
+                    self.stats.hit("scorer.scores_4card")
                 return self.scores_4card.item(*allCards)
 
         # did not find data in the cache, so compute the score
-        score = 0
-        score += self.score15s(cardsInHand,turnCard)
-        #print("\n\tScore after 15s:      {}".format(score))
-        score += self.scorePairs(cardsInHand,turnCard)
-        #print("\tScore after pairs:    {}".format(score))
-        score += self.scoreFlush(cardsInHand,turnCard)
-        #print("\tScore after flush:    {}".format(score))
-        score += self.scoreStraight(cardsInHand,turnCard)
-        #print("\tScore after straight: {}".format(score))
-        score += self.scoreKnobs(cardsInHand,turnCard)
-        #print("\tScore after knobs:    {}".format(score))
+        if self.stats is not None:
+            if self.useCacheLarge:
+                self.stats.miss("scorer.scores" if len(allCards) == 5 else "scorer.scores_4card")
+            score = self._timedScore(cardsInHand,turnCard)
+        else:
+            score = 0
+            score += self.score15s(cardsInHand,turnCard)
+            #print("\n\tScore after 15s:      {}".format(score))
+            score += self.scorePairs(cardsInHand,turnCard)
+            #print("\tScore after pairs:    {}".format(score))
+            score += self.scoreFlush(cardsInHand,turnCard)
+            #print("\tScore after flush:    {}".format(score))
+            score += self.scoreStraight(cardsInHand,turnCard)
+            #print("\tScore after straight: {}".format(score))
+            score += self.scoreKnobs(cardsInHand,turnCard)
+            #print("\tScore after knobs:    {}".format(score))
 
         if self.useCacheLarge and (len(allCards) == 5):
             self.scores.itemset(*allCards,score)
         elif self.useCacheLarge and (len(allCards) == 4):
             self.scores_4card.itemset(*allCards,score)
         return score
+
+    def _timedScore(self,cardsInHand,turnCard):
+        '''
+        Score the hand one component at a time, adding the time of each to self.stats
+        '''
+        score = 0
+        for name, component in (("scorer.15s",self.score15s),
+                                ("scorer.pairs",self.scorePairs),
+                                ("scorer.flush",self.scoreFlush),
+                                ("scorer.straight",self.scoreStraight),
+                                ("scorer.knobs",self.scoreKnobs)):
+            startTime = time.perf_counter()
+            score += component(cardsInHand,turnCard)
+            self.stats.addTime(name,time.perf_counter()-startTime)
+        return score
         
     def score15s(self,cardsInHand,turnCard):
         '''
         Count the unique sets of cards that add to 15
-        There are 5 (or 4 if turnCard is None) cards availble to make sets from, and it takes at least 2 cards
-            to get to 15, so pad the combinations with 3 zeros to allow 2 cards to combine
-            as well as all 5 cards to combine to score 15
+        Works for any number of cards, the sets are counted with fifteenCombinations
+            * not cached, counting is about as fast as looking the count values up in a table
         Inputs:
             * cardsInHand: list of ints of the card ids in the players hand
             * turnCad: int or None. 
@@ -105,31 +301,12 @@ class HandScorer:
         values = [cardIdToCountValue[card] for card in cardsInHand]
         if turnCard is not None: #enable scoring of just cards in hand
             values.append(cardIdToCountValue[turnCard])
-        values = sorted(values)
-        score = 0
-
-        if self.useCache15 and (len(values) == 5):
-            if self.scores_15s.item(*values) != -1: # score in cache
-                return self.scores_15s.item(*values)
-        elif self.useCache15 and (len(values) == 4):
-            if self.scores_15s_4card.item(*values) != -1: # score in cache
-                return self.scores_15s_4card.item(*values)
-
-        for cardsUsed in range(2,len(values)+1):
-            for item in combinations(values,cardsUsed):
-                total = sum(item)
-                if total == 15:
-                    score += 2
-
-        if self.useCache15 and len(values) == 5:
-            self.scores_15s.itemset(*values,score)
-        elif self.useCache15 and  len(values) == 4:
-            self.scores_15s_4card.itemset(*values,score)
-        return score
+        return 2*fifteenCombinations(values)
 
     def scorePairs(self,cardsInHand,turnCard):
         '''
         Go through the cards and compute the score for pairs
+        Scored from the histogram of face values with scorePairsFromHistogram
 
         Inputs:
             * cardsInHand: list of ints of the card ids in the players hand
@@ -146,28 +323,23 @@ class HandScorer:
         values = sorted(values)
         score = 0
 
+        if self.useCachePair and (self.scores_pairs is None):
+            self._allocateCache("scores_pairs",(14,14,14,14,14))
+            self._allocateCache("scores_pairs_4card",(14,14,14,14))
         if self.useCachePair and (len(values) == 5):
             if self.scores_pairs.item(*values) != -1:
+                if self.stats is not None:
+                    self.stats.hit("scorer.scores_pairs")
                 return self.scores_pairs.item(*values)
         elif self.useCachePair and (len(values) == 4):
             if self.scores_pairs_4card.item(*values) != -1:
+                if self.stats is not None:
+                    self.stats.hit("scorer.scores_pairs_4card")
                 return self.scores_pairs_4card.item(*values)
+        if (self.stats is not None) and self.useCachePair and (len(values) in (4,5)):
+            self.stats.miss("scorer.scores_pairs" if len(values) == 5 else "scorer.scores_pairs_4card")
 
-        # not possible to have startIdx == idx and not possible to have 5 of a kind
-        scoreForMatchCount = [0,0,2,6,12,None] 
-        score = 0
-        previousValue = -1
-        startIdx = -1
-        for idx,value in enumerate(values):
-            if value == previousValue:
-                continue
-            else:
-                matchCount = idx-startIdx
-                score += scoreForMatchCount[matchCount]
-                startIdx = idx
-                previousValue = value
-        matchCount = idx - startIdx + 1
-        score += scoreForMatchCount[matchCount]
+        score = scorePairsFromHistogram(faceHistogram(values))
 
         if self.useCachePair and (len(values) == 5):
             self.scores_pairs.itemset(*values,score)
@@ -233,11 +405,9 @@ class HandScorer:
         '''
         Straight is 3 or more multiples in a row
 
-        Start by looking for the longest runs.
-        After completing looking for a run of a specific length, if any were found stop searching
-            because searching for a run of 4 in a hand that has a run of 5, will find 2 runs of 4
-            Likewise it would find 3 runs of 3. However if a run of 3 or 4 exists, want to search
-            the rest of the combinations of a specific run length to find double runs
+        Scored from the histogram of face values with scoreRunsFromHistogram, a double run
+            is the run length times the number of cards of the doubled face, the runs of 4 in a
+            run of 5 are not counted
         Inputs:
             * cardsInHand: list of ints of the card ids in the players hand
             * turnCad: int or None. 
@@ -252,24 +422,23 @@ class HandScorer:
         values = sorted(values)
         score = 0
 
+        if self.useCacheStraight and (self.scores_straight is None):
+            self._allocateCache("scores_straight",(14,14,14,14,14))
+            self._allocateCache("scores_straight_4card",(14,14,14,14))
         if self.useCacheStraight and (len(values) == 5):
             if self.scores_straight.item(*values) != -1:
+                if self.stats is not None:
+                    self.stats.hit("scorer.scores_straight")
                 return self.scores_straight.item(*values)
         elif self.useCacheStraight and (len(values) == 4):
             if self.scores_straight_4card.item(*values) != -1:
+                if self.stats is not None:
+                    self.stats.hit("scorer.scores_straight_4card")
                 return self.scores_straight_4card.item(*values)
+        if (self.stats is not None) and self.useCacheStraight and (len(values) in (4,5)):
+            self.stats.miss("scorer.scores_straight" if len(values) == 5 else "scorer.scores_straight_4card")
 
-        foundRun = False
-        for runLength in range(len(values),2,-1):
-            for subset in combinations(values,runLength):
-                for idx in range(runLength-1):
-                    if (subset[idx] + 1) != (subset[idx+1]):
-                        break
-                else:
-                    foundRun = True
-                    score += runLength
-            if foundRun:
-                break
+        score = scoreRunsFromHistogram(faceHistogram(values))
         if self.useCacheStraight and (len(values) == 5):
             self.scores_straight.itemset(*values,score)
         elif self.useCacheStraight and (len(values) == 4):
@@ -282,15 +451,11 @@ class HandScorer:
         Given the 6 cards the player is dealt, return a map with the resulting 4 card
             hand scores where the indicies indicate the dropped cards
         '''
+        dropIdxs1, dropIdxs2, keptHands = self._keptHands(hand)
 
         scoreMap  = np.zeros((5,6),dtype=np.float32) # cannot have option 5,5 so just ignore it all together. 
         scoreMap[:] = np.NaN
-        for ii in range(6):
-            for jj in range(ii+1,6):
-                keptHand = hand.copy()
-                keptHand.pop(jj)# jj will always be > ii
-                keptHand.pop(ii)
-                scoreMap[ii,jj] = self(keptHand,None)
+        scoreMap[dropIdxs1,dropIdxs2] = self.score_batch(keptHands,np.full(keptHands.shape[0],-1))
 
         scoreMap = np.ma.masked_invalid(scoreMap)
         sortedIdxsFlat = np.argsort(scoreMap.flatten())[:-15] # last 15 will always be masked off as np.NaN
@@ -308,17 +473,12 @@ class HandScorer:
             where the first 2 indicies indicate the dropped cards and the 3rd references the
             possible turn card
         ''' 
+        dropIdxs1, dropIdxs2, keptHands = self._keptHands(hand)
+        scores, turnCards = self.possibleHandScores(hand)
+
         scoreMap  = np.zeros((5,6,52),dtype=np.float32) # cannot have option 5,5 so just ignore it all together. 
         scoreMap[:] = np.NaN
-        for ii in range(6):
-            for jj in range(ii+1,6):
-                keptHand = hand.copy()
-                keptHand.pop(jj)# jj will always be > ii
-                keptHand.pop(ii)
-                for turnCardId in range(52):
-                    if turnCardId in hand:
-                        continue
-                    scoreMap[ii,jj,turnCardId] = self(keptHand,turnCardId)
+        scoreMap[dropIdxs1[:,None],dropIdxs2[:,None],turnCards[None,:]] = scores
 
         scoreMap = np.ma.masked_invalid(scoreMap)
         mins = scoreMap.min(axis=-1)
@@ -333,42 +493,306 @@ class HandScorer:
                     "scoreMap":scoreMap}
         return result
 
-    def scorePossibleCribHands(self,hand):
+    def scoreDistributions(self,hand,quantiles=(0.1,0.25,0.5,0.75,0.9)):
+        '''
+        Given the 6 cards the player is dealt, return the distribution of the hand score over the
+            46 possible turn cards for every discard, from one possibleHandScores call
+        The results are (5,6,...) masked arrays indexed the same as the other scorePossible methods
+            * histograms: (5,6,maxHandScore+1) number of turn cards giving each score
+            * probabilities: (5,6,maxHandScore+1) the histograms divided by the 46 turn cards
+            * atLeast: (5,6,maxHandScore+1) probability of scoring at least each score, for
+                strategies that need a number of points to reach 121
+            * means, variances, mins, maxs: (5,6)
+            * quantiles: (5,6,len(quantiles)) the smallest score whose cumulative probability
+                is at least each quantile
+        '''
+        dropIdxs1, dropIdxs2, keptHands = self._keptHands(hand)
+        scores, turnCards = self.possibleHandScores(hand)
+        scores = scores.astype(np.int64)
+        turnCount = scores.shape[1]
+
+        # offset each discard into its own block of bins so one bincount builds every histogram
+        binCount = maxHandScore + 1
+        histograms = np.bincount((scores + binCount*np.arange(scores.shape[0])[:,None]).reshape(-1),
+                                    minlength=scores.shape[0]*binCount).reshape(scores.shape[0],binCount)
+        probabilities = histograms/turnCount
+        points = np.arange(binCount)
+        means = probabilities @ points
+        variances = probabilities @ points**2 - means**2
+        cumulative = np.cumsum(histograms,axis=1)
+        atLeast = (turnCount - cumulative + histograms)/turnCount
+        # the counts are integers, compare them to q*turnCount so rounding never moves a quantile,
+        #   at least one turn card is needed so the 0 quantile is the minimum
+        thresholds = np.maximum(np.asarray(quantiles)*turnCount - 1e-9,0.5)
+        quantileIdxs = (cumulative[:,:,None] < thresholds[None,None,:]).sum(axis=1)
+
+        def discardMap(values):
+            valueMap = np.zeros((5,6) + values.shape[1:],dtype=np.float64)
+            mask = np.ones(valueMap.shape,dtype=bool)
+            valueMap[dropIdxs1,dropIdxs2] = values
+            mask[dropIdxs1,dropIdxs2] = False
+            return np.ma.masked_array(valueMap,mask=mask)
+
+        return {"histograms":discardMap(histograms),
+                "probabilities":discardMap(probabilities),
+                "atLeast":discardMap(atLeast),
+                "means":discardMap(means),
+                "variances":discardMap(np.maximum(variances,0.)),
+                "mins":discardMap(scores.min(axis=1)),
+                "maxs":discardMap(scores.max(axis=1)),
+                "quantiles":discardMap(quantileIdxs)}
+
+    def possibleHandScores(self,hand):
+        '''
+        Given the 6 cards the player is dealt, score every kept hand with every possible turn card
+            * When useCanonicalCache is set the scores are computed once per suite isomorphic
+                class of deals and relabeled back to the dealt cards
+        Returns:
+            * scores: np.array int8 (15,46), rows are the discards in the order of _keptHands
+                and columns are the turn cards
+            * turnCards: np.array (46,) the cardIds of the turn cards, increasing
+        '''
+        turnCards = np.array(CardSet(hand).complement().cards())
+        if not self.useCanonicalCache:
+            return self._computePossibleHandScores(hand,turnCards), turnCards
+
+        canonical, suiteMap, positions = canonicalPositions(hand)
+        canonicalScores = self.canonicalHandScores.get(canonical)
+        if self.stats is not None:
+            if canonicalScores is None:
+                self.stats.miss("scorer.canonicalHandScores")
+            else:
+                self.stats.hit("scorer.canonicalHandScores")
+        if canonicalScores is None:
+            canonicalTurnCards = np.array(CardSet(canonical).complement().cards())
+            canonicalScores = self._computePossibleHandScores(list(canonical),canonicalTurnCards)
+            if len(self.canonicalHandScores) >= self.canonicalCacheSize:
+                self.canonicalHandScores.clear()
+            self.canonicalHandScores[canonical] = canonicalScores
+
+        # the discard of dealt cards ii,jj is the discard of canonical positions ii,jj (sorted)
+        rows = [discardIndex[min(positions[ii],positions[jj])][max(positions[ii],positions[jj])]
+                    for ii, jj in combinations(range(6),2)]
+        # the canonical turn cards are sorted, so the column is the rank among cards not in the hand
+        canonicalTurns = np.array(relabelCards(turnCards,suiteMap))
+        columns = canonicalTurns - (canonicalTurns[:,None] > np.array(canonical)[None,:]).sum(axis=1)
+        return canonicalScores[np.array(rows)[:,None],columns[None,:]], turnCards
+
+    def _computePossibleHandScores(self,hand,turnCards):
+        '''
+        Score every kept hand from hand with every card in turnCards, see possibleHandScores
+        '''
+        dropIdxs1, dropIdxs2, keptHands = self._keptHands(hand)
+        scores = self.score_batch(np.repeat(keptHands,turnCards.shape[0],axis=0),
+                                    np.tile(turnCards,keptHands.shape[0]))
+        return scores.reshape(keptHands.shape[0],turnCards.shape[0])
+
+    def scorePossibleCribHands(self,hand,includeScoreMap=True):
         '''
         Given a 6 card hand, find the scores of the possible crib hands
         Does not count the turn card in with the crib
+        The scores of every crib completion are reduced directly to statistics per discard,
+            these are (5,6) masked arrays indexed the same as the other scorePossible methods
+            * mins, maxs, means: statistics over the 1035 pairs of cards the other player could add
+            * histograms: (5,6,maxHandScore+1) count of crib completions with each score
+        includeScoreMap: bool, also return the (5,6,52,52) masked 'scoreMap' of every completion.
+            It is ~1MB and mostly empty, so leave this off unless the individual scores are needed
         '''
-        scoreMap  = np.zeros((5,6,52,52),dtype=np.float32) # cannot have option 5,5 so just ignore it all together. 
-        scoreMap[:] = np.NaN
-        for ii in range(6):
-            for jj in range(ii+1,6):
-                keptHand = hand.copy()
-                toCrib = []
-                toCrib.append(keptHand.pop(jj))# jj will always be > ii
-                toCrib.append(keptHand.pop(ii))
-                for cribCard1Id in range(52):
-                    if cribCard1Id in hand:
-                        continue
-                    for cribCard2Id in range(cribCard1Id+1,52):
-                        if cribCard2Id in hand:
-                            continue
-                        scoreMap[ii,jj,cribCard1Id,cribCard2Id] = self(toCrib + [cribCard1Id,cribCard2Id],None)
-
-        scoreMap = np.ma.masked_invalid(scoreMap)
-        mins = scoreMap.min(axis=(-2,-1))
-        maxs = scoreMap.max(axis=(-2,-1))
-
-        sortedIdxsFlat = np.argsort(mins.flatten())[:-15] # last 15 will always be masked off as np.NaN
-        sortedIdxs = np.unravel_index(sortedIdxsFlat,mins.shape)
-
-        result = {"mins":mins,
-                    "maxs":maxs,
-                    "scoreMap":scoreMap}
+        dropIdxs1, dropIdxs2, keptHands = self._keptHands(hand)
+        discards = np.asarray(hand)[np.stack([dropIdxs1,dropIdxs2],axis=1)]
+        unknownCards = np.array(CardSet(hand).complement().cards())
+        cribIdxs1, cribIdxs2 = np.triu_indices(unknownCards.shape[0],k=1)
+        cribCards1 = unknownCards[cribIdxs1]
+        cribCards2 = unknownCards[cribIdxs2]
+
+        cribs = np.empty((discards.shape[0],cribCards1.shape[0],4),dtype=np.int64)
+        cribs[:,:,:2] = discards[:,None,:]
+        cribs[:,:,2] = cribCards1
+        cribs[:,:,3] = cribCards2
+        scores = self.score_batch(cribs.reshape(-1,4),np.full(cribs.shape[0]*cribs.shape[1],-1))
+        scores = scores.reshape(cribs.shape[0],cribs.shape[1])
+
+        # offset each discard into its own block of bins so one bincount builds every histogram
+        binCount = maxHandScore + 1
+        histograms = np.bincount((scores + binCount*np.arange(scores.shape[0])[:,None]).reshape(-1),
+                                    minlength=scores.shape[0]*binCount).reshape(scores.shape[0],binCount)
+
+        stats = np.zeros((3,5,6),dtype=np.float32) # cannot have option 5,5 so just ignore it all together.
+        stats[:] = np.NaN
+        stats[0,dropIdxs1,dropIdxs2] = scores.min(axis=-1)
+        stats[1,dropIdxs1,dropIdxs2] = scores.max(axis=-1)
+        stats[2,dropIdxs1,dropIdxs2] = scores.mean(axis=-1)
+        stats = np.ma.masked_invalid(stats)
+
+        histogramMap = np.zeros((5,6,binCount),dtype=np.int64)
+        histogramMap[dropIdxs1,dropIdxs2] = histograms
+        histogramMask = np.ones((5,6,binCount),dtype=bool)
+        histogramMask[dropIdxs1,dropIdxs2] = False
+
+        result = {"mins":stats[0],
+                    "maxs":stats[1],
+                    "means":stats[2],
+                    "histograms":np.ma.masked_array(histogramMap,mask=histogramMask)}
+
+        if includeScoreMap:
+            scoreMap  = np.zeros((5,6,52,52),dtype=np.float32) # cannot have option 5,5 so just ignore it all together. 
+            scoreMap[:] = np.NaN
+            scoreMap[dropIdxs1[:,None],dropIdxs2[:,None],cribCards1[None,:],cribCards2[None,:]] = scores
+            result["scoreMap"] = np.ma.masked_invalid(scoreMap)
 
         return result
 
+    def buildRankScoreTables(self):
+        '''
+        Build the tables of the rank dependent scores (15s, pairs and straights) for 5 and 4 cards
+            * Only the sorted multisets of face values are scored, there are 6188 for 5 cards
+                and 1820 for 4 cards
+            * Every ordering of the face values is then filled in so lookups do not need to sort
+        '''
+        for cardCount in [5,4]:
+            sortedScores = np.full((13,)*cardCount,-1,dtype=np.int8)
+            for faces in combinations_with_replacement(range(13),cardCount):
+                if max(faces.count(face) for face in faces) > 4: # only 4 suites
+                    continue
+                cardIds = list(faces) # the first suite has cardId == face value - 1
+                score = self.score15s(cardIds,None)
+                score += self.scorePairs(cardIds,None)
+                score += self.scoreStraight(cardIds,None)
+                sortedScores[faces] = score
+
+            allFaces = np.indices((13,)*cardCount).reshape(cardCount,-1)
+            allFaces = np.sort(allFaces,axis=0)
+            scores = sortedScores[tuple(allFaces)].reshape((13,)*cardCount)
+            if cardCount == 5:
+                self.rankScores = scores
+            else:
+                self.rankScores_4card = scores
 
+    def score_batch(self,hands,turns):
+        '''
+        Score many hands at once with array operations instead of calling the scorer per hand
+            * The rank dependent scores (15s, pairs and straights) are looked up in the
+                rankScores tables, flushes and knobs are computed on the arrays
+        Inputs:
+            * hands: array like of shape (N,4) with the cardIds of the hands
+            * turns: array like of shape (N,) with the cardIds of the turn cards
+                * -1 scores the hand without a turn card, same as passing None to the scorer
+        Returns:
+            * np.array of shape (N,) with the scores as int8
+        '''
+        if self.stats is not None:
+            startTime = time.perf_counter()
+        hands = np.asarray(hands,dtype=np.int64)
+        turns = np.asarray(turns,dtype=np.int64)
+        if (hands.ndim != 2) or (hands.shape[1] != 4):
+            raise ValueError("hands must have shape (N,4), got {}".format(hands.shape))
+        if turns.shape != (hands.shape[0],):
+            raise ValueError("turns must have shape ({},), got {}".format(hands.shape[0],turns.shape))
+
+        if self.rankScores is None:
+            self.buildRankScoreTables()
+
+        faces = hands % 13
+        suites = hands // 13
+        hasTurn = turns >= 0
+        turnFaces = turns % 13
+        turnSuites = np.where(hasTurn,turns // 13,-1) # -1 never matches a suite
+
+        scores = np.where(hasTurn,
+                            self.rankScores[faces[:,0],faces[:,1],faces[:,2],faces[:,3],turnFaces],
+                            self.rankScores_4card[faces[:,0],faces[:,1],faces[:,2],faces[:,3]])
+
+        isFlush = (suites[:,0] == suites[:,1]) & (suites[:,0] == suites[:,2]) & (suites[:,0] == suites[:,3])
+        scores = scores + isFlush*4 + (isFlush & (suites[:,0] == turnSuites))
+
+        # face value of 11 is a jack, faces are 0 indexed here
+        hasKnobs = ((faces == 10) & (suites == turnSuites[:,None])).any(axis=1)
+        scores = scores + hasKnobs
+
+        if self.stats is not None:
+            self.stats.addTime("scorer.score_batch",time.perf_counter()-startTime)
+        return scores.astype(np.int8)
+
+    def _keptHands(self,hand):
+        '''
+        Given the 6 cards the player is dealt, return the 15 possible 4 card hands
+        Returns:
+            * dropIdxs1: np.array (15,) index in hand of the first dropped card
+            * dropIdxs2: np.array (15,) index in hand of the second dropped card, always > dropIdxs1
+            * keptHands: np.array (15,4) the cards kept, in the same order as in hand
+        '''
+        dropIdxs1, dropIdxs2 = np.triu_indices(6,k=1)
+        keep = np.ones((dropIdxs1.shape[0],6),dtype=bool)
+        keep[np.arange(dropIdxs1.shape[0]),dropIdxs1] = False
+        keep[np.arange(dropIdxs1.shape[0]),dropIdxs2] = False
+        keptHands = np.broadcast_to(np.asarray(hand),keep.shape)[keep].reshape(-1,4)
+        return dropIdxs1, dropIdxs2, keptHands
+
+    def buildScoreTable(self,handsPerChunk=20000):
+        '''
+        Compute the score of every (sorted 4 card hand, turn card) pair and store it in
+            self.scoreTable at the index given by scoreTableIndex()
+        '''
+        hands = np.array(list(combinations(range(52),4)),dtype=np.int64) # each row is sorted
+        binomials = np.array(binomial,dtype=np.int64)
+        handRanks = binomials[hands[:,0],1] + binomials[hands[:,1],2] + binomials[hands[:,2],3] + binomials[hands[:,3],4]
+
+        self.scoreTable = np.empty(scoreTableSize,dtype=np.int8)
+        for start in range(0,scoreTableHands,handsPerChunk):
+            chunk = hands[start:start+handsPerChunk]
+            # walk the turn rank past each card in the hand to get the turn cardId
+            turns = np.broadcast_to(np.arange(scoreTableTurns),(chunk.shape[0],scoreTableTurns)).copy()
+            for idx in range(4):
+                turns += turns >= chunk[:,idx,None]
+            
+            scores = self.score_batch(np.repeat(chunk,scoreTableTurns,axis=0),turns.reshape(-1))
+            indices = handRanks[start:start+handsPerChunk,None]*scoreTableTurns + np.arange(scoreTableTurns)
+            self.scoreTable[indices.reshape(-1)] = scores
+
+        self.useScoreTable = True
+
+    def saveScoreTable(self,path):
+        '''
+        Save the score table to a .npy file
+        '''
+        np.save(path,self.scoreTable)
 
+    def loadScoreTable(self,path):
+        '''
+        Load a score table saved with saveScoreTable
+        '''
+        scoreTable = np.load(path)
+        if scoreTable.shape != (scoreTableSize,):
+            raise ValueError("Score table in {} has shape {}, expected ({},)".format(path,scoreTable.shape,scoreTableSize))
+        self.scoreTable = scoreTable
+        self.useScoreTable = True
 
+    def warmCaches(self):
+        '''
+        Fill the pairs and straight caches for every possible 4 and 5 card input
+            * Building the rank score tables scores every multiset of face values, which
+                also covers every multiset of count values
+        '''
+        self.buildRankScoreTables()
 
+    def save(self,path,includeScoreTable=True):
+        '''
+        Warm the caches and save them, the rank score tables and the score table to path
+        includeScoreTable: bool, build the score table first if it has not been built
+        '''
+        from Cribbage.ScorerCache import saveScorerCache
+        self.warmCaches()
+        if includeScoreTable and (self.scoreTable is None):
+            self.buildScoreTable()
+        saveScorerCache(self,path)
 
+    def load(self,path):
+        '''
+        Memory map the tables saved with save() in to this scorer
+        '''
+        from Cribbage.ScorerCache import loadScorerCache
+        tables = loadScorerCache(path)
+        for name, table in tables.items():
+            setattr(self,name,table)
+        if "scoreTable" in tables:
+            self.useScoreTable = True
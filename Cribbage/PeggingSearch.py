@@ -0,0 +1,245 @@
+'''
+Game tree search for the pegging phase of a hand
+
+Pegging only depends on the face values of the cards, so the search works on ranks:
+    * my remaining cards are a sorted tuple of face values
+    * the cards the opponent could be holding are a tuple of 13 counts of the unseen face values
+    * the cards since the last reset only matter through the last face value laid, the number
+        of pairs ending on it and the length of the ascending run ending on it
+
+The opponent's cards are unknown, so their turns are chance nodes (expectimax). The opponent is
+    modelled as holding random unseen cards and laying a random legal one, and they can only
+    'Go' with the probability that none of the cards they hold can be laid.
+
+Values are my pegging points minus the opponent's pegging points for the rest of the hand,
+    scored the same way Game scores them, including the points for a go and for the last card.
+'''
+import time
+from math import comb
+
+from Cribbage.cribbage import cardIdToFaceValue
+from Cribbage.PeggingState import faceToCountValue, pairPoints
+
+# nodes expanded per move by default, the most that keeps a game between 2 search players
+#   under its 50ms in Benchmark.defaultGameBudgets (about 30ms, and 40ms with the expected
+#   value discard), it searches an opening lead 3 plies deep where 50 nodes only reach 2
+defaultNodeBudget = 100
+
+# depth stored in the transposition table for values that were searched to the end of the hand
+_exactDepth = 1000
+
+class _BudgetExceeded(Exception):
+    '''
+    Raised inside the search to unwind it when the node or time budget runs out
+    '''
+    pass
+
+class PeggingSearch:
+    '''
+    Expectimax search over the rest of the pegging with a transposition table
+    The table is keyed on the count, the run/pair state and the remaining ranks, so it
+        is valid across moves and hands. It is cleared when it grows past maxTableSize
+    '''
+
+    def __init__(self, nodeBudget=defaultNodeBudget, timeBudget=None, maxDepth=16, maxTableSize=200000):
+        '''
+        nodeBudget: int or None, maximum nodes expanded per move
+        timeBudget: float or None, maximum seconds spent per move
+        maxDepth: int, deepest iteration of the iterative deepening, in plays and gos
+        maxTableSize: int, number of transposition table entries to keep before clearing it
+        '''
+        self.nodeBudget = nodeBudget
+        self.timeBudget = timeBudget
+        self.maxDepth = maxDepth
+        self.maxTableSize = maxTableSize
+        self.table = {}
+        self.nodes = 0
+        self.depthReached = 0
+        self._cutoffs = 0
+        self._deadline = None
+
+    def bestPlay(self, myFaces, pool, oppLeft, count, lastFace=0, pairCount=0, runLength=0,
+                 lastWasGo=False, inGo=False, oppBlocked=False):
+        '''
+        Choose the face value to lay on my turn
+        myFaces: sorted tuple of face values still in my hand
+        pool: tuple of 13 counts of the unseen cards, index is face value - 1
+        oppLeft: number of cards the opponent has not laid
+        count: current total on the table
+        lastWasGo, inGo: the go flags of Game
+        oppBlocked: the opponent called a go since the last reset, so cannot lay a card
+        Returns (face, value) where face is None for a go
+            * value is the expected pegging differential of the best play from the deepest finished iteration
+        '''
+        values = self.playValues(myFaces,pool,oppLeft,count,lastFace,pairCount,runLength,lastWasGo,inGo,oppBlocked)
+        if len(values) == 0:
+            return None, None
+        faces = list(values)
+        if values[faces[0]] is None:
+            return faces[0], None
+        face = max(faces,key=values.__getitem__)
+        return face, values[face]
+
+    def playValues(self, myFaces, pool, oppLeft, count, lastFace=0, pairCount=0, runLength=0,
+                   lastWasGo=False, inGo=False, oppBlocked=False):
+        '''
+        Value every face value I can lay, takes the same arguments as bestPlay
+        Returns dict of face value to the expected pegging differential of laying it, in
+            ascending order of face value, from the deepest finished iteration
+            * empty for a go
+            * the values are None when only one face can be laid, or no iteration finished
+        '''
+        playable = sorted({face for face in myFaces if count + faceToCountValue[face] <= 31})
+        if len(playable) <= 1:
+            return {face:None for face in playable}
+
+        if len(self.table) > self.maxTableSize:
+            self.table.clear()
+
+        self.nodes = 0
+        self.depthReached = 0
+        self._deadline = None if self.timeBudget is None else time.perf_counter() + self.timeBudget
+
+        values = [None]*len(playable)
+        for depth in range(1,self.maxDepth+1):
+            self._cutoffs = 0
+            try:
+                values = [self._play(face,myFaces,pool,oppLeft,count,lastFace,pairCount,runLength,
+                                     True,inGo,oppBlocked,depth) for face in playable]
+            except _BudgetExceeded:
+                break
+            self.depthReached = depth
+            if self._cutoffs == 0: # searched to the end of the hand, deeper iterations are the same
+                break
+        return dict(zip(playable,values))
+
+    def _play(self, face, myFaces, pool, oppLeft, count, lastFace, pairCount, runLength, myTurn, inGo, oppBlocked, depth):
+        '''
+        Value of laying face, from my point of view
+            * myTurn is who lays the card, the other player moves next
+        '''
+        # playPoints inlined, this is the inner loop of the search
+        newCount = count + faceToCountValue[face]
+        newPairCount = pairCount + 1 if face == lastFace else 0
+        newRunLength = runLength + 1 if face == lastFace + 1 else 1
+        points = pairPoints[newPairCount]
+        if newRunLength >= 3:
+            points += newRunLength
+        if newCount == 15:
+            points += 2
+        elif newCount == 31: # 31 resets the table
+            points += 2
+            newCount, newPairCount, newRunLength = 0, 0, 0
+            oppBlocked = False
+
+        if myTurn:
+            if oppLeft == 0 and len(myFaces) == 1:
+                return points + 1 # point for the last card
+        else:
+            points = -points
+            if oppLeft == 1 and len(myFaces) == 0:
+                return points - 1
+        if depth <= 1:
+            self._cutoffs += 1
+            return points
+
+        if myTurn:
+            idx = myFaces.index(face)
+            myFaces = myFaces[:idx] + myFaces[idx+1:]
+        else:
+            pool = pool[:face-1] + (pool[face-1]-1,) + pool[face:]
+            oppLeft -= 1
+        newLastFace = face if newCount > 0 else 0
+        return points + self._value(myFaces,pool,oppLeft,newCount,newLastFace,newPairCount,newRunLength,not myTurn,False,inGo,oppBlocked,depth-1)
+
+    def _go(self, myFaces, pool, oppLeft, count, lastFace, pairCount, runLength, myTurn, lastWasGo, inGo, oppBlocked, depth):
+        '''
+        Value of the player whose turn it is calling a go, from my point of view
+        '''
+        points = 0
+        if lastWasGo: # neither player can lay, reset the table
+            count, lastFace, pairCount, runLength = 0, 0, 0, 0
+            lastWasGo, inGo, oppBlocked = False, False, False
+        else:
+            if not inGo: # the other player gets a point for the go
+                points = -1 if myTurn else 1
+            lastWasGo, inGo = True, True
+            if not myTurn:
+                oppBlocked = True
+        if depth > 1:
+            points += self._value(myFaces,pool,oppLeft,count,lastFace,pairCount,runLength,not myTurn,lastWasGo,inGo,oppBlocked,depth-1)
+        else:
+            self._cutoffs += 1
+        return points
+
+    def _value(self, myFaces, pool, oppLeft, count, lastFace, pairCount, runLength, myTurn, lastWasGo, inGo, oppBlocked, depth):
+        '''
+        Expected value of the state for the player whose turn it is, from my point of view
+        '''
+        key = (count,lastFace,pairCount,runLength,myFaces,pool,oppLeft,myTurn,lastWasGo,inGo,oppBlocked)
+        entry = self.table.get(key)
+        if entry is not None and entry[0] >= depth:
+            if entry[0] != _exactDepth:
+                self._cutoffs += 1
+            return entry[1]
+
+        self.nodes += 1
+        if self.nodeBudget is not None and self.nodes > self.nodeBudget:
+            raise _BudgetExceeded()
+        if self._deadline is not None and (self.nodes & 255) == 0 and time.perf_counter() > self._deadline:
+            raise _BudgetExceeded()
+
+        cutoffs = self._cutoffs
+        if myTurn:
+            value = None
+            for face in set(myFaces):
+                if count + faceToCountValue[face] <= 31:
+                    playValue = self._play(face,myFaces,pool,oppLeft,count,lastFace,pairCount,runLength,True,inGo,oppBlocked,depth)
+                    if value is None or playValue > value:
+                        value = playValue
+            if value is None:
+                value = self._go(myFaces,pool,oppLeft,count,lastFace,pairCount,runLength,True,lastWasGo,inGo,oppBlocked,depth)
+        else:
+            value = 0.
+            pPlay = 0.
+            if oppLeft > 0 and not oppBlocked:
+                maxCount = 31 - count
+                unseen = sum(pool)
+                maxFace = 13 if maxCount >= 10 else maxCount
+                playable = sum(pool[:maxFace])
+                if playable > 0:
+                    pPlay = 1. - comb(unseen-playable,oppLeft)/comb(unseen,oppLeft)
+                    for faceIdx in range(maxFace):
+                        if pool[faceIdx] > 0:
+                            value += pool[faceIdx]*self._play(faceIdx+1,myFaces,pool,oppLeft,count,lastFace,pairCount,runLength,False,inGo,oppBlocked,depth)
+                    value *= pPlay/playable
+            if pPlay < 1.:
+                value += (1.-pPlay)*self._go(myFaces,pool,oppLeft,count,lastFace,pairCount,runLength,False,lastWasGo,inGo,oppBlocked,depth)
+
+        self.table[key] = (_exactDepth if self._cutoffs == cutoffs else depth, value)
+        return value
+
+def searchStateForPlayer(hand, cardsPlayedMask, knownCards, peggingState):
+    '''
+    Build the bestPlay arguments for a player from the table
+    hand: the 4 cardIds kept by the player
+    cardsPlayedMask: flags for the cards in hand that have been laid
+    knownCards: every cardId the player has seen in their own hand, including their discards
+    peggingState: PeggingState of the table
+    Returns a dict of keyword arguments for PeggingSearch.bestPlay
+        * the other player cannot lay if they just called a go, or called one earlier and
+            only the player's own cards have been laid since
+    '''
+    cardsPlayed = peggingState.cardsPlayed
+    myFaces = tuple(sorted(cardIdToFaceValue[cardId] for cardId, played in zip(hand,cardsPlayedMask) if not played))
+    seen = set(knownCards)
+    seen.update(cardsPlayed)
+    pool = [4]*13
+    for cardId in seen:
+        pool[cardIdToFaceValue[cardId]-1] -= 1
+    oppLeft = 4 - sum(1 for cardId in cardsPlayed if cardId not in hand)
+    oppBlocked = peggingState.lastPlayWasGo or \
+        (peggingState.inGoState and peggingState.cardsSinceReset > 0 and cardsPlayed[-1] in hand)
+    return dict(myFaces=myFaces, pool=tuple(pool), oppLeft=oppLeft, count=peggingState.cardTotal,
+                lastFace=peggingState.lastFace, pairCount=peggingState.pairCount, runLength=peggingState.runLength,
+                lastWasGo=peggingState.lastPlayWasGo, inGo=peggingState.inGoState, oppBlocked=oppBlocked)
@@ -0,0 +1,147 @@
+'''
+Incremental state of the table during pegging
+
+Scoring the next card only needs the count, the last face value laid, the number of pairs
+    ending on it and the length of the ascending run ending on it, so laying a card is O(1)
+    instead of rescanning every card played since the last reset.
+'''
+from Cribbage.cribbage import cardIdToFaceValue, cardIdToCountValue
+
+faceToCountValue = [0] + [min(face,10) for face in range(1,14)]
+pairPoints = [0,2,6,12]
+
+# kinds of the undo history records, (kind, fields before the change)
+_playRecord = 0
+_goRecord = 1
+
+def playPoints(count, lastFace, pairCount, runLength, face):
+    '''
+    Score laying a card with face value face onto the table
+    Returns (points, newCount, newLastFace, newPairCount, newRunLength)
+        * runs only count in ascending order of play
+        * a 31 resets the count and the run/pair state
+    '''
+    newCount = count + faceToCountValue[face]
+    newPairCount = pairCount + 1 if face == lastFace else 0
+    newRunLength = runLength + 1 if face == lastFace + 1 else 1
+    points = pairPoints[newPairCount]
+    if newRunLength >= 3:
+        points += newRunLength
+    if newCount == 15:
+        points += 2
+    elif newCount == 31:
+        return points + 2, 0, 0, 0, 0
+    return points, newCount, face, newPairCount, newRunLength
+
+class PeggingState:
+    '''
+    Cards on the table during pegging, updated one card or go at a time
+    Every change can be reverted with undo(), so a search can play a line and back out of it
+    '''
+    __slots__ = ('cardsPlayed','cardTotal','cardsSinceReset','lastFace','pairCount','runLength',
+                 'lastPlayWasGo','inGoState','_history')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        '''
+        Clear the table for a new hand
+        '''
+        self.cardsPlayed = [] # cardIds of all the cards shown, in order of play
+        self.cardTotal = 0 # current total of the cards
+        self.cardsSinceReset = 0 # the number of cards since 31 or since a reset from a 'go'
+        self.lastFace = 0 # face value of the last card since the reset, 0 for none
+        self.pairCount = 0 # number of pairs in a row ending on the last card
+        self.runLength = 0 # length of the ascending run ending on the last card
+        self.lastPlayWasGo = False # the last player called a 'go'
+        self.inGoState = False # a player has called a 'go' and the other is still laying
+        self._history = []
+
+    @classmethod
+    def fromTable(cls, cardsPlayed, cardsSinceReset, lastPlayWasGo=False, inGoState=False):
+        '''
+        Build the state from a list of cards played and the number of cards since the last reset
+        '''
+        state = cls()
+        state.cardsPlayed = list(cardsPlayed)
+        state.cardsSinceReset = cardsSinceReset
+        if cardsSinceReset > 0:
+            for cardId in state.cardsPlayed[-cardsSinceReset:]:
+                _, state.cardTotal, state.lastFace, state.pairCount, state.runLength = \
+                    playPoints(state.cardTotal,state.lastFace,state.pairCount,state.runLength,cardIdToFaceValue[cardId])
+        state.lastPlayWasGo = lastPlayWasGo
+        state.inGoState = inGoState
+        return state
+
+    def copy(self):
+        '''
+        Return a copy of the state, the undo history is not copied
+        '''
+        state = PeggingState.__new__(PeggingState)
+        state.cardsPlayed = self.cardsPlayed.copy()
+        state.cardTotal = self.cardTotal
+        state.cardsSinceReset = self.cardsSinceReset
+        state.lastFace = self.lastFace
+        state.pairCount = self.pairCount
+        state.runLength = self.runLength
+        state.lastPlayWasGo = self.lastPlayWasGo
+        state.inGoState = self.inGoState
+        state._history = []
+        return state
+
+    def canPlay(self, cardId):
+        '''
+        True if the card can be laid without going over 31
+        '''
+        return self.cardTotal + cardIdToCountValue[cardId] <= 31
+
+    def pointsFor(self, cardId):
+        '''
+        Points for laying cardId, without changing the state
+        '''
+        return playPoints(self.cardTotal,self.lastFace,self.pairCount,self.runLength,cardIdToFaceValue[cardId])[0]
+
+    def play(self, cardId):
+        '''
+        Lay a card and return the points it scores for pairs, runs, 15 and 31
+        A 31 resets the count, but not the go flags, the same as Game always has
+        '''
+        self._history.append((_playRecord,(self.cardTotal,self.cardsSinceReset,self.lastFace,self.pairCount,
+                                            self.runLength,self.lastPlayWasGo,self.inGoState)))
+        points, self.cardTotal, self.lastFace, self.pairCount, self.runLength = \
+            playPoints(self.cardTotal,self.lastFace,self.pairCount,self.runLength,cardIdToFaceValue[cardId])
+        self.cardsPlayed.append(cardId)
+        self.cardsSinceReset = 0 if self.cardTotal == 0 else self.cardsSinceReset + 1
+        self.lastPlayWasGo = False
+        return points
+
+    def go(self):
+        '''
+        The player to lay cannot, return the points the other player gets for the 'go'
+            * the first go of a go state scores 1 for the other player
+            * a go right after a go means neither player can lay, so the table resets
+        '''
+        self._history.append((_goRecord,(self.cardTotal,self.cardsSinceReset,self.lastFace,self.pairCount,
+                                          self.runLength,self.lastPlayWasGo,self.inGoState)))
+        if self.lastPlayWasGo:
+            self.cardTotal = 0
+            self.cardsSinceReset = 0
+            self.lastFace, self.pairCount, self.runLength = 0, 0, 0
+            self.lastPlayWasGo = False
+            self.inGoState = False
+            return 0
+        points = 0 if self.inGoState else 1
+        self.lastPlayWasGo = True
+        self.inGoState = True
+        return points
+
+    def undo(self):
+        '''
+        Revert the last play() or go()
+        '''
+        kind, fields = self._history.pop()
+        if kind == _playRecord:
+            self.cardsPlayed.pop()
+        (self.cardTotal,self.cardsSinceReset,self.lastFace,self.pairCount,
+            self.runLength,self.lastPlayWasGo,self.inGoState) = fields
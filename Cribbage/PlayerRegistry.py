@@ -0,0 +1,168 @@
+'''
+Registry of the player types that Game and Tournament can create by name
+
+A player type is a name mapped to:
+    * the player class, or a "module:Class" path that is only imported when the first
+        player of that type is created, so a worker only imports the strategies it plays
+        * the classes in Players register themselves with the @registerPlayer decorator,
+            the modules in playerModules are only imported when a name is not registered yet
+    * default constructor parameters, such as search budgets
+    * shared resources, constructor parameters built once per process and passed to every
+        player of that type with the same shared parameters, such as search tables
+        * sharedParams names the parameters passed to the factories, such as the search
+            budgets, the player's other parameters are only passed to the player
+        * only used when the spec sets "shareResources", a shared table makes a game depend
+            on the games played before it in the process, so seeded games are no longer repeatable
+
+Players are created from a spec that can be pickled or written to JSON:
+    * "searchpegging", just the name with the default parameters
+    * {"type": "searchpegging", "nodeBudget": 500}, the name and parameters to override
+    * {"type": "searchpegging", "shareResources": True}, players share the search table
+'''
+import importlib
+
+class PlayerType:
+    '''
+    A registered player type
+    '''
+
+    def __init__(self, name, playerClass, shared=None, sharedParams=(), defaultParams=None):
+        '''
+        name: str, lowercase name used in specs
+        playerClass: class or "module:Class" path
+        shared: dict of parameter name to a factory (callable or "module:callable" path),
+            the factory is called with the player's sharedParams as keyword arguments
+        sharedParams: names of the parameters passed to the factories, the shared resources
+            are keyed on their values
+        defaultParams: dict of constructor parameters
+        '''
+        self.name = name
+        self.playerClass = playerClass
+        self.shared = shared if shared is not None else {}
+        self.sharedParams = tuple(sharedParams)
+        self.defaultParams = defaultParams if defaultParams is not None else {}
+
+    def resolveClass(self):
+        '''
+        Return the player class, importing it the first time for a "module:Class" path
+        '''
+        if isinstance(self.playerClass,str):
+            self.playerClass = _resolvePath(self.playerClass)
+        return self.playerClass
+
+_registry = {}
+_sharedResources = {}
+
+# Modules whose classes register themselves with @registerPlayer, they are imported the
+#   first time a name that is not registered yet is used
+playerModules = ["Cribbage.Players"]
+
+def _resolvePath(path):
+    '''
+    Import "module:attribute" and return the attribute
+    '''
+    moduleName, attributeName = path.split(":")
+    return getattr(importlib.import_module(moduleName),attributeName)
+
+def registerPlayer(name, playerClass=None, shared=None, sharedParams=(), **defaultParams):
+    '''
+    Register a player type under name, replacing any earlier type with the same name
+    playerClass: class or "module:Class" path
+        * None returns a decorator, so a class can register itself:
+            @registerPlayer("myplayer", nodeBudget=100)
+            class MyPlayer(RandomPlayer): ...
+    shared: dict of parameter name to factory for resources shared across players
+    sharedParams: names of the parameters passed to the shared factories
+    defaultParams: constructor parameters for players of this type
+    '''
+    if playerClass is None:
+        def decorator(cls):
+            registerPlayer(name,cls,shared,sharedParams,**defaultParams)
+            return cls
+        return decorator
+    _registry[name.lower()] = PlayerType(name.lower(),playerClass,shared,sharedParams,defaultParams)
+    return playerClass
+
+def unregisterPlayer(name):
+    '''
+    Remove the player type registered under name, if there is one
+    '''
+    _registry.pop(name.lower(),None)
+
+def _importPlayerModules():
+    '''
+    Import the modules in playerModules so their classes register themselves
+    '''
+    for moduleName in playerModules:
+        importlib.import_module(moduleName)
+
+def playerTypes():
+    '''
+    Return the sorted names of the registered player types, including the ones in playerModules
+    '''
+    _importPlayerModules()
+    return sorted(_registry)
+
+def _lookup(typeName):
+    '''
+    Return the PlayerType registered as typeName, importing the module that registers it
+    '''
+    if typeName not in _registry:
+        _importPlayerModules()
+    if typeName not in _registry:
+        raise ValueError("Invalid player type {}, options are {}".format(typeName,playerTypes()))
+    return _registry[typeName]
+
+def parseSpec(spec):
+    '''
+    Split a player spec into (typeName, params)
+    '''
+    if isinstance(spec,str):
+        return spec.lower(), {}
+    if isinstance(spec,dict) and "type" in spec:
+        params = dict(spec)
+        return params.pop("type").lower(), params
+    raise ValueError("Invalid player spec {}, must be a name or a dict with a 'type'".format(spec))
+
+def specName(spec):
+    '''
+    Short readable name for a spec, for printing results
+    '''
+    typeName, params = parseSpec(spec)
+    if len(params) == 0:
+        return typeName
+    return "{}({})".format(typeName,",".join("{}={}".format(key,params[key]) for key in sorted(params)))
+
+def sharedResource(key, factory):
+    '''
+    Return the resource stored under key, calling factory() to build it the first time
+        * resources live for the whole process, so they are shared by every game it plays
+    '''
+    if key not in _sharedResources:
+        _sharedResources[key] = factory()
+    return _sharedResources[key]
+
+def clearSharedResources():
+    '''
+    Drop every shared resource, the next players created build new ones
+    '''
+    _sharedResources.clear()
+
+def createPlayer(spec, name="Player"):
+    '''
+    Create a player from a spec, see the module docstring
+    name: the player's name
+    '''
+    typeName, params = parseSpec(spec)
+    playerType = _lookup(typeName)
+    shareResources = params.pop("shareResources",False)
+    params = {**playerType.defaultParams, **params}
+
+    kwargs = dict(params)
+    sharedParams = {paramName:params[paramName] for paramName in playerType.sharedParams if paramName in params}
+    for paramName, factory in (playerType.shared.items() if shareResources else ()):
+        if isinstance(factory,str):
+            factory = _resolvePath(factory)
+        key = (typeName,paramName,repr(sorted(sharedParams.items())))
+        kwargs[paramName] = sharedResource(key,lambda: factory(**sharedParams))
+    return playerType.resolveClass()(name=name,**kwargs)
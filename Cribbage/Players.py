@@ -1,7 +1,18 @@
 from Cribbage.cribbage import cardIdToCountValue, cardIdToFaceValue
-
+from Cribbage.CribEquity import cribEquity
+from Cribbage.DiscardOptimizer import getDiscardOptimizer
+from Cribbage.PeggingSearch import PeggingSearch, defaultNodeBudget, searchStateForPlayer
+from Cribbage.PeggingState import PeggingState
+from Cribbage.PlayerRegistry import registerPlayer
+from Cribbage.WinProbability import getWinProbabilityTable
+
+import math
 import numpy as np
 
+# the search players can share one transposition table per process and budget, see PlayerRegistry
+_searchShared = {"peggingSearch":PeggingSearch}
+_searchSharedParams = ("nodeBudget","timeBudget")
+
 class Player:
     '''
     Defines a type of player
@@ -12,6 +23,8 @@ class Player:
     def __init__(self,name):
 
         self.name = name
+        self.myScore = 0
+        self.opponentScore = 0
         self.resetHands()
 
     def resetHands(self):
@@ -20,8 +33,16 @@ class Player:
         '''
         self.hand = None
         self.crib = None
+        self.dealtCards = None # the 6 cards dealt, set by deal
         self.cardsPlayedMask = [False,False,False,False]
 
+    def updateScores(self,myScore,opponentScore):
+        '''
+        Game passes the scores before the deal and before every card the player lays
+        '''
+        self.myScore = myScore
+        self.opponentScore = opponentScore
+
     def chooseHand(self,cardsDealt,isDealer):
         '''
         Player chooses what cards to keep in their hand and which to pass to the crib
@@ -35,6 +56,20 @@ class Player:
         '''
         raise NotImplementedError("deal must be implemented in subclass")
 
+    def _discard(self,handIdxs,isDealer):
+        '''
+        Put the cards at handIdxs of the 6 card hand in the crib, called at the end of deal
+        Returns the 2 cards for the other player's crib in the order they were dealt, or None
+            when the player is the dealer and keeps them in their own crib
+        '''
+        cardsForCrib = [self.hand[min(handIdxs)],self.hand[max(handIdxs)]]
+        del self.hand[max(handIdxs)]
+        del self.hand[min(handIdxs)]
+        if isDealer:
+            self.recieveCardsForCrib(cardsForCrib)
+            return None
+        return cardsForCrib
+
     def recieveCardsForCrib(self,cards):
         '''
         Take in cards from other player to be in this crib
@@ -44,13 +79,16 @@ class Player:
         else:
             self.crib.extend(cards)
     
-    def playCard(self,cardsPlayed,cardsTotal,cardsSinceReset):
+    def playCard(self,cardsPlayed,cardsTotal,cardsSinceReset,peggingState=None):
         '''
         return the next card to be played. 
         This function must return a card that brings the total to <= 31
+        peggingState: PeggingState of the table shared by Game, players must not change it,
+            copy() it to try out plays
         '''
         raise NotImplementedError("playCard must be implemented in subclass")
 
+@registerPlayer("random")
 class RandomPlayer(Player):
     '''
     Player that makes random choices in the game
@@ -63,16 +101,11 @@ class RandomPlayer(Player):
         '''
         Draw a hand from the deck, then return a random 2 cards for the crib
         '''
-        self.hand = deck.getCards(4)
-
-        cardsForCrib = deck.getCards(2)
-        if isDealer:
-            self.recieveCardsForCrib(cardsForCrib)
-            return None
-        else:
-            return cardsForCrib
+        self.hand = deck.getCards(6)
+        self.dealtCards = self.hand.copy()
+        return self._discard([4,5],isDealer) # keeps the first 4 cards dealt
 
-    def playCard(self,cardsPlayed,cardsTotal,cardsSinceReset):
+    def playCard(self,cardsPlayed,cardsTotal,cardsSinceReset,peggingState=None):
         '''
         Random player returns the next card that makes the total <= 31
         '''
@@ -86,6 +119,7 @@ class RandomPlayer(Player):
         # unable to play any cards, return None to signal a Go
         return None
 
+@registerPlayer("best4cardhand")
 class Best4CardHandPlayer(RandomPlayer):
     '''
     Player chooses which cards to keep based on keeping the most points in
@@ -98,23 +132,17 @@ class Best4CardHandPlayer(RandomPlayer):
         Draw a hand from the deck, then return a random 2 cards for the crib
         '''
         self.hand = deck.getCards(6)
+        self.dealtCards = self.hand.copy()
         result = scorer.scorePossible4CardHand(self.hand)
         handIdxs = result['dropForBestHand'][:2]
         
         # debugging use only
         self._scorer_output = result
-        self.originalDealtHand = self.hand.copy() # debug use only
         self.predictedScore = result['dropForBestHand'][-1]
 
-        cardsForCrib = []
-        cardsForCrib.append(self.hand.pop(max(handIdxs)))
-        cardsForCrib.append(self.hand.pop(min(handIdxs)))
-        if isDealer:
-            self.recieveCardsForCrib(cardsForCrib)
-            return None
-        else:
-            return cardsForCrib
+        return self._discard(handIdxs,isDealer)
 
+@registerPlayer("bestminimalscore")
 class BestMinimalScorePlayer(RandomPlayer):
     '''
     Player starts by finding the best 4 cards to keep without consideration for the turn card.
@@ -125,24 +153,18 @@ class BestMinimalScorePlayer(RandomPlayer):
     '''
     def deal(self,deck,isDealer,scorer):
         self.hand = deck.getCards(6)
+        self.dealtCards = self.hand.copy()
 
         result = scorer.scorePossible5CardHand(self.hand)
         handIdxs = result['dropForBestHand'][:2]
         
         # debugging use only
         self._scorer_output = result
-        self.originalDealtHand = self.hand.copy() # debug use only
         self.predictedScore = result['dropForBestHand'][-1]
 
-        cardsForCrib = []
-        cardsForCrib.append(self.hand.pop(max(handIdxs)))
-        cardsForCrib.append(self.hand.pop(min(handIdxs)))
-        if isDealer:
-            self.recieveCardsForCrib(cardsForCrib)
-            return None
-        else:
-            return cardsForCrib 
+        return self._discard(handIdxs,isDealer)
 
+@registerPlayer("besthandandcrib")
 class BestHandAndCribPlayer(RandomPlayer):
     '''
     This player chooses which cards to keep in their hand by:
@@ -156,19 +178,19 @@ class BestHandAndCribPlayer(RandomPlayer):
     '''
 
     def deal(self, deck, isDealer, scorer):
-
         self.hand = deck.getCards(6)
+        self.dealtCards = self.hand.copy()
 
         # first find the hand with the best minimal score when considering the turn card
         handResult = scorer.scorePossible5CardHand(self.hand)
-        cribResult = scorer.scorePossibleCribHands(self.hand)
+        cribResult = scorer.scorePossibleCribHands(self.hand,includeScoreMap=False)
 
         # If the player is the dealer then they get the crib, so the score adds to theirs,
         # If the other player is dealer we effectively loose those points
         if isDealer:
-            minimumMap = handResult['mins'] + cribResult['scoreMap'].mean(axis=(-2,-1)).min()
+            minimumMap = handResult['mins'] + cribResult['means'].min()
         else:
-            minimumMap = handResult['mins'] - cribResult['scoreMap'].mean(axis=(-2,-1)).min()
+            minimumMap = handResult['mins'] - cribResult['means'].min()
 
         sortedIdxsFlat = np.argsort(minimumMap.flatten())[:-15] # last 15 will always be masked off as np.NaN
         sortedIdxs = np.unravel_index(sortedIdxsFlat,minimumMap.shape)
@@ -176,18 +198,65 @@ class BestHandAndCribPlayer(RandomPlayer):
         
         # debugging use only
         self._scorer_output = minimumMap # debug use only
-        self.originalDealtHand = self.hand.copy() # debug use only
         self.predictedScore = minimumMap[sortedIdxs[0][-1],sortedIdxs[1][-1]] # debug use only
 
-        cardsForCrib = []
-        cardsForCrib.append(self.hand.pop(max(handIdxs)))
-        cardsForCrib.append(self.hand.pop(min(handIdxs)))
-        if isDealer:
-            self.recieveCardsForCrib(cardsForCrib)
-            return None
-        else:
-            return cardsForCrib
+        return self._discard(handIdxs,isDealer)
        
+@registerPlayer("besthandandcribequity")
+class BestHandAndCribEquityPlayer(RandomPlayer):
+    '''
+    This player chooses which cards to keep in their hand by:
+        * Minimum score of the kept hand when considering the turn card
+        * Plus the expected crib points of the discard from the precomputed crib equity table
+            * The table is signed, so points given to the other players crib are subtracted
+    '''
+
+    def deal(self, deck, isDealer, scorer):
+        self.hand = deck.getCards(6)
+        self.dealtCards = self.hand.copy()
+
+        handResult = scorer.scorePossible5CardHand(self.hand)
+
+        cribMap = np.zeros((5,6),dtype=np.float32) # cannot have option 5,5 so just ignore it all together. 
+        cribMap[:] = np.NaN
+        for ii in range(6):
+            for jj in range(ii+1,6):
+                cribMap[ii,jj] = cribEquity([self.hand[ii],self.hand[jj]],isDealer)
+        totalMap = handResult['mins'] + np.ma.masked_invalid(cribMap)
+
+        sortedIdxsFlat = np.argsort(totalMap.flatten())[:-15] # last 15 will always be masked off as np.NaN
+        sortedIdxs = np.unravel_index(sortedIdxsFlat,totalMap.shape)
+        handIdxs = [sortedIdxs[0][-1],sortedIdxs[1][-1]]
+        
+        # debugging use only
+        self._scorer_output = totalMap # debug use only
+        self.predictedScore = totalMap[sortedIdxs[0][-1],sortedIdxs[1][-1]] # debug use only
+
+        return self._discard(handIdxs,isDealer)
+
+@registerPlayer("bestexpectedvalue")
+class BestExpectedValuePlayer(RandomPlayer):
+    '''
+    Player keeps the hand with the highest exact expected points, the expected points of the
+        hand over every turn card plus (dealer) or minus (not dealer) the expected points
+        of the crib over every turn card and every pair of cards the other player could add
+    '''
+
+    def deal(self, deck, isDealer, scorer):
+
+        self.hand = deck.getCards(6)
+        self.dealtCards = self.hand.copy()
+
+        result = getDiscardOptimizer(scorer).scorePossibleDiscards(self.hand,isDealer)
+        handIdxs = result['dropForBestHand'][:2]
+
+        # debugging use only
+        self._scorer_output = result
+        self.predictedScore = result['dropForBestHand'][-1]
+
+        return self._discard(handIdxs,isDealer)
+
+@registerPlayer("scorepegging")
 class ScorePeggingPlayer(RandomPlayer):
     '''
     Player trie to score the following:
@@ -198,11 +267,10 @@ class ScorePeggingPlayer(RandomPlayer):
     * Pairs
     '''
 
-    def playCard(self,cardsPlayed,cardsTotal,cardsSinceReset):
+    def playCard(self,cardsPlayed,cardsTotal,cardsSinceReset,peggingState=None):
         '''
         Try to score the most points possible, so the order is 4 of a kind, largest possible straight, 3 of a kind, other straights, 15s, 31, then pairs
         '''
-        valuesFacePlayed = [cardIdToFaceValue[cardId] for cardId in cardsPlayed][::-1] # want the order reversed to make it easier to iterate through
         #valuesFaceHand = [] # list of the face values in the hand that can be played
         #valuesCountHand = [] # list of the count values in the hand that can be played
         valuesFaceHandToIdxInHand = {} # map face value (number represeting numeric or J/Q/K/A) to index in hand
@@ -223,31 +291,20 @@ class ScorePeggingPlayer(RandomPlayer):
         if len(valuesCountHandToIdxInHand) == 0: # cannot play anything, so 'Go'
             return None
         
+        if peggingState is None:
+            peggingState = PeggingState.fromTable(cardsPlayed,cardsSinceReset)
+
         # Check for pairs
-        playedMatching = 1 # kind of wierd, Tracks the number of cards matching the last layed card and the last layed card matches itself
-        cardForPair = None
-        for idx in range(cardsSinceReset-1):
-            if valuesFacePlayed[idx] == valuesFacePlayed[idx+1]:
-                if playedMatching == 1: # first match, so set values
-                    playedMatching = 2
-                    cardForPair = valuesFacePlayed[idx]
-                else:
-                    playedMatching += 1
-            else:
-                break
+        playedMatching = peggingState.pairCount + 1 # kind of wierd, Tracks the number of cards matching the last layed card and the last layed card matches itself
+        cardForPair = peggingState.lastFace if peggingState.pairCount > 0 else None
         
         # check for straights
-        playedStraight = -1
-        cardForStraight = None
-        for idx in range(cardsSinceReset-1):
-            if valuesFacePlayed[idx] == (valuesFacePlayed[idx+1]+1):
-                if playedStraight < 0:
-                    playedStraight = 2 # first match gives a run of 2
-                    cardForStraight = valuesFacePlayed[idx] + 1 # a run of 2 exists, so set the required card to continue the straight
-                else:
-                    playedStraight += 1 # subsequent matchs add to the length of the run                    
-            else:
-                break
+        if peggingState.runLength >= 2:
+            playedStraight = peggingState.runLength
+            cardForStraight = peggingState.lastFace + 1 # set the required card to continue the straight
+        else:
+            playedStraight = -1
+            cardForStraight = None
     
         if cardsTotal < 15:
             cardFor15 = 15 - cardsTotal
@@ -285,12 +342,14 @@ class ScorePeggingPlayer(RandomPlayer):
         self.cardsPlayedMask[idx] = True # mark as played
         return self.hand[idx]
 
+@registerPlayer("besthandandcribandscorepegging")
 class BestHandAndCribAndScorePeggingPlayer(BestHandAndCribPlayer,ScorePeggingPlayer):
     '''
     Combines the ScorePegging player and the BestHandAndCrib player
     '''
     pass
 
+@registerPlayer("bestminimalhandandscorepegging")
 class BestMinimalHandAndScorePeggingPlayer(BestMinimalScorePlayer,ScorePeggingPlayer):
     '''
     Combines the ScorePegging player and the BestMinimalScorePlayer
@@ -298,104 +357,156 @@ class BestMinimalHandAndScorePeggingPlayer(BestMinimalScorePlayer,ScorePeggingPl
 
     def deal(self,deck,isDealer,scorer):
         self.hand = deck.getCards(6)
+        self.dealtCards = self.hand.copy()
 
         result = scorer.scorePossible5CardHand(self.hand)
         handIdxs = result['dropForBestHand'][:2]
         
         # debugging use only
         self._scorer_output = result
-        self.originalDealtHand = self.hand.copy() # debug use only
         self.predictedScore = result['dropForBestHand'][-1]
 
-        cardsForCrib = []
-        cardsForCrib.append(self.hand.pop(max(handIdxs)))
-        cardsForCrib.append(self.hand.pop(min(handIdxs)))
-        if isDealer:
-            self.recieveCardsForCrib(cardsForCrib)
-            return None
-        else:
-            return cardsForCrib 
-       
-    def playCard(self,cardsPlayed,cardsTotal,cardsSinceReset):
+        return self._discard(handIdxs,isDealer)
+
+@registerPlayer("bestexpectedvalueandscorepegging")
+class BestExpectedValueAndScorePeggingPlayer(BestExpectedValuePlayer,ScorePeggingPlayer):
+    '''
+    Combines the ScorePegging player and the BestExpectedValue player
+    '''
+    pass
+
+@registerPlayer("searchpegging",shared=_searchShared,sharedParams=_searchSharedParams,nodeBudget=defaultNodeBudget,timeBudget=None)
+class SearchPeggingPlayer(RandomPlayer):
+    '''
+    Player lays the card with the best expected pegging differential for the rest of the hand
+        found by an expectimax search over the cards the other player could be holding
+    Chooses the cards to keep randomly
+    '''
+
+    def __init__(self,name,nodeBudget=defaultNodeBudget,timeBudget=None,peggingSearch=None):
         '''
-        Try to score the most points possible, so the order is 4 of a kind, largest possible straight, 3 of a kind, other straights, 15s, 31, then pairs
+        nodeBudget, timeBudget: per move budgets of the search
+        peggingSearch: PeggingSearch to use instead of creating one, so its table can be shared
         '''
-        valuesFacePlayed = [cardIdToFaceValue[cardId] for cardId in cardsPlayed][::-1] # want the order reversed to make it easier to iterate through
-        valuesFaceHandToIdxInHand = {} # map face value (number represeting numeric or J/Q/K/A) to index in hand
-        valuesCountHandToIdxInHand = {} # map count value (A=1, J/Q/K=10) to index in hand
-        for idx, cardId in enumerate(self.hand):
-            valueFace = cardIdToFaceValue[cardId]
-            valueCount = cardIdToCountValue[cardId]
-            if self.cardsPlayedMask[idx]: # card has already been played
-                continue
-            elif valueCount + cardsTotal > 31: # cannot play card
-                continue
-            else:
-                valuesFaceHandToIdxInHand[valueFace] = cardId
-                valuesCountHandToIdxInHand[valueCount] = cardId
-            
-        if len(valuesCountHandToIdxInHand) == 0: # cannot play anything, so 'Go'
+        super().__init__(name)
+        if peggingSearch is None:
+            peggingSearch = PeggingSearch(nodeBudget=nodeBudget,timeBudget=timeBudget)
+        self.peggingSearch = peggingSearch
+
+    def playCard(self,cardsPlayed,cardsTotal,cardsSinceReset,peggingState=None):
+        '''
+        Search the rest of the pegging and lay the best card, or None for a go
+        '''
+        if peggingState is None:
+            peggingState = PeggingState.fromTable(cardsPlayed,cardsSinceReset)
+        state = searchStateForPlayer(self.hand,self.cardsPlayedMask,self.dealtCards,peggingState)
+        face, _ = self.peggingSearch.bestPlay(**state)
+        return self._layFace(face)
+
+    def _layFace(self,face):
+        '''
+        Lay a card in hand with the face value, or None for a go
+        '''
+        if face is None:
             return None
-        
-        # Check for pairs
-        playedMatching = 1 # kind of wierd, Tracks the number of cards matching the last layed card and the last layed card matches itself
-        cardForPair = None
-        for idx in range(cardsSinceReset-1):
-            if valuesFacePlayed[idx] == valuesFacePlayed[idx+1]:
-                if playedMatching == 1: # first match, so set values
-                    playedMatching = 2
-                    cardForPair = valuesFacePlayed[idx]
-                else:
-                    playedMatching += 1
-            else:
-                break
-        
-        # check for straights
-        playedStraight = -1
-        cardForStraight = None
-        for idx in range(cardsSinceReset-1):
-            if valuesFacePlayed[idx] == (valuesFacePlayed[idx+1]+1):
-                if playedStraight < 0:
-                    playedStraight = 2 # first match gives a run of 2
-                    cardForStraight = valuesFacePlayed[idx] + 1 # a run of 2 exists, so set the required card to continue the straight
-                else:
-                    playedStraight += 1 # subsequent matchs add to the length of the run                    
-            else:
-                break
-    
-        if cardsTotal < 15:
-            cardFor15 = 15 - cardsTotal
-        else:
-            cardFor15 = None
-        
-        cardFor31 = 31 - cardsTotal # may result in a non-existant card
-        
-        # Now go through the cases in order of decreasing points and see if the conditions are right to score
-        if playedMatching == 3 and (cardForPair in valuesFaceHandToIdxInHand): # can make 4 of a kind, 3 of a kind is worth 12
-            cardId = valuesFaceHandToIdxInHand[cardForPair]
-            
-        elif playedStraight == 7 and (cardForStraight in valuesFaceHandToIdxInHand): # can make a straight of any length, minimum value is 3, max is 5 (A,2,3,4,5,6,7)
-            cardId = valuesFaceHandToIdxInHand[cardForStraight]
-        
-        elif playedMatching == 2 and (cardForPair in valuesFaceHandToIdxInHand): # can make 3 of a kind, 3 of a kind is worth 6
-            cardId = valuesFaceHandToIdxInHand[cardForPair]
-        
-        elif playedStraight >= 2 and (cardForStraight in valuesFaceHandToIdxInHand): # can make a straight between 3 and 6, worth 3-6 points
-            cardId = valuesFaceHandToIdxInHand[cardForStraight]
 
-        elif playedMatching == 1 and (cardForPair in valuesFaceHandToIdxInHand): # can make a pair for 2
-            cardId = valuesFaceHandToIdxInHand[cardForPair]
-            
-        elif cardFor15 in valuesCountHandToIdxInHand: # can make a 15
-            cardId = valuesCountHandToIdxInHand[cardFor15]
+        for idx, cardId in enumerate(self.hand):
+            if not self.cardsPlayedMask[idx] and cardIdToFaceValue[cardId] == face:
+                self.cardsPlayedMask[idx] = True
+                return cardId
 
-        elif cardFor31 in valuesCountHandToIdxInHand:   # can make 31
-            cardId = valuesCountHandToIdxInHand[cardFor31]
+@registerPlayer("bestexpectedvalueandsearchpegging",shared=_searchShared,sharedParams=_searchSharedParams,nodeBudget=defaultNodeBudget,timeBudget=None)
+class BestExpectedValueAndSearchPeggingPlayer(BestExpectedValuePlayer,SearchPeggingPlayer):
+    '''
+    Combines the SearchPegging player and the BestExpectedValue player
+    '''
+    pass
 
-        else:   # no points can be scored, play a random card
-            cardId = valuesCountHandToIdxInHand[list(valuesCountHandToIdxInHand)[0]] # get the first card in the hand
+@registerPlayer("winprobability",shared=_searchShared,sharedParams=_searchSharedParams,nodeBudget=defaultNodeBudget,timeBudget=None)
+class WinProbabilityPlayer(BestExpectedValueAndSearchPeggingPlayer):
+    '''
+    Player chooses the discard and the cards to lay with the best probability of winning the game,
+        looked up in the WinProbability tables with the scores passed to updateScores
+        * of the discards within winTolerance of the best probability, keeps the one with the
+            most expected points like the BestExpectedValue player
+        * the search values each card by its expected pegging differential, once either player
+            has endgameScore points each differential is valued by the probability of winning
+            after the pegging, and a card only replaces the search's choice when it wins more
+            often by more than winTolerance
+    '''
 
-        idx = self.hand.index(cardId) # get the index in the hand of the card to play
-        self.cardsPlayedMask[idx] = True # mark as played
-        return self.hand[idx]
+    def __init__(self,name,nodeBudget=defaultNodeBudget,timeBudget=None,peggingSearch=None,winProbabilityTable=None,
+                 winTolerance=1e-4,endgameScore=95):
+        '''
+        winProbabilityTable: WinProbabilityTable, None uses the table shipped with the package
+        winTolerance: float, probabilities closer than this are treated as the same
+        endgameScore: int, score of either player from which the pegging is played by the table,
+            below it a point is worth about the same in every position and the search decides
+        '''
+        super().__init__(name,nodeBudget=nodeBudget,timeBudget=timeBudget,peggingSearch=peggingSearch)
+        self.winProbabilityTable = winProbabilityTable
+        self.winTolerance = winTolerance
+        self.endgameScore = endgameScore
+        self.isDealer = False
+
+    def _table(self):
+        if self.winProbabilityTable is None:
+            self.winProbabilityTable = getWinProbabilityTable()
+        return self.winProbabilityTable
+
+    def deal(self, deck, isDealer, scorer):
+        self.hand = deck.getCards(6)
+        self.dealtCards = self.hand.copy()
+        self.isDealer = isDealer
 
+        handValues, cribValues = getDiscardOptimizer(scorer).expectedValues(self.hand)
+        handScores, _ = scorer.possibleHandScores(self.hand)
+        wins = self._table().discardWinProbabilities(handScores,cribValues,self.myScore,self.opponentScore,isDealer)
+        totalValues = handValues + cribValues if isDealer else handValues - cribValues
+        best = int(np.argmax(np.where(wins >= wins.max() - self.winTolerance,totalValues,-np.inf)))
+        dropIdxs1, dropIdxs2 = np.triu_indices(6,k=1)
+        handIdxs = [dropIdxs1[best],dropIdxs2[best]]
+
+        # debugging use only
+        self.predictedScore = totalValues[best]
+        self.predictedWinProbability = wins[best]
+
+        return self._discard(handIdxs,isDealer)
+
+    def playCard(self,cardsPlayed,cardsTotal,cardsSinceReset,peggingState=None):
+        '''
+        Lay the card the search chooses, unless near the end of the game another card has a
+            better probability of winning
+        '''
+        if peggingState is None:
+            peggingState = PeggingState.fromTable(cardsPlayed,cardsSinceReset)
+        state = searchStateForPlayer(self.hand,self.cardsPlayedMask,self.dealtCards,peggingState)
+        values = self.peggingSearch.playValues(**state)
+        if len(values) == 0:
+            return None
+        faces = list(values)
+        if values[faces[0]] is None: # nothing to choose between, lay it like bestPlay
+            return self._layFace(faces[0])
+
+        face = max(faces,key=values.__getitem__)
+        if max(self.myScore,self.opponentScore) >= self.endgameScore:
+            wins = {candidate:self._peggingWinProbability(value) for candidate, value in values.items()}
+            tableFace = max(faces,key=wins.__getitem__)
+            if wins[tableFace] > wins[face] + self.winTolerance:
+                face = tableFace
+        return self._layFace(face)
+
+    def _peggingWinProbability(self,differential):
+        '''
+        Probability of winning after the pegging if the rest of it scores the expected differential,
+            points ahead are added to the player's score and points behind to the opponent's
+            * a fractional differential is interpolated between the 2 nearest whole points
+        '''
+        table = self._table()
+        def wins(points):
+            if points >= 0:
+                return table.winProbabilityAfterPegging(self.myScore+points,self.opponentScore,self.isDealer)
+            return table.winProbabilityAfterPegging(self.myScore,self.opponentScore-points,self.isDealer)
+        low = math.floor(differential)
+        fraction = differential - low
+        return (1.-fraction)*wins(low) + fraction*wins(low+1)
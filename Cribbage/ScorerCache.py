@@ -0,0 +1,81 @@
+import numpy as np
+import json
+import struct
+
+# Scorer cache file layout:
+#   * magic bytes, version (uint32) and header length (uint32)
+#   * json header with the name, dtype, shape and offset of every table
+#   * the tables, each aligned to tableAlignment bytes so they can be memory mapped,
+#       the offsets in the header are from the first aligned byte after the header
+# Bump cacheVersion whenever the layout or the meaning of a table changes
+cacheMagic = b"CRIBSCR\0"
+cacheVersion = 2
+tableAlignment = 4096
+
+# Attributes of HandScorer that are saved when they exist
+cacheTableNames = ["scores_pairs","scores_pairs_4card",
+                    "scores_straight","scores_straight_4card",
+                    "rankScores","rankScores_4card",
+                    "scoreTable"]
+
+def saveScorerCache(scorer,path):
+    '''
+    Save the tables of a HandScorer to a versioned binary file
+    The scorer should be warmed first (HandScorer.save does this) so the loaded cache never misses
+    '''
+    tables = {name:getattr(scorer,name) for name in cacheTableNames if getattr(scorer,name,None) is not None}
+
+    # offsets are from the start of the data, which is the first aligned byte after the header
+    offset = 0
+    entries = []
+    for name, table in tables.items():
+        entries.append({"name":name,
+                        "dtype":table.dtype.str,
+                        "shape":list(table.shape),
+                        "offset":offset})
+        offset += -(-table.nbytes//tableAlignment)*tableAlignment
+    header = json.dumps({"tables":entries}).encode()
+    dataStart = _dataStart(len(header))
+
+    with open(path,'wb') as fp:
+        fp.write(cacheMagic)
+        fp.write(struct.pack("<II",cacheVersion,len(header)))
+        fp.write(header)
+        for entry in entries:
+            fp.seek(dataStart + entry["offset"])
+            fp.write(np.ascontiguousarray(tables[entry["name"]]).tobytes())
+        fp.truncate(dataStart + offset)
+
+def _dataStart(headerLength):
+    '''
+    Return the file offset of the first table for a header of headerLength bytes
+    '''
+    headerEnd = len(cacheMagic) + 8 + headerLength
+    return -(-headerEnd//tableAlignment)*tableAlignment
+
+def loadScorerCache(path):
+    '''
+    Memory map the tables from a file saved with saveScorerCache
+        * The tables are mapped copy on write, so every process loading the same file shares
+            the physical pages and any writes stay private to the process
+    Returns:
+        * dict of table name to np.memmap
+    '''
+    with open(path,'rb') as fp:
+        magic = fp.read(len(cacheMagic))
+        if magic != cacheMagic:
+            raise ValueError("{} is not a scorer cache file".format(path))
+        version, headerLength = struct.unpack("<II",fp.read(8))
+        if version != cacheVersion:
+            raise ValueError("Scorer cache {} is version {}, expected version {}".format(path,version,cacheVersion))
+        header = json.loads(fp.read(headerLength).decode())
+    dataStart = _dataStart(headerLength)
+
+    tables = {}
+    for entry in header["tables"]:
+        tables[entry["name"]] = np.memmap(path,
+                                        dtype=np.dtype(entry["dtype"]),
+                                        mode='c',
+                                        offset=dataStart + entry["offset"],
+                                        shape=tuple(entry["shape"]))
+    return tables
@@ -0,0 +1,361 @@
+'''
+Headless game engine for simulating many games quickly
+
+Plays by the same rules, in the same order, as Game. The differences are all in the plumbing:
+    * the end of the game is a return value instead of EndOfGameException
+    * nothing is printed and errors are not caught
+    * the deals are drawn with numpy in blocks of hands, like BatchSim, and the hands of the
+        built in players are counted with one HandScorer.score_batch call per block
+    * players are passed in as objects, None is a built in player that makes the same
+        choices as RandomPlayer (keeps the first 4 cards dealt and lays the first card that fits)
+    * when both players are built in, the pegging is a handful of local variables instead of
+        a PeggingState and the player objects
+
+With exact=True the deck is shuffled draw for draw the same as Game's Deck, so a seeded game ends
+    with the same scores as Game with the same seed. That is several times slower, it is for
+    checking the engine against Game.
+'''
+import random
+import numpy as np
+
+from Cribbage.HandScorer import getDefaultScorer
+from Cribbage.PeggingState import PeggingState, pairPoints
+
+_fullDeck = list(range(52))
+_faceIdx = [cardId % 13 for cardId in range(52)] # face value - 1
+_suite = [cardId // 13 for cardId in range(52)]
+_faceCountValue = [min(face + 1,10) for face in range(13)] # by face value - 1
+_runPoints = [0,0,0,3,4,5,6,7,8,9,10,11,12,13]
+# random.Random._randbelow(n) draws getrandbits(n.bit_length()) until it is below n
+_shuffleBits = [(idx+1).bit_length() for idx in range(52)]
+# a deal is 13 cards in the order Game pops them: player1's 6, player2's 6, then the turn card
+# the built in players keep the first 4 of their 6, these are the hands and crib they count
+_builtInCountIdxs = [[0,1,2,3],[6,7,8,9],[4,5,10,11]]
+# the first block of deals is small so seeding every game stays cheap, then they double
+_firstBlock = 16
+_lastBlock = 1024
+
+def shuffleCards(cards, rng, count=None):
+    '''
+    Shuffle a list in place with the same random draws and swaps as rng.shuffle(cards)
+        * skips the method lookups random.Random.shuffle does for every card
+    count: int or None, only the last count cards need to end up in shuffled order
+        * the shuffle fills the list from the end, so the rest of the swaps are skipped,
+            the random draws are still made so the generator ends in the same state
+    '''
+    getrandbits = rng.getrandbits
+    last = len(cards) - 1
+    first = 0 if count is None else max(last - count,0)
+    for idx in range(last,first,-1):
+        limit = idx + 1
+        bits = _shuffleBits[idx]
+        swapIdx = getrandbits(bits)
+        while swapIdx >= limit:
+            swapIdx = getrandbits(bits)
+        cards[idx], cards[swapIdx] = cards[swapIdx], cards[idx]
+    for idx in range(first,0,-1):
+        limit = idx + 1
+        bits = _shuffleBits[idx]
+        while getrandbits(bits) >= limit:
+            pass
+
+def dealBlock(generator, hands):
+    '''
+    Deal many hands at once
+    generator: numpy.random.Generator
+    hands: int, number of deals
+    Returns np.array (hands,13) of distinct cardIds per row, uniformly random and in random order
+        * a Fisher-Yates shuffle of only the first 13 cards of every deck, one column at a time,
+            instead of numpy's permuted, which shuffles all 52
+    '''
+    rows = np.arange(hands)
+    decks = np.tile(np.arange(52),(hands,1))
+    draws = generator.random((hands,13))
+    for idx in range(13):
+        swapIdxs = idx + (draws[:,idx]*(52 - idx)).astype(np.intp)
+        swapped = decks[rows,swapIdxs]
+        decks[rows,swapIdxs] = decks[:,idx]
+        decks[:,idx] = swapped
+    return decks[:,:13]
+
+class _SimDeck:
+    '''
+    Stands in for Deck when a player object is dealt cards
+    '''
+    __slots__ = ('cards',)
+
+    def __init__(self, cards):
+        self.cards = cards
+
+    def getCards(self, count):
+        return [self.cards.pop() for item in range(count)]
+
+class SimEngine:
+    '''
+    Plays complete games without exceptions, printing or per game setup
+    One engine can play any number of games, the players and scorer are reused
+    '''
+
+    def __init__(self, player1=None, player2=None, scorer=None, exact=False, seed=None):
+        '''
+        player<1,2>: Player instance, or None for the built in fast RandomPlayer
+        scorer: HandScorer passed to the players, None uses the scorer shared by the process
+        exact: bool, shuffle the same as Game so seeded games end with the same scores as Game
+        seed: int or None, seed for the deals of the games played without a seed, unused when exact
+        '''
+        self.players = [player1, player2]
+        self.scorer = scorer if scorer is not None else getDefaultScorer()
+        if self.scorer.rankScores is None:
+            self.scorer.buildRankScoreTables()
+        # bytes indexing is much faster than numpy scalar indexing, scores are never negative
+        self._rankScores = self.scorer.rankScores.tobytes()
+        self.exact = exact
+        self._builtIn = player1 is None and player2 is None
+        self._deck = _SimDeck([])
+        self._peggingState = PeggingState()
+        self.scores = [0,0]
+        self._deals = None if exact else self._blockDeals(self._generator(seed))
+
+    def scoreHand(self, hand, turnCard):
+        '''
+        Score a 4 card hand or crib with the turn card, same as HandScorer
+        '''
+        score = self._rankScores[(((_faceIdx[hand[0]]*13 + _faceIdx[hand[1]])*13 + _faceIdx[hand[2]])*13
+                                  + _faceIdx[hand[3]])*13 + _faceIdx[turnCard]]
+        suite = _suite[hand[0]]
+        if _suite[hand[1]] == suite and _suite[hand[2]] == suite and _suite[hand[3]] == suite:
+            score += 5 if _suite[turnCard] == suite else 4
+        if _suite[turnCard]*13 + 10 in hand: # jack of the turn card's suite
+            score += 1
+        return score
+
+    def playGame(self, seed=None, rng=None):
+        '''
+        Play a game to 121
+        seed: int or None, seed for the deals, with exact the same meaning as for Game
+        rng: generator for the deals, takes priority over seed
+            * random.Random when exact, numpy.random.Generator otherwise
+        Without a seed or rng the deals carry on from the last game, otherwise a new block of
+            deals is drawn, so seeding every game is slower
+        Returns [player1Score, player2Score]
+        '''
+        if self.exact:
+            deals = self._exactDeals(rng if rng is not None else random.Random(seed))
+            if self._builtIn:
+                deals = (self._builtInDeal(dealt) for dealt in deals)
+        else:
+            if seed is not None or rng is not None:
+                self._deals = self._blockDeals(rng if rng is not None else self._generator(seed))
+            deals = self._deals
+
+        scores = self.scores
+        scores[0] = scores[1] = 0
+        if self._builtIn:
+            self._playBuiltInGame(deals)
+        else:
+            dealer = 1 # flipped at the start of every hand, player1 deals first
+            for dealt in deals:
+                dealer = 1 - dealer
+                if self._playHand(dealer,dealt):
+                    break
+        return [scores[0],scores[1]]
+
+    @staticmethod
+    def _generator(seed):
+        return np.random.default_rng(seed)
+
+    def _exactDeals(self, rng):
+        '''
+        Yield the cards dealt every hand, shuffled the same as Game
+        '''
+        cards = list(_fullDeck)
+        # Game's Deck shuffles once when it is created, then before every hand
+        # only the 13 cards dealt each hand need to be in order
+        shuffleCards(cards,rng,0)
+        while True:
+            cards[:] = _fullDeck
+            shuffleCards(cards,rng,13)
+            yield cards[:38:-1]
+
+    def _blockDeals(self, generator):
+        '''
+        Yield the cards dealt every hand, drawn from generator in blocks
+            * when both players are built in, (faces, counts) instead, see _builtInDeal
+        '''
+        hands = _firstBlock
+        while True:
+            dealt = dealBlock(generator,hands)
+            if self._builtIn:
+                counts = self.scorer.score_batch(dealt[:,_builtInCountIdxs].reshape(-1,4),
+                                                  dealt[:,12].repeat(3)).reshape(-1,3).tolist()
+                yield from zip((dealt % 13).tolist(),counts)
+            else:
+                yield from dealt.tolist()
+            hands = min(2*hands,_lastBlock)
+
+    def _builtInDeal(self, dealt):
+        '''
+        Return (faces, counts) of a deal to 2 built in players
+            * faces: face value - 1 of the dealt cards, all the built in players need to peg
+            * counts: scores of player1's hand, player2's hand and the crib
+        '''
+        counts = [self.scoreHand([dealt[idx] for idx in idxs],dealt[12]) for idxs in _builtInCountIdxs]
+        return [_faceIdx[cardId] for cardId in dealt], counts
+
+    def _playBuiltInGame(self, deals):
+        '''
+        Play a game between 2 built in players, the scores are left in self.scores
+        deals: iterator of (faces, counts) for every hand, see _builtInDeal
+            * a built in player lays the first card that fits, so it is laid by its face
+        '''
+        scores = self.scores
+        countValue, runPoints = _faceCountValue, _runPoints
+        dealer = 1
+        for faces, counts in deals:
+            dealer = 1 - dealer
+            if faces[12] == 10: # his heels
+                scores[dealer] += 2
+                if scores[dealer] >= 121:
+                    return
+
+            # pegging, the dealer lays first and each player lays the first card that fits
+            # lastFace is a face index, -2 after a reset so no card continues a run
+            turn = dealer
+            hand, other = (faces[6:10], faces[0:4]) if dealer else (faces[0:4], faces[6:10])
+            count = pairCount = runLength = 0
+            lastFace = -2
+            lastWasGo = inGo = goWon = False
+            cardsLeft = 8
+            while True:
+                room = 31 - count
+                for face in hand:
+                    if countValue[face] <= room:
+                        hand.remove(face)
+                        lastWasGo = False
+                        count += countValue[face]
+                        if face == lastFace:
+                            pairCount += 1
+                            runLength = 1
+                            points = pairPoints[pairCount]
+                        else:
+                            pairCount = 0
+                            if face == lastFace + 1:
+                                runLength += 1
+                                points = runPoints[runLength]
+                            else:
+                                runLength = 1
+                                points = 0
+                        lastFace = face
+                        if count == 15:
+                            points += 2
+                        elif count == 31:
+                            points += 2
+                            count = pairCount = runLength = 0
+                            lastFace = -2
+                        if points:
+                            scores[turn] += points
+                            if scores[turn] >= 121:
+                                return
+                        if goWon: # Game only checks for the end after a card is laid
+                            return
+                        cardsLeft -= 1
+                        break
+                else:
+                    if lastWasGo: # neither player can lay, reset the table
+                        count = pairCount = runLength = 0
+                        lastFace = -2
+                        lastWasGo = inGo = False
+                    elif inGo:
+                        lastWasGo = True
+                    else:
+                        scores[1-turn] += 1
+                        goWon = scores[1-turn] >= 121
+                        lastWasGo = inGo = True
+                if not cardsLeft:
+                    break
+                turn = 1 - turn
+                hand, other = other, hand
+            scores[turn] += 1 # point for last
+
+            # Count the hands, dealer always counts first
+            pone = 1 - dealer
+            for playerIdx, points in ((dealer,counts[dealer]),(pone,counts[pone]),(dealer,counts[2])):
+                scores[playerIdx] += points
+                if scores[0] >= 121 or scores[1] >= 121:
+                    return
+
+    def _playHand(self, dealer, dealt):
+        '''
+        Play one hand with at least one player object, dealer is the index of the dealing player
+        The table is one PeggingState for the hand, passed to the player objects as in Game
+        Returns True when a player has won
+        '''
+        scores = self.scores
+        players = self.players
+
+        hands = [None,None]
+        cribCards = []
+        for playerIdx in (0,1):
+            player = players[playerIdx]
+            playerCards = dealt[6*playerIdx:6*playerIdx+6]
+            if player is None:
+                hands[playerIdx] = playerCards[:4]
+                cribCards.extend(playerCards[4:])
+                continue
+            player.resetHands()
+            player.updateScores(scores[playerIdx],scores[1-playerIdx])
+            self._deck.cards = playerCards[::-1]
+            cardsForCrib = player.deal(self._deck,playerIdx == dealer,self.scorer)
+            hands[playerIdx] = player.hand
+            if cardsForCrib is not None:
+                cribCards.extend(cardsForCrib)
+        dealerPlayer = players[dealer]
+        if dealerPlayer is not None:
+            dealerPlayer.recieveCardsForCrib(cribCards)
+            crib = dealerPlayer.crib
+        else:
+            crib = cribCards
+        turnCard = dealt[12]
+
+        if _faceIdx[turnCard] == 10: # his heels
+            scores[dealer] += 2
+            if scores[0] >= 121 or scores[1] >= 121:
+                return True
+
+        # pegging, the dealer lays first as in Game
+        state = self._peggingState
+        state.reset()
+        unplayed = [hands[0][:], hands[1][:]] # built in players lay from these in hand order
+        cardsLeft = 8
+        turn = 1 - dealer
+        while cardsLeft:
+            turn = 1 - turn
+            cardId = None
+            player = players[turn]
+            if player is None:
+                hand = unplayed[turn]
+                for idx in range(len(hand)):
+                    if state.canPlay(hand[idx]):
+                        cardId = hand.pop(idx)
+                        break
+            else:
+                player.updateScores(scores[turn],scores[1-turn])
+                cardId = player.playCard(state.cardsPlayed,state.cardTotal,state.cardsSinceReset,peggingState=state)
+
+            if cardId is None:
+                scores[1-turn] += state.go()
+                continue
+            scores[turn] += state.play(cardId)
+            cardsLeft -= 1
+            if scores[0] >= 121 or scores[1] >= 121:
+                return True
+
+        scores[turn] += 1 # point for last
+
+        # Count the hands, dealer always counts first
+        pone = 1 - dealer
+        for playerIdx, cardsToScore in ((dealer,hands[dealer]),(pone,hands[pone]),(dealer,crib)):
+            scores[playerIdx] += self.scoreHand(cardsToScore,turnCard)
+            if scores[0] >= 121 or scores[1] >= 121:
+                return True
+        return False
@@ -0,0 +1,113 @@
+'''
+Counters and timers for profiling the scorer and games
+
+Instrumentation is off unless a Stats is passed in, the instrumented code only checks
+    `stats is not None` on its fast paths. One Stats can be shared by a HandScorer and any
+    number of games so a whole run is collected in one place
+'''
+import time
+
+class Stats:
+    '''
+    Cache hit/miss counters and timers
+        * caches: dict of cache name to [hits, misses]
+        * timers: dict of timer name to [calls, seconds]
+    '''
+
+    def __init__(self):
+        self.caches = {}
+        self.timers = {}
+
+    def reset(self):
+        '''
+        Clear every counter and timer
+        '''
+        self.caches.clear()
+        self.timers.clear()
+
+    def hit(self, name):
+        '''
+        Count a lookup that was found in cache name
+        '''
+        counts = self.caches.get(name)
+        if counts is None:
+            counts = self.caches[name] = [0,0]
+        counts[0] += 1
+
+    def miss(self, name):
+        '''
+        Count a lookup that was not found in cache name
+        '''
+        counts = self.caches.get(name)
+        if counts is None:
+            counts = self.caches[name] = [0,0]
+        counts[1] += 1
+
+    def addTime(self, name, seconds, calls=1):
+        '''
+        Add seconds spent in timer name
+        '''
+        totals = self.timers.get(name)
+        if totals is None:
+            totals = self.timers[name] = [0,0.]
+        totals[0] += calls
+        totals[1] += seconds
+
+    def timer(self, name):
+        '''
+        Context manager that adds the time spent in the block to timer name
+        For code that is not on a hot path, the hot paths call addTime directly
+        '''
+        return _Timer(self,name)
+
+    def merge(self, other):
+        '''
+        Add the counts and times of another Stats, such as one from a worker process
+        '''
+        for name, (hits, misses) in other.caches.items():
+            counts = self.caches.setdefault(name,[0,0])
+            counts[0] += hits
+            counts[1] += misses
+        for name, (calls, seconds) in other.timers.items():
+            self.addTime(name,seconds,calls)
+
+    def hitRate(self, name):
+        '''
+        Fraction of the lookups of cache name that were hits, None before any lookups
+        '''
+        hits, misses = self.caches.get(name,(0,0))
+        return hits/(hits+misses) if hits + misses > 0 else None
+
+    def asDict(self):
+        '''
+        Return the stats as plain dicts and numbers, for writing to JSON
+        '''
+        return {"caches":{name:{"hits":hits,"misses":misses,"hitRate":self.hitRate(name)}
+                            for name, (hits, misses) in sorted(self.caches.items())},
+                "timers":{name:{"calls":calls,"seconds":seconds}
+                            for name, (calls, seconds) in sorted(self.timers.items())}}
+
+    def __str__(self):
+        lines = []
+        for name, (hits, misses) in sorted(self.caches.items()):
+            lines.append("{:30s} {:10d} hits {:10d} misses {:6.1f}%".format(name,hits,misses,100*self.hitRate(name)))
+        for name, (calls, seconds) in sorted(self.timers.items()):
+            lines.append("{:30s} {:10d} calls {:10.3f}s {:10.2f}us/call".format(name,calls,seconds,1e6*seconds/max(calls,1)))
+        return "\n".join(lines)
+
+class _Timer:
+    '''
+    Context manager returned by Stats.timer
+    '''
+    __slots__ = ('stats','name','startTime')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.startTime = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stats.addTime(self.name,time.perf_counter()-self.startTime)
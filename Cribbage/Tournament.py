@@ -0,0 +1,180 @@
+from Cribbage.Game import Game, DuplicateGame
+from Cribbage.HandScorer import HandScorer
+from Cribbage.Deck import spawnSeeds
+from Cribbage.PlayerRegistry import specName
+
+import numpy as np
+import multiprocessing
+import math
+
+# Each worker process builds one scorer and reuses it for every game it plays
+_workerScorer = None
+
+def _initWorker(scorerKwargs):
+    '''
+    Create the scorer for a worker process
+    '''
+    global _workerScorer
+    _workerScorer = HandScorer(**scorerKwargs)
+
+def _playGames(args):
+    '''
+    Play a chunk of games in a worker, one game per seed
+    Returns a list of [player1Score, player2Score] for each game
+        * In duplicate mode each seed is a DuplicateGame and the list has its 4 scores
+    '''
+    player1Type, player2Type, gameSeeds, duplicate = args
+    results = []
+    for gameSeed in gameSeeds:
+        if duplicate:
+            game = DuplicateGame(player1Type,player2Type,gameSeed,scorer=_workerScorer)
+            game.playGame()
+            results.append(game.scores())
+            continue
+        game = Game(player1Type,player2Type,scorer=_workerScorer,verbose=False,seed=gameSeed)
+        game.playGame()
+        results.append([game.player1Score,game.player2Score])
+    return results
+
+class TournamentResult:
+    '''
+    Aggregate statistics of the games played in a tournament
+        * scores: np.array (games,2) of the final player1 and player2 scores
+        * Confidence intervals are 95%, Wilson score interval for the win rate and
+            normal approximation for the point spread
+        * In duplicate mode player1 is the type seated first in the first game of each pair,
+            the win rate and spread are over both games and the paired differences of
+            DuplicateGame are summarized in meanWinDifference and meanSpreadDifference
+    '''
+    def __init__(self,player1Type,player2Type,scores,duplicate=False):
+        self.player1Type = player1Type
+        self.player2Type = player2Type
+        self.duplicate = duplicate
+        if duplicate:
+            pairedScores = np.asarray(scores,dtype=np.int32).reshape(-1,4)
+            seat1Wins = (pairedScores[:,[0,2]] > pairedScores[:,[1,3]]).astype(np.int32)
+            seat1Spreads = pairedScores[:,[0,2]] - pairedScores[:,[1,3]]
+            self.winDifferences = seat1Wins[:,0] - seat1Wins[:,1]
+            self.spreadDifferences = seat1Spreads[:,0] - seat1Spreads[:,1]
+            self.meanWinDifference, self.meanWinDifferenceCI = meanAndInterval(self.winDifferences)
+            self.meanSpreadDifference, self.meanSpreadDifferenceCI = meanAndInterval(self.spreadDifferences)
+            # second game of each pair has the players swapped, flip it so player1 is always the same type
+            scores = np.concatenate([pairedScores[:,:2],pairedScores[:,[3,2]]])
+        self.scores = np.asarray(scores,dtype=np.int32).reshape(-1,2)
+
+        self.games = self.scores.shape[0]
+        self.player1Wins = int((self.scores[:,0] > self.scores[:,1]).sum())
+        self.player2Wins = self.games - self.player1Wins
+        self.player1WinRate = self.player1Wins/self.games
+        self.player1WinRateCI = wilsonInterval(self.player1Wins,self.games)
+
+        # point spread is player1 - player2, positive when player1 is ahead
+        self.spreads = self.scores[:,0] - self.scores[:,1]
+        self.meanSpread, self.meanSpreadCI = meanAndInterval(self.spreads)
+        self.spreadStd = float(self.spreads.std(ddof=1)) if self.games > 1 else 0.
+
+    def __str__(self):
+        out = "{} vs {}: {} games{}\n".format(specName(self.player1Type),specName(self.player2Type),self.games," (duplicate)" if self.duplicate else "") + \
+            "\tPlayer1 won {}/{} games, {:.2f}% (95% CI {:.2f}%-{:.2f}%)\n".format(self.player1Wins,
+                                                                            self.games,
+                                                                            self.player1WinRate*100,
+                                                                            self.player1WinRateCI[0]*100,
+                                                                            self.player1WinRateCI[1]*100) + \
+            "\tMean point spread {:.2f} (95% CI {:.2f} to {:.2f}) std {:.2f}".format(self.meanSpread,
+                                                                            self.meanSpreadCI[0],
+                                                                            self.meanSpreadCI[1],
+                                                                            self.spreadStd)
+        if self.duplicate:
+            out += "\n\tPaired win difference {:.3f} (95% CI {:.3f} to {:.3f})\n".format(self.meanWinDifference,
+                                                                            self.meanWinDifferenceCI[0],
+                                                                            self.meanWinDifferenceCI[1]) + \
+                "\tPaired spread difference {:.2f} (95% CI {:.2f} to {:.2f})".format(self.meanSpreadDifference,
+                                                                            self.meanSpreadDifferenceCI[0],
+                                                                            self.meanSpreadDifferenceCI[1])
+        return out
+
+def meanAndInterval(values,z=1.96):
+    '''
+    Return the mean of values and its normal approximation confidence interval
+    '''
+    values = np.asarray(values,dtype=np.float64)
+    mean = float(values.mean())
+    halfWidth = z*values.std(ddof=1)/math.sqrt(values.shape[0]) if values.shape[0] > 1 else 0.
+    return mean, (mean-halfWidth,mean+halfWidth)
+
+def wilsonInterval(successes,trials,z=1.96):
+    '''
+    Wilson score confidence interval for a binomial proportion
+    '''
+    if trials == 0:
+        return (0.,1.)
+    p = successes/trials
+    denominator = 1 + z**2/trials
+    center = (p + z**2/(2*trials))/denominator
+    halfWidth = z*math.sqrt(p*(1-p)/trials + z**2/(4*trials**2))/denominator
+    return (center-halfWidth,center+halfWidth)
+
+class Tournament:
+    '''
+    Play many games between 2 player types, spread across a pool of processes
+        * Every game gets its own seed split from the tournament seed, so results only
+            depend on the seed and not on the number of processes or the chunk size
+        * Tournaments with the same seed and number of games deal identical cards, so
+            running 2 strategies against the same opponent is a common random numbers comparison
+        * Each worker builds a single HandScorer so its caches stay warm across games
+    '''
+
+    def __init__(self,player1Type,
+                        player2Type,
+                        games,
+                        processes=None,
+                        seed=0,
+                        chunkSize=50,
+                        scorerKwargs=None,
+                        duplicate=False):
+        '''
+        player<1,2>Type: player specs, same options as Game
+        games: int, number of games to play
+        processes: int or None, number of worker processes, None uses every core
+            * 1 plays the games in this process
+        seed: int, seed for the whole tournament
+        chunkSize: int, number of games sent to a worker at a time
+        scorerKwargs: dict or None, arguments for the HandScorer made in each worker
+            * {"cachePath":path} memory maps a cache saved with HandScorer.save, so every
+                worker starts warm and shares the same physical pages
+        duplicate: bool, play each seed as a DuplicateGame, this plays 2 games per seed
+        '''
+        self.player1Type = player1Type
+        self.player2Type = player2Type
+        self.games = games
+        self.processes = processes if processes is not None else multiprocessing.cpu_count()
+        self.seed = seed
+        self.chunkSize = chunkSize
+        self.scorerKwargs = scorerKwargs if scorerKwargs is not None else {}
+        self.duplicate = duplicate
+
+        self.gameSeeds = spawnSeeds(seed,games)
+
+    def run(self,progress=None):
+        '''
+        Play all of the games and return a TournamentResult
+        progress: function or None, called as progress(gamesPlayed, games) after each chunk
+        '''
+        chunks = [(self.player1Type,self.player2Type,self.gameSeeds[start:start+self.chunkSize],self.duplicate)
+                    for start in range(0,self.games,self.chunkSize)]
+
+        scores = []
+        if self.processes == 1:
+            _initWorker(self.scorerKwargs)
+            for chunk in chunks:
+                scores.extend(_playGames(chunk))
+                if progress is not None:
+                    progress(len(scores),self.games)
+        else:
+            with multiprocessing.Pool(self.processes,initializer=_initWorker,initargs=(self.scorerKwargs,)) as pool:
+                for chunkScores in pool.imap(_playGames,chunks):
+                    scores.extend(chunkScores)
+                    if progress is not None:
+                        progress(len(scores),self.games)
+
+        return TournamentResult(self.player1Type,self.player2Type,scores,duplicate=self.duplicate)
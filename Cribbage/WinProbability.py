@@ -0,0 +1,277 @@
+'''
+Probability of winning from a score position
+
+The tables are built by dynamic programming over the points scored in a hand:
+    * the distributions of the points each phase of a hand scores are measured from
+        simulated games recorded with GameLog
+    * a hand is played as the pegging (a joint distribution of the dealer's and the pone's
+        points, the dealer's include his heels), then the dealer's hand, the pone's hand and
+        the crib, in the order Game counts them, so the first player to reach 121 wins
+    * the phases are treated as independent of each other and of the scores
+    * if both players reach 121 in the pegging the game is counted as a tie
+Two tables are kept, both indexed [dealer's score, pone's score] and holding the probability
+    the dealer wins
+    * dealerWins: at the start of a hand
+    * afterPegging: once the pegging is over and the hands are about to be counted
+
+The tables shipped with the package are rebuilt with tools/buildWinProbabilityTable.py
+'''
+from Cribbage.HandScorer import maxHandScore
+
+import os
+import numpy as np
+
+winningScore = 121
+
+# Tables shipped with the package, rebuild with tools/buildWinProbabilityTable.py
+winProbabilityPath = os.path.join(os.path.dirname(os.path.abspath(__file__)),"data","winProbability.npz")
+
+# probabilities are stored as uint16 fractions of quantizationScale
+quantizationScale = 65535
+
+distributionNames = ["pegging","dealerHand","poneHand","crib"]
+
+_winProbabilityTable = None
+
+def handDistributionsFromRecords(records):
+    '''
+    Measure the distributions of the points scored in each phase of a hand
+    records: np.ndarray of GameLog.handRecordDtype, the hands a game was won in are skipped
+    Returns dict of np.array float64 probabilities
+        * pegging: (dealer points, pone points) joint, the dealer's include his heels
+        * dealerHand, poneHand, crib: points of the counts
+    '''
+    records = records[records['gameOver'] == 0]
+    dealer = np.asarray(records['dealer'],dtype=np.int64)
+    rows = np.arange(records.shape[0])
+    peggingPoints = np.asarray(records['peggingPoints'],dtype=np.int64)
+    handPoints = np.asarray(records['handPoints'],dtype=np.int64)
+    dealerPegging = peggingPoints[rows,dealer] + np.asarray(records['heelsPoints'],dtype=np.int64)
+    ponePegging = peggingPoints[rows,1-dealer]
+
+    pegging = np.zeros((dealerPegging.max()+1,ponePegging.max()+1))
+    np.add.at(pegging,(dealerPegging,ponePegging),1)
+    distributions = {"pegging":pegging/records.shape[0]}
+    for name, points in (("dealerHand",handPoints[rows,dealer]),
+                         ("poneHand",handPoints[rows,1-dealer]),
+                         ("crib",np.asarray(records['cribPoints'],dtype=np.int64))):
+        distributions[name] = np.bincount(points,minlength=maxHandScore+1)/records.shape[0]
+    return distributions
+
+def buildWinProbabilityTables(distributions):
+    '''
+    Compute the probability the dealer wins from every score position
+    distributions: dict from handDistributionsFromRecords
+    Returns (dealerWins, afterPegging), np.array float64 (121,121) indexed [dealer's score, pone's score]
+        * the anti-diagonals of the tables are filled from the highest total score down, every
+            hand scores at least the point for the last card, so a position only depends on
+            positions with a higher total
+    '''
+    pegging = np.array(distributions["pegging"],dtype=np.float64)
+    pegging[0,0] = 0. # a hand always scores the point for the last card
+    pegging /= pegging.sum()
+    dealerHand, poneHand, crib = [np.asarray(distributions[name],dtype=np.float64) for name in ("dealerHand","poneHand","crib")]
+
+    N = winningScore
+    dealerWins = np.zeros((N,N))
+    # the value of each stage for the current dealer, indexed by the scores reached so far,
+    #   the rows and columns past N hold the value of reaching 121
+    cribValues = np.ones((N+crib.shape[0],N)) # dealer reaches 121 with the crib
+    cribStage = np.zeros((N,N))
+    poneValues = np.zeros((N,N+poneHand.shape[0])) # pone reaches 121 with their hand
+    poneStage = np.zeros((N,N))
+    dealerValues = np.ones((N+dealerHand.shape[0],N)) # dealer reaches 121 with their hand
+    afterPegging = np.zeros((N,N))
+    peggingValues = np.zeros((N+pegging.shape[0],N+pegging.shape[1]))
+    peggingValues[N:,:] = 1. # dealer pegs out
+    peggingValues[N:,N:] = 0.5 # both reach 121 in the pegging
+
+    for total in range(2*N-2,-1,-1):
+        cells = [(x,total-x) for x in range(max(0,total-N+1),min(N-1,total)+1)]
+        for x, y in cells:
+            dealerWins[x,y] = (pegging*peggingValues[x:x+pegging.shape[0],y:y+pegging.shape[1]]).sum()
+        for x, y in cells:
+            # after the crib the pone of this hand deals the next one
+            cribValues[x,y] = 1. - dealerWins[y,x]
+        for x, y in cells:
+            cribStage[x,y] = crib @ cribValues[x:x+crib.shape[0],y]
+            poneValues[x,y] = cribStage[x,y]
+        for x, y in cells:
+            poneStage[x,y] = poneHand @ poneValues[x,y:y+poneHand.shape[0]]
+            dealerValues[x,y] = poneStage[x,y]
+        for x, y in cells:
+            afterPegging[x,y] = dealerHand @ dealerValues[x:x+dealerHand.shape[0],y]
+            peggingValues[x,y] = afterPegging[x,y]
+    return dealerWins, afterPegging
+
+def saveWinProbabilityTables(path, dealerWins, afterPegging, distributions):
+    '''
+    Save the tables as uint16 and the distributions they were built from as float32
+    '''
+    arrays = {"dealerWins":np.round(dealerWins*quantizationScale).astype(np.uint16),
+                "afterPegging":np.round(afterPegging*quantizationScale).astype(np.uint16)}
+    for name in distributionNames:
+        arrays[name] = np.asarray(distributions[name],dtype=np.float32)
+    np.savez_compressed(path,**arrays)
+
+class WinProbabilityTable:
+    '''
+    Look up the probability of winning from a score position
+    All lookups take the player's own score first and if the player is the dealer of the hand
+    '''
+
+    def __init__(self, dealerWins, afterPegging, distributions):
+        '''
+        dealerWins, afterPegging: (121,121) arrays from buildWinProbabilityTables
+        distributions: dict from handDistributionsFromRecords
+        '''
+        self.dealerWins = np.asarray(dealerWins,dtype=np.float64)
+        self.afterPegging = np.asarray(afterPegging,dtype=np.float64)
+        self.distributions = {name:np.asarray(distributions[name],dtype=np.float64) for name in distributionNames}
+        self._startWins = self._byPlayer(self.dealerWins)
+        self._countWins = self._byPlayer(self.afterPegging)
+
+    @staticmethod
+    def _byPlayer(table):
+        '''
+        Return the table indexed [pone, player's score, opponent's score] for the dealer (0)
+            and the pone (1), a score of 121 stands for any winning score
+        '''
+        N = winningScore
+        byPlayer = np.zeros((2,N+1,N+1))
+        byPlayer[0,:N,:N] = table
+        byPlayer[1,:N,:N] = 1. - table.T
+        byPlayer[:,N,:N] = 1.
+        byPlayer[:,N,N] = 0.5
+        return byPlayer
+
+    def winProbability(self, myScore, oppScore, isDealer):
+        '''
+        Probability of winning from the start of a hand
+        '''
+        return float(self._startWins[0 if isDealer else 1,min(myScore,winningScore),min(oppScore,winningScore)])
+
+    def winProbabilityAfterPegging(self, myScore, oppScore, isDealer):
+        '''
+        Probability of winning once the pegging is over, before the hands are counted
+        '''
+        return float(self._countWins[0 if isDealer else 1,min(myScore,winningScore),min(oppScore,winningScore)])
+
+    def discardWinProbabilities(self, handScores, cribValues, myScore, oppScore, isDealer):
+        '''
+        Probability of winning for each discard
+        handScores: (D,T) points of the kept hand of each discard with each possible turn card
+        cribValues: (D,) expected points of the crib of each discard
+        Returns np.array (D,)
+            * the hand is played out the same way as in buildWinProbabilityTables, with the
+                player's hand points taken over the turn cards instead of the measured distribution
+            * the measured crib distribution is shifted by how much better or worse than an
+                average crib each discard is
+        '''
+        N = winningScore
+        handScores = np.asarray(handScores,dtype=np.int64)
+        discards = handScores.shape[0]
+        hands = np.zeros((discards,maxHandScore+1))
+        np.add.at(hands,(np.arange(discards)[:,None],handScores),1./handScores.shape[1])
+
+        crib = self.distributions["crib"]
+        cribShifts = np.asarray(cribValues,dtype=np.float64) - crib @ np.arange(crib.shape[0])
+        cribs = _shifted(crib,cribShifts,maxHandScore+1)
+
+        if isDealer:
+            dealerHands, poneHands = hands, self.distributions["poneHand"][None,:]
+        else:
+            dealerHands, poneHands = self.distributions["dealerHand"][None,:], hands
+        pegging = self.distributions["pegging"]
+        dealerScore, poneScore = (myScore, oppScore) if isDealer else (oppScore, myScore)
+
+        # only the scores the hand can reach are evaluated, 121 stands for any winning score
+        def reachable(scores, points):
+            return np.arange(scores[0],min(scores[-1]+points-1,N)+1)
+        dealerPegged = reachable([dealerScore],pegging.shape[0])
+        ponePegged = reachable([poneScore],pegging.shape[1])
+        dealerCounted = reachable(dealerPegged,dealerHands.shape[1])
+        poneCounted = reachable(ponePegged,poneHands.shape[1])
+        cribCounted = reachable(dealerCounted,cribs.shape[1])
+
+        # values for the dealer indexed [dealer's score, pone's score], working back from the next hand
+        nextHand = np.ones((N+1,N+1))
+        nextHand[:N,:N] = 1. - self.dealerWins.T # the pone deals the next hand
+        nextHand[:N,N] = 0.
+        values = _scoreTransitions(cribs,dealerCounted,cribCounted) @ nextHand[np.ix_(cribCounted,poneCounted)]
+        values[:,:,poneCounted == N] = 0.
+        values = values @ _scoreTransitions(poneHands,ponePegged,poneCounted).transpose(0,2,1)
+        values[:,dealerCounted == N,:] = 1.
+        values = _scoreTransitions(dealerHands,dealerPegged,dealerCounted) @ values
+        values[:,:,ponePegged == N] = 0.
+        values[:,dealerPegged == N,:] = 1.
+        if dealerPegged[-1] == N and ponePegged[-1] == N:
+            values[:,-1,-1] = 0.5 # both reach 121 in the pegging
+
+        dealerIdxs = np.minimum(dealerScore + np.arange(pegging.shape[0]),N) - dealerScore
+        poneIdxs = np.minimum(poneScore + np.arange(pegging.shape[1]),N) - poneScore
+        dealerWins = (values[:,dealerIdxs[:,None],poneIdxs[None,:]]*pegging).sum(axis=(1,2))
+        return np.broadcast_to(dealerWins if isDealer else 1. - dealerWins,(discards,)).copy()
+
+def _scoreTransitions(distributions, fromScores, toScores):
+    '''
+    Matrices moving a score by the points of each distribution, scores of 121 or more are kept at 121
+    distributions: (K,L) probabilities of scoring 0 to L-1 points
+    fromScores, toScores: consecutive scores, toScores must hold every score fromScores can reach
+    Returns np.array (K,len(fromScores),len(toScores))
+    '''
+    N = winningScore
+    rows = np.arange(fromScores.shape[0])
+    points = distributions.shape[1]
+    # place each row's distribution unclipped, then fold the scores past 121 into 121
+    unclipped = np.zeros((distributions.shape[0],fromScores.shape[0],fromScores.shape[0]+points-1))
+    unclipped[:,rows[:,None],rows[:,None]+np.arange(points)] = distributions[:,None,:]
+    winIdx = N - fromScores[0]
+    transitions = np.zeros((distributions.shape[0],fromScores.shape[0],toScores.shape[0]))
+    offset = fromScores[0] - toScores[0]
+    kept = min(unclipped.shape[2],winIdx)
+    transitions[:,:,offset:offset+kept] = unclipped[:,:,:kept]
+    if unclipped.shape[2] > winIdx:
+        transitions[:,:,N-toScores[0]] += unclipped[:,:,winIdx:].sum(axis=2)
+    if fromScores[-1] == N:
+        transitions[:,-1,:] = 0.
+        transitions[:,-1,N-toScores[0]] = 1.
+    return transitions
+
+def _shifted(distribution, shifts, size):
+    '''
+    Move a distribution of points by each of shifts, a fractional number of points, and
+        return them with size entries, np.array (len(shifts),size)
+        * each point value is split between the 2 nearest whole points, keeping the mean shift
+        * points below 0 are moved to 0 and points past the end to the last entry
+    '''
+    shifts = np.asarray(shifts,dtype=np.float64)
+    low = np.floor(shifts)
+    fraction = (shifts - low)[:,None]
+    rows = np.arange(shifts.shape[0])[:,None]
+    shifted = np.zeros((shifts.shape[0],size))
+    points = np.arange(distribution.shape[0])[None,:] + low.astype(np.int64)[:,None]
+    np.add.at(shifted,(rows,np.clip(points,0,size-1)),(1.-fraction)*distribution)
+    np.add.at(shifted,(rows,np.clip(points+1,0,size-1)),fraction*distribution)
+    return shifted
+
+def loadWinProbabilityTable(path=winProbabilityPath):
+    '''
+    Load tables saved with saveWinProbabilityTables
+    '''
+    with np.load(path) as arrays:
+        for name in ["dealerWins","afterPegging"]:
+            if arrays[name].shape != (winningScore,winningScore):
+                raise ValueError("Win probability table {} in {} has shape {}, expected ({},{})".format(name,path,arrays[name].shape,winningScore,winningScore))
+        return WinProbabilityTable(arrays["dealerWins"]/quantizationScale,
+                                    arrays["afterPegging"]/quantizationScale,
+                                    {name:arrays[name] for name in distributionNames})
+
+def getWinProbabilityTable():
+    '''
+    Return the shipped win probability table, it is loaded once per process
+    '''
+    global _winProbabilityTable
+    if _winProbabilityTable is None:
+        _winProbabilityTable = loadWinProbabilityTable()
+    return _winProbabilityTable
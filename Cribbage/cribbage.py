@@ -1,10 +1,3 @@
-import random
-import sys
-import time
-
-import numpy as np
-from itertools import combinations
-
 cardIdToName = [" A"," 2"," 3"," 4"," 5"," 6"," 7"," 8"," 9"," 10"," J"," Q", " K"]*4
 cardIdToSuiteName = ["H"]*13
 cardIdToSuiteName.extend(["D"]*13)
@@ -0,0 +1,79 @@
+from unittest import TestCase
+from Cribbage import Game
+from Cribbage.BatchSim import BatchSim
+from Cribbage.DiscardOptimizer import getDiscardOptimizer
+from Cribbage.HandScorer import getDefaultScorer
+import numpy as np
+
+class test_BatchSim(TestCase):
+
+    def test_playHand(self):
+        '''
+        Verify a batch of hands scores the same as Game.playHand on the same decks
+        '''
+        rng = np.random.default_rng(0)
+        decks = rng.permuted(np.broadcast_to(np.arange(52),(500,52)),axis=1)[:,:13]
+        for player1Dealer in [True,False]:
+            scores = np.zeros((decks.shape[0],2),dtype=np.int64)
+            BatchSim().playHand(decks,player1Dealer,scores)
+            for deck, handScores in zip(decks,scores):
+                game = Game("random","random",verbose=False)
+                game.deck.cards = deck[::-1].tolist() # Game pops cards from the end
+                game.player1Dealer = not player1Dealer # playHand inverts this
+                game.playHand()
+                self.assertEqual([game.player1Score,game.player2Score],handScores.tolist())
+
+    def test_discard(self):
+        '''
+        Verify best4cardhand keeps a hand worth as much as Best4CardHandPlayer's
+        '''
+        scorer = getDefaultScorer()
+        rng = np.random.default_rng(1)
+        decks = rng.permuted(np.broadcast_to(np.arange(52),(300,52)),axis=1)[:,:6]
+        hands, cribs = BatchSim("best4cardhand","random")._discard("best4cardhand",decks)
+        for deck, hand, crib in zip(decks,hands,cribs):
+            game = Game("best4cardhand","random",verbose=False)
+            game.deck.cards = deck[::-1].tolist()
+            game.player1.deal(game.deck,True,scorer)
+            self.assertEqual(sorted(hand.tolist()+crib.tolist()),sorted(deck.tolist()))
+            self.assertEqual(scorer(hand.tolist(),None),scorer(game.player1.hand,None))
+
+    def test_expectedValues(self):
+        '''
+        Verify the expected values match DiscardOptimizer and bestexpectedvalue keeps a hand worth
+            as much as BestExpectedValuePlayer's
+        '''
+        scorer = getDefaultScorer()
+        optimizer = getDiscardOptimizer(scorer)
+        rng = np.random.default_rng(2)
+        decks = rng.permuted(np.broadcast_to(np.arange(52),(100,52)),axis=1)[:,:6]
+        sim = BatchSim("bestexpectedvalue","random")
+        handValues, cribValues = sim.expectedValues(decks)
+        for deck, hand, crib in zip(decks,handValues,cribValues):
+            expectedHand, expectedCrib = optimizer.expectedValues(deck.tolist())
+            np.testing.assert_allclose(hand,expectedHand)
+            np.testing.assert_allclose(crib,expectedCrib)
+
+        for isDealer in [True,False]:
+            hands, cribs = sim._discard("bestexpectedvalue",decks,isDealer)
+            for deck, hand, crib in zip(decks,hands,cribs):
+                game = Game("bestexpectedvalue","random",verbose=False)
+                game.deck.cards = deck[::-1].tolist()
+                game.player1.deal(game.deck,isDealer,scorer)
+                self.assertEqual(sorted(hand.tolist()+crib.tolist()),sorted(deck.tolist()))
+                values = optimizer.scorePossibleDiscards(deck.tolist(),isDealer)["totalValues"]
+                positions = [deck.tolist().index(cardId) for cardId in crib.tolist()]
+                self.assertAlmostEqual(values[min(positions),max(positions)],game.player1.predictedScore)
+
+    def test_playGames(self):
+        '''
+        Verify every game in a batch is played to 121 and the seed repeats the games
+        '''
+        sim = BatchSim("best4cardhand","random")
+        scores = sim.playGames(200,seed=3)
+        self.assertTrue((scores.max(axis=1) >= 121).all())
+        self.assertGreater(sim.handsPlayed,200*8)
+        np.testing.assert_array_equal(scores,BatchSim("best4cardhand","random").playGames(200,seed=3))
+        scores = BatchSim("bestexpectedvalue","random").playGames(20,seed=3)
+        self.assertTrue((scores.max(axis=1) >= 121).all())
+        self.assertRaises(ValueError,BatchSim,"searchpegging","random")
@@ -0,0 +1,64 @@
+from unittest import TestCase
+from Cribbage.Benchmark import Benchmark, runBenchmark, runBenchmarks, compareResults, checkLimits, checkSpeedups, \
+    scorerBenchmarks, playerBenchmarks, gameBenchmarks, budgetBenchmarks, simBenchmarks
+import json
+
+class test_Benchmark(TestCase):
+
+    def test_runBenchmark(self):
+        '''
+        Verify setup runs before every trial, including the warmup trials
+        '''
+        calls = []
+        benchmark = Benchmark("test",lambda: (lambda: calls.append(1)),operations=4)
+        result = runBenchmark(benchmark,trials=3,warmup=2)
+        self.assertEqual(len(calls),5)
+        self.assertEqual(len(result["trials"]),3)
+        self.assertAlmostEqual(result["perOperation"],result["median"]/4)
+
+    def test_suite(self):
+        '''
+        Verify every group of benchmarks runs and the results can be written to JSON
+        '''
+        benchmarks = scorerBenchmarks(scale=0.01) + \
+            playerBenchmarks(specs=["random",{"type":"searchpegging","nodeBudget":20}],scale=0.1) + \
+            gameBenchmarks(matchups=[("random","random")],scale=0.1) + \
+            budgetBenchmarks(budgets=[("random",60.)],scale=0.05) + \
+            simBenchmarks(scale=0.05)
+        results = runBenchmarks(benchmarks,trials=1,warmup=0)
+        names = list(results["benchmarks"])
+        self.assertIn("scorer.call.cold",names)
+        self.assertIn("players.searchpegging(nodeBudget=20).playCard",names)
+        self.assertIn("game.random.vs.random",names)
+        self.assertEqual(results["benchmarks"]["budget.random"]["limit"],60.)
+        self.assertIn("sim.random.vs.random",names)
+        self.assertEqual(json.loads(json.dumps(results))["benchmarks"].keys(),results["benchmarks"].keys())
+
+    def test_compareResults(self):
+        '''
+        Verify slower and faster benchmarks are flagged and unmatched names are reported
+        '''
+        def results(times):
+            return {"benchmarks":{name:{"perOperation":time} for name, time in times.items()}}
+        baseline = results({"a":1.,"b":1.,"c":1.,"d":1.})
+        current = results({"a":1.05,"b":1.5,"c":0.5,"e":1.})
+        statuses = {item[0]:item[-1] for item in compareResults(current,baseline,tolerance=0.1)}
+        self.assertEqual(statuses,{"a":"ok","b":"regression","c":"improvement","d":"missing","e":"new"})
+
+    def test_checkLimits(self):
+        '''
+        Verify only benchmarks with a limit that are slower than it are reported
+        '''
+        results = {"benchmarks":{"a":{"perOperation":0.06,"limit":0.05},
+                                "b":{"perOperation":0.04,"limit":0.05},
+                                "c":{"perOperation":1.,"limit":None},
+                                "d":{"perOperation":1.}}}
+        self.assertEqual(checkLimits(results),[("a",0.06,0.05)])
+
+    def test_checkSpeedups(self):
+        '''
+        Verify only benchmarks less than the required times faster than their reference are reported
+        '''
+        results = {"benchmarks":{"a":{"perOperation":1.},"b":{"perOperation":0.2},"c":{"perOperation":0.05}}}
+        speedups = [("b","a",10.),("c","a",10.),("d","a",10.)]
+        self.assertEqual(checkSpeedups(results,speedups),[("b","a",5.,10.)])
@@ -0,0 +1,64 @@
+from unittest import TestCase
+from Cribbage import HandScorer
+from Cribbage.Canonical import canonicalHand, canonicalHandAndTurn, canonicalDeal, canonicalPositions, relabelCards, inverseSuiteMap, isCanonical
+from itertools import combinations
+import numpy as np
+import random
+
+class test_Canonical(TestCase):
+
+    def test_suiteInvariance(self):
+        '''
+        Verify relabeling the suites does not change the canonical form or the score
+        '''
+        scorer = HandScorer()
+        rng = random.Random(0)
+        for ii in range(300):
+            cards = rng.sample(range(52),6)
+            suiteMap = rng.sample(range(4),4)
+            relabeled = relabelCards(cards,suiteMap)
+            rng.shuffle(relabeled)
+
+            self.assertEqual(canonicalHand(cards),canonicalHand(relabeled))
+            self.assertTrue(isCanonical(canonicalHand(cards)))
+            self.assertEqual(canonicalHandAndTurn(cards[:4],cards[4]),
+                            canonicalHandAndTurn(relabelCards(cards[:4],suiteMap),relabelCards([cards[4]],suiteMap)[0]))
+
+            hand, turn = canonicalHandAndTurn(cards[:4],cards[4])
+            self.assertEqual(scorer(list(hand),turn),scorer(cards[:4],cards[4]))
+
+    def test_mapBack(self):
+        '''
+        Verify the suite map and positions take the dealt cards to the canonical cards
+        '''
+        cards = [40,2,15,28,41,3]
+        canonical, suiteMap = canonicalDeal(cards)
+        self.assertEqual(sorted(relabelCards(cards,suiteMap)),list(canonical))
+        self.assertEqual(sorted(relabelCards(canonical,inverseSuiteMap(suiteMap))),sorted(cards))
+
+        canonical, suiteMap, positions = canonicalPositions(cards)
+        for cardId, position in zip(cards,positions):
+            self.assertEqual(relabelCards([cardId],suiteMap)[0],canonical[position])
+
+    def test_classCount(self):
+        '''
+        Verify the number of classes of 2 and 3 card hands
+        '''
+        self.assertEqual(len({canonicalHand(cards) for cards in combinations(range(52),2)}),169)
+        self.assertEqual(len({canonicalHand(cards) for cards in combinations(range(52),3)}),1755)
+
+    def test_canonicalCache(self):
+        '''
+        Verify the memoized hand scores match computing them directly
+        '''
+        scorer = HandScorer()
+        scorerNoCache = HandScorer(useCanonicalCache=False)
+        rng = random.Random(1)
+        hand = rng.sample(range(52),6)
+        for suiteMap in [[0,1,2,3],[3,2,1,0],[1,3,0,2]]:
+            relabeled = relabelCards(hand,suiteMap)
+            scores, turnCards = scorer.possibleHandScores(relabeled)
+            scoresNoCache, turnCardsNoCache = scorerNoCache.possibleHandScores(relabeled)
+            np.testing.assert_array_equal(scores,scoresNoCache)
+            np.testing.assert_array_equal(turnCards,turnCardsNoCache)
+        self.assertEqual(len(scorer.canonicalHandScores),1) # all 3 deals are in the same class
@@ -0,0 +1,41 @@
+from unittest import TestCase
+from Cribbage.CardSet import CardSet
+import random
+
+class test_CardSet(TestCase):
+
+    def test_setOperations(self):
+        '''
+        Verify the set behaves the same as a python set of cardIds
+        '''
+        rng = random.Random(0)
+        for ii in range(100):
+            cards = rng.sample(range(52),rng.randint(0,20))
+            others = rng.sample(range(52),rng.randint(0,20))
+            cardSet = CardSet(cards)
+            otherSet = CardSet(others)
+
+            self.assertEqual(len(cardSet),len(cards))
+            self.assertEqual(cardSet.cards(),sorted(cards))
+            self.assertEqual((cardSet | otherSet).cards(),sorted(set(cards) | set(others)))
+            self.assertEqual((cardSet & otherSet).cards(),sorted(set(cards) & set(others)))
+            self.assertEqual((cardSet - otherSet).cards(),sorted(set(cards) - set(others)))
+            self.assertEqual(cardSet.complement().cards(),sorted(set(range(52)) - set(cards)))
+            for cardId in range(52):
+                self.assertEqual(cardId in cardSet,cardId in cards)
+
+        cardSet = CardSet([0,51])
+        cardSet.add(13)
+        cardSet.remove(0)
+        cardSet.discard(0) # no error when not in the set
+        self.assertRaises(KeyError,cardSet.remove,0)
+        self.assertEqual(cardSet,CardSet([13,51]))
+        self.assertEqual(len({CardSet([1,2]),CardSet([2,1])}),1)
+
+    def test_histograms(self):
+        '''
+        Verify the suite and face value histograms
+        '''
+        cardSet = CardSet([0,13,26,4,9,10,11+13,12+39]) # A,A,A,5,10,J hearts, Q diamonds, K spades
+        self.assertEqual(cardSet.suiteHistogram(),[4,2,1,1])
+        self.assertEqual(cardSet.faceValueHistogram(),[3,0,0,0,1,0,0,0,0,1,1,1,1])
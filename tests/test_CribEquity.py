@@ -0,0 +1,58 @@
+from unittest import TestCase
+from Cribbage import HandScorer, Game
+from Cribbage.CribEquity import cribEquity, getCribEquityTable
+import numpy as np
+from itertools import combinations
+
+class test_CribEquity(TestCase):
+
+    def test_table(self):
+        '''
+        Verify the shipped table is symmetric and signed by crib ownership
+        '''
+        table = getCribEquityTable()
+        self.assertEqual(table.shape,(2,13,13,2))
+        np.testing.assert_array_equal(table[1],-table[0])
+        np.testing.assert_array_equal(table[1,:,:,0],table[1,:,:,0].T)
+        self.assertTrue(np.isnan(table[1,np.arange(13),np.arange(13),1]).all()) # pairs cannot be suited
+        self.assertTrue((table[1,:,:,0] > 0).all())
+
+        # 5,5 is the best discard to your own crib
+        self.assertEqual(np.nanargmax(table[1,:,:,0]),4*13+4)
+
+    def test_cribEquity(self):
+        '''
+        Verify a lookup matches scoring every crib completion for the discard
+        '''
+        scorer = HandScorer()
+        discard = [4,17] # 5 H, 5 D
+        unknownCards = [cardId for cardId in range(52) if cardId not in discard]
+        cribs = []
+        turns = []
+        for cribCard1, cribCard2 in combinations(unknownCards,2):
+            for turnCard in unknownCards:
+                if turnCard not in [cribCard1,cribCard2]:
+                    cribs.append(discard + [cribCard1,cribCard2])
+                    turns.append(turnCard)
+        expected = scorer.score_batch(np.array(cribs),np.array(turns)).mean()
+
+        self.assertAlmostEqual(cribEquity([4+13*3,4+13*2],True),expected,places=4) # any 2 fives are the same
+        self.assertAlmostEqual(cribEquity([4,17],False),-expected,places=4)
+
+    def test_BestHandAndCribEquityPlayer(self):
+        '''
+        Verify the player keeps the hand with the best minimum score plus crib equity
+        '''
+        scorer = HandScorer()
+        for isDealer in [True,False]:
+            game = Game("besthandandcribequity","random",scorer=scorer)
+            dealt = game.deck.cards[-6:][::-1]
+            cribCards = game.player1.deal(game.deck,isDealer,scorer)
+            if isDealer:
+                cribCards = game.player1.crib
+
+            mins = scorer.scorePossible5CardHand(dealt)['mins']
+            best = max(mins[ii,jj] + cribEquity([dealt[ii],dealt[jj]],isDealer) for ii,jj in combinations(range(6),2))
+            chosen = mins[dealt.index(cribCards[0]),dealt.index(cribCards[1])] + cribEquity(cribCards,isDealer) # crib cards are in dealt order
+            self.assertEqual(sorted(game.player1.hand + cribCards),sorted(dealt))
+            self.assertAlmostEqual(chosen,best,places=4)
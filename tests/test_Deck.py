@@ -1,5 +1,7 @@
 from unittest import TestCase
 from Cribbage import Deck, HandScorer
+from Cribbage.Deck import spawnSeeds
+import random
 import numpy as np
 
 class test_Deck(TestCase):
@@ -38,3 +40,24 @@ class test_Deck(TestCase):
         self.assertEqual(deck.cardIdsToCountValue(cards),countValues)
         self.assertEqual(deck.cardIdsToFaceValue(cards),faceValues)
         self.assertEqual(deck.cardIdsToSuites(cards),suites)
+
+    def test_seed(self):
+        '''
+        Verify decks with the same seed shuffle the same and seeds split reproducibly
+        '''
+        deck1 = Deck(seed=5)
+        deck2 = Deck(seed=5)
+        self.assertEqual(deck1.cards,deck2.cards)
+        deck1.shuffle()
+        deck2.shuffle()
+        self.assertEqual(deck1.cards,deck2.cards)
+        self.assertNotEqual(deck1.cards,Deck(seed=6).cards)
+
+        deck3 = Deck(rng=random.Random(5)) # same stream as seed=5
+        self.assertEqual(deck3.cards,Deck(seed=5).cards)
+
+        seeds = spawnSeeds(5,10)
+        self.assertEqual(seeds,spawnSeeds(5,10))
+        self.assertEqual(seeds[:4],spawnSeeds(5,4)) # children do not depend on the count
+        self.assertEqual(len(set(seeds)),10)
+        self.assertEqual(len(set(seeds) & set(spawnSeeds(6,10))),0)
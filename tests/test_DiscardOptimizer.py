@@ -0,0 +1,67 @@
+from unittest import TestCase
+from Cribbage import HandScorer, Game
+from Cribbage.DiscardOptimizer import DiscardOptimizer, getDiscardOptimizer
+from Cribbage.Canonical import relabelCards
+from itertools import combinations
+import numpy as np
+
+class test_DiscardOptimizer(TestCase):
+
+    def test_expectedValues(self):
+        '''
+        Verify the expected values match scoring every turn card and crib completion
+        '''
+        scorer = HandScorer()
+        optimizer = DiscardOptimizer(scorer)
+        hand = [10,23,4,17,11+26,3] # J H, J D, 5 H, 5 D, Q C, 4 H - knobs and flushes in the crib
+        handValues, cribValues = optimizer.expectedValues(hand)
+
+        unknownCards = [cardId for cardId in range(52) if cardId not in hand]
+        completions = []
+        turns = []
+        for turnCard in unknownCards:
+            for cribCards in combinations([cardId for cardId in unknownCards if cardId != turnCard],2):
+                completions.append(cribCards)
+                turns.append(turnCard)
+        completions = np.array(completions)
+        turns = np.array(turns)
+
+        for idx, (ii,jj) in enumerate(combinations(range(6),2)):
+            keptHand = [cardId for kk, cardId in enumerate(hand) if kk not in (ii,jj)]
+            handValue = np.mean([scorer(keptHand,turnCard) for turnCard in unknownCards])
+            self.assertAlmostEqual(handValues[idx],handValue)
+
+            cribs = np.concatenate([np.tile([hand[ii],hand[jj]],(turns.shape[0],1)),completions],axis=1)
+            self.assertAlmostEqual(cribValues[idx],scorer.score_batch(cribs,turns).mean())
+
+    def test_memo(self):
+        '''
+        Verify deals that only differ by suites share a memo entry and give the same values
+        '''
+        optimizer = DiscardOptimizer(HandScorer())
+        hand = [0,14,28,42,9,22]
+        handValues, cribValues = optimizer.expectedValues(hand)
+        reversedHand = relabelCards(hand,[2,0,3,1])[::-1]
+        relabeledValues, relabeledCribValues = optimizer.expectedValues(reversedHand)
+        pairs = list(combinations(range(6),2))
+        for idx, (ii,jj) in enumerate(pairs):
+            reversedIdx = pairs.index((5-jj,5-ii))
+            self.assertAlmostEqual(relabeledValues[reversedIdx],handValues[idx])
+            self.assertAlmostEqual(relabeledCribValues[reversedIdx],cribValues[idx])
+        self.assertEqual(len(optimizer.cache),1)
+        self.assertIs(getDiscardOptimizer(),getDiscardOptimizer())
+
+    def test_BestExpectedValuePlayer(self):
+        '''
+        Verify the player takes the discard with the highest expected value
+        '''
+        for isDealer in [True,False]:
+            game = Game("bestexpectedvalue","random",seed=4)
+            dealt = game.deck.cards[-6:][::-1]
+            game.player1.deal(game.deck,isDealer,game.handScorer)
+
+            result = getDiscardOptimizer(game.handScorer).scorePossibleDiscards(dealt,isDealer)
+            totalValues = result['totalValues']
+            keptIdxs = sorted(dealt.index(cardId) for cardId in game.player1.hand)
+            dropIdxs = [idx for idx in range(6) if idx not in keptIdxs]
+            self.assertEqual(totalValues[dropIdxs[0],dropIdxs[1]],totalValues.max())
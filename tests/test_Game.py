@@ -1,5 +1,6 @@
 from unittest import TestCase
 from Cribbage import Game
+from Cribbage.Game import DuplicateGame
 from Cribbage.Exceptions import EndOfGameException
 from Cribbage.cribbage import cardIdToFaceValue
 
@@ -12,7 +13,7 @@ class test_Game(TestCase):
         '''
         Verify that either player at or over 121 sets gameOver flag
         '''
-        game = Game("random","random","do-not-create")
+        game = Game("random","random")
 
         cases = [[100,121,True],
                 [121,0,True],
@@ -38,7 +39,7 @@ class test_Game(TestCase):
         # Player 1 gets crib
         # turn is 12
         # no points are given out
-        game = Game("random","random",scorer="do-not-create") # not counting hands, so do not create a scorer
+        game = Game("random","random")
         game.player1Dealer = True
         game.deck.cards = [12,6,7,0,1,2,3,4,5,8,9,10,11] 
         game._deal()
@@ -54,7 +55,7 @@ class test_Game(TestCase):
         # Player 2 gets crib
         # turn is 23 (Jack)
         # Player gets 2 for His Heels
-        game = Game("random","random",scorer="do-not-create") # not counting hands, so do not create a scorer
+        game = Game("random","random")
         game.player1Dealer = False
         game.deck.cards = [23,6,7,0,1,2,3,4,5,8,9,10,11] 
         game._deal()
@@ -71,7 +72,7 @@ class test_Game(TestCase):
         Test cases for the score when a player lays down cards
         '''
 
-        game = Game("random","random",scorer="do-not-create") # not counting hands, so do not create a scorer
+        game = Game("random","random")
 
         # each row is [[cardsPlayed],cardsSinceReset,score]
         cases = [
@@ -100,7 +101,7 @@ class test_Game(TestCase):
         # player1 unable to lay (just layed a None)
         # player2 was able to lay previous round
         # both players have score == 0 to start
-        game = Game("random","random",scorer="do-not-create") # not counting hands, so do not create a scorer
+        game = Game("random","random")
         game.cardTotal = 25
         game.cardsSinceReset = 3
         game.cardsPlayed = [9,10,4]
@@ -219,6 +220,39 @@ class test_Game(TestCase):
         self.assertEqual(game.player1Score,26+3+0) # 26 from previous hand, 3 pegging, 0 hand
         self.assertEqual(game.player2Score,17+6+14) # 17 from previous hand, 6 pegging, 14 hand
 
+    def test_seed(self):
+        '''
+        Verify games with the same seed are dealt the same cards regardless of the players
+        '''
+        game1 = Game("random","random",verbose=False,seed=11)
+        game2 = Game("bestminimalscore","random",verbose=False,seed=11)
+        for hand in range(3):
+            game1.deck.shuffle()
+            game2.deck.shuffle()
+            self.assertEqual(game1.deck.cards,game2.deck.cards)
 
+        game1 = Game("random","bestminimalscore",verbose=False,seed=11)
+        game1.playGame()
+        game2 = Game("random","bestminimalscore",verbose=False,seed=11)
+        game2.playGame()
+        self.assertEqual([game1.player1Score,game1.player2Score],[game2.player1Score,game2.player2Score])
 
+    def test_DuplicateGame(self):
+        '''
+        Verify the seats are dealt the same cards in both games of a duplicate game
+        '''
+        # the players do not use any randomness, so the same type in both seats plays identical games
+        game = DuplicateGame("bestminimalscore","random",seed=2)
+        self.assertEqual(game.games[0].deck.cards,game.games[1].deck.cards)
+        game = DuplicateGame("random","random",seed=2)
+        game.playGame()
+        self.assertEqual(game.scores()[:2],game.scores()[2:])
+        self.assertEqual(game.winDifference,0)
+        self.assertEqual(game.spreadDifference,0)
+        self.assertEqual(game.playerAWins,1)
 
+        game = DuplicateGame("bestminimalscore","random",seed=2)
+        game.playGame()
+        scores = game.scores()
+        self.assertEqual(game.playerAWins,int(scores[0] > scores[1]) + int(scores[3] > scores[2]))
+        self.assertEqual(game.spreadDifference,(scores[0]-scores[1]) - (scores[2]-scores[3]))
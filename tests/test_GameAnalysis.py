@@ -0,0 +1,72 @@
+from unittest import TestCase
+from Cribbage import Game
+from Cribbage.GameLog import GameLogWriter, readGameLog
+from Cribbage.GameAnalysis import HandColumns, groupBy, discardStats, peggingStats, scoreDistribution
+import numpy as np
+import os
+import tempfile
+
+class test_GameAnalysis(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpDir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmpDir.name,"games.log")
+        with GameLogWriter(cls.path) as writer:
+            for seed in range(10):
+                Game("bestexpectedvalueandscorepegging","random",verbose=False,seed=seed,recorder=writer).playGame()
+        cls.records = np.array(readGameLog(cls.path))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpDir.cleanup()
+
+    def test_columns(self):
+        '''
+        Verify the rows match the records they came from
+        '''
+        columns = HandColumns(self.path)
+        complete = self.records[self.records['gameOver'] == 0]
+        self.assertEqual(len(columns),2*len(complete))
+        for row in [0,1,2,len(columns)-1]:
+            record = complete[row//2]
+            seat = row % 2
+            self.assertEqual(columns.isDealer[row],record['dealer'] == seat)
+            self.assertEqual(list(columns.keptHand[row]),list(record['hands'][seat]))
+            discard = record['crib'][:2] if record['dealer'] == seat else record['crib'][2:]
+            self.assertEqual(list(columns.discard[row]),list(discard))
+            self.assertEqual(columns.handPoints[row],record['handPoints'][seat])
+            self.assertEqual(columns.peggingPoints[row],record['peggingPoints'][seat])
+        # every point is someone's gain and the other's loss
+        self.assertTrue((columns.netPoints.reshape(-1,2).sum(axis=1) == 0).all())
+        self.assertEqual(len(HandColumns(self.records,completeOnly=False)),2*len(self.records))
+
+    def test_groupBy(self):
+        '''
+        Verify the group-by against a loop over the rows
+        '''
+        rng = np.random.default_rng(0)
+        keys = rng.integers(0,4,(500,2))
+        values = rng.normal(size=500)
+        stats = groupBy([keys[:,0],keys[:,1]],values).asDict()
+        self.assertEqual(len(stats),16)
+        for key, (count, mean, variance) in stats.items():
+            selected = values[(keys[:,0] == key[0]) & (keys[:,1] == key[1])]
+            self.assertEqual(count,selected.shape[0])
+            self.assertAlmostEqual(mean,selected.mean())
+            self.assertAlmostEqual(variance,selected.var())
+
+    def test_stats(self):
+        '''
+        Verify the aggregate statistics cover every row
+        '''
+        columns = HandColumns(self.records)
+        discards = discardStats(columns)
+        self.assertEqual(discards.counts.sum(),len(columns))
+        self.assertTrue((discards.keys[:,1] <= discards.keys[:,2]).all())
+        pegging = peggingStats(columns)
+        self.assertEqual(list(pegging.keys),[0,1])
+        self.assertAlmostEqual(pegging.means[1],columns.peggingPoints[columns.isDealer].mean())
+        distribution = scoreDistribution(columns.handPoints,29)
+        self.assertEqual(distribution.shape,(30,))
+        self.assertAlmostEqual(distribution.sum(),1.)
@@ -0,0 +1,90 @@
+from unittest import TestCase
+from Cribbage import Game
+from Cribbage.GameLog import GameLogWriter, readGameLog, handRecordDtype, noCard
+import numpy as np
+import os
+import tempfile
+
+class test_GameLog(TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpDir.name,"games.log")
+
+    def tearDown(self):
+        self.tmpDir.cleanup()
+
+    def _playGames(self, gameCount, bufferRecords=65536):
+        games = []
+        with GameLogWriter(self.path,bufferRecords=bufferRecords) as writer:
+            for seed in range(gameCount):
+                game = Game("bestexpectedvalueandscorepegging","random",verbose=False,seed=seed,recorder=writer)
+                game.playGame()
+                games.append(game)
+        return games, readGameLog(self.path)
+
+    def test_recordSize(self):
+        '''
+        Verify the records are packed
+        '''
+        self.assertEqual(handRecordDtype.itemsize,37)
+
+    def test_scoresAddUp(self):
+        '''
+        Verify the points of every hand add up to the final score of each game
+        '''
+        games, records = self._playGames(5,bufferRecords=7)
+        self.assertIsInstance(records,np.memmap)
+        self.assertEqual(sorted(set(records['gameId'])),list(range(5)))
+        for game in games:
+            hands = records[records['gameId'] == game.gameId]
+            self.assertEqual(list(hands['handNumber']),list(range(1,game.handNumber+1)))
+            self.assertEqual(list(hands['gameOver']),[0]*(len(hands)-1)+[1])
+            self.assertEqual(list(hands['dealer'][:2]),[0,1])
+
+            points = np.zeros(2,dtype=np.int64)
+            for hand in hands:
+                self.assertEqual(list(hand['startScores']),list(points))
+                points[hand['dealer']] += int(hand['heelsPoints']) + int(hand['cribPoints'])
+                points += hand['peggingPoints'] + hand['handPoints']
+            self.assertEqual(list(points),[game.player1Score,game.player2Score])
+
+    def test_cards(self):
+        '''
+        Verify the cards of a completed hand are recorded
+        '''
+        games, records = self._playGames(3)
+        for hand in records[records['gameOver'] == 0]:
+            cards = list(hand['hands'].ravel()) + list(hand['crib']) + [hand['turnCard']]
+            self.assertEqual(len(set(cards)),13)
+            self.assertTrue(all(card < 52 for card in cards))
+            self.assertEqual(sorted(hand['pegging']),sorted(hand['hands'].ravel()))
+        last = records[-1]
+        self.assertEqual(last['gameOver'],1)
+        self.assertEqual(list(last['pegging']),_playedOrPadded(games[-1].cardsPlayed))
+
+    def test_readWhileWriting(self):
+        '''
+        Verify a log can be read before it is closed, a partial record is ignored
+        '''
+        writer = GameLogWriter(self.path,bufferRecords=1)
+        self.assertEqual(len(readGameLog(self.path)),0)
+        game = Game("random","random",verbose=False,seed=1,recorder=writer)
+        game.playHand()
+        self.assertEqual(len(readGameLog(self.path)),1)
+        with open(self.path,'ab') as fp:
+            fp.write(b"\0"*5)
+        self.assertEqual(len(readGameLog(self.path)),1)
+        writer.close()
+
+    def test_badFile(self):
+        '''
+        Verify a file that is not a game log is rejected
+        '''
+        with open(self.path,'wb') as fp:
+            fp.write(b"not a log file")
+        with self.assertRaises(ValueError):
+            readGameLog(self.path)
+
+def _playedOrPadded(cardsPlayed):
+    return list(cardsPlayed) + [noCard]*(8-len(cardsPlayed))
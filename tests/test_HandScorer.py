@@ -1,7 +1,17 @@
 from unittest import TestCase
-from Cribbage import HandScorer
+from Cribbage import HandScorer, Game
+from Cribbage.HandScorer import scoreTableSize, getDefaultScorer, fifteenCombinations, fifteenCombinationsFromHistogram, \
+    faceHistogram, scorePairsFromHistogram, scoreRunsFromHistogram
 from Cribbage.cribbage import cardIdToFaceValue
 import numpy as np
+import random
+import tempfile
+import struct
+import os
+import subprocess
+import sys
+from itertools import combinations, combinations_with_replacement
+from Cribbage.ScorerCache import cacheVersion
 
 class test_HandScorer(TestCase):
 
@@ -12,13 +22,11 @@ class test_HandScorer(TestCase):
         scorer = HandScorer()
         score = scorer([0,1,2,3],4) # verify order independent
         self.assertEqual(score,12)
-        self.assertEqual(scorer.scores_15s[1,2,3,4,5],2) # uses count value as idx
         self.assertEqual(scorer.scores_pairs[1,2,3,4,5],0) # uses face value as idx
         self.assertEqual(scorer.scores_straight[1,2,3,4,5],5) # uses face value as idx
 
         score = scorer([0,1,2,3],None) # verify order independent
         self.assertEqual(score,8)
-        self.assertEqual(scorer.scores_15s_4card[1,2,3,4],0) # uses count value as idx
         self.assertEqual(scorer.scores_pairs_4card[1,2,3,4],0) # uses face value as idx
         self.assertEqual(scorer.scores_straight_4card[1,2,3,4],4) # uses face value as idx
 
@@ -58,6 +66,48 @@ class test_HandScorer(TestCase):
             score = scorer.score15s(cardsInHand,turn)
             self.assertEqual(score,scoreCorrect)
 
+    def test_fifteenCombinations(self):
+        '''
+        Verify the subset-sum count against enumerating every subset, for every multiset
+            of count values of up to 6 cards
+        '''
+        for cardCount in range(7):
+            for values in combinations_with_replacement(range(1,11),cardCount):
+                if any(values.count(value) > (16 if value == 10 else 4) for value in values):
+                    continue
+                expected = sum(1 for used in range(cardCount+1)
+                                for subset in combinations(values,used) if sum(subset) == 15)
+                self.assertEqual(fifteenCombinations(values),expected,msg="values {}".format(values))
+
+        scorer = HandScorer()
+        self.assertEqual(scorer.score15s([4,9,10,11,4+13,9+13],None),16) # 5,10,J,Q,5,10, each 5 with each ten
+        self.assertEqual(fifteenCombinations([5]*3),1)
+        self.assertEqual(fifteenCombinationsFromHistogram([0,0,0,0,0,2,0,0,0,0,4]),8)
+        self.assertEqual(fifteenCombinationsFromHistogram([0,0,0,0,0,4,0,0,0,0,0]),4) # any 3 of the 5s
+        self.assertEqual(fifteenCombinationsFromHistogram([0,0,0,0,0,4,0,0,0,0,2]),8 + 4)
+        for values in combinations_with_replacement(range(1,11),6):
+            histogram = [0]*11
+            for value in values:
+                histogram[value] += 1
+            self.assertEqual(fifteenCombinationsFromHistogram(histogram),fifteenCombinations(list(values)))
+
+    def test_histogramScoring(self):
+        '''
+        Verify the histogram pairs and runs against the combination search they replaced,
+            for every multiset of face values of 4, 5 and 6 cards
+        '''
+        for cardCount in [4,5,6]:
+            for faces in combinations_with_replacement(range(1,14),cardCount):
+                if any(faces.count(face) > 4 for face in faces):
+                    continue
+                histogram = faceHistogram(faces)
+                self.assertEqual(scorePairsFromHistogram(histogram),_referencePairs(faces),msg="faces {}".format(faces))
+                self.assertEqual(scoreRunsFromHistogram(histogram),_referenceStraight(faces),msg="faces {}".format(faces))
+
+        # 2 separate runs and a run ending on the king
+        self.assertEqual(scoreRunsFromHistogram(faceHistogram([1,2,3,11,12,13])),6)
+        self.assertEqual(scoreRunsFromHistogram(faceHistogram([3,4,4,5,5])),12)
+
     def test_scoreKnobs(self):
 
         scorer = HandScorer()
@@ -141,6 +191,30 @@ class test_HandScorer(TestCase):
             score = scorer(cardsInHand,turn)
             self.assertEqual(score,scoreCorrect)
 
+    def test_scoreDistributions(self):
+        '''
+        Verify the distributions against scoring every kept hand with every turn card
+        '''
+        scorer = HandScorer()
+        rng = random.Random(5)
+        for trial in range(5):
+            hand = rng.sample(range(52),6)
+            result = scorer.scoreDistributions(hand,quantiles=(0.,0.5,1.))
+            for ii in range(5):
+                for jj in range(ii+1,6):
+                    kept = [card for idx, card in enumerate(hand) if idx not in (ii,jj)]
+                    scores = np.array([scorer(kept,turn) for turn in range(52) if turn not in hand])
+                    self.assertAlmostEqual(result["means"][ii,jj],scores.mean())
+                    self.assertAlmostEqual(result["variances"][ii,jj],scores.var())
+                    self.assertEqual(result["mins"][ii,jj],scores.min())
+                    self.assertEqual(result["maxs"][ii,jj],scores.max())
+                    self.assertEqual(list(result["quantiles"][ii,jj]),[scores.min(),np.quantile(scores,0.5,method='inverted_cdf'),scores.max()])
+                    self.assertAlmostEqual(result["probabilities"][ii,jj].sum(),1.)
+                    for points in [0,4,8,12]:
+                        self.assertAlmostEqual(result["atLeast"][ii,jj,points],(scores >= points).mean())
+            self.assertTrue(result["means"].mask[5-1,0])
+            self.assertEqual(result["means"].count(),15)
+
     def test_potentialScoreMap(self):
         '''
 
@@ -176,3 +250,151 @@ class test_HandScorer(TestCase):
             maxScore = scoreMap.max()
 
             self.assertEqual(maxScore,maxScoreCorrect,msg="predicted max {} correct max {} with hand {}".format(maxScore,maxScoreCorrect,cardsDealt))
+
+    def test_scoreTable(self):
+        '''
+        Verify the precomputed score table matches the scorer for the known cases and
+            a random sample of hands
+        '''
+        scorer = HandScorer()
+        scorerTable = HandScorer(useScoreTable=True)
+        self.assertEqual(scorerTable.scoreTable.shape,(scoreTableSize,))
+        self.assertFalse((scorerTable.scoreTable == -1).any())
+
+        cases = [[[0,1,2,3],4,12],
+                [[8,10,11+13*3,12],36,8],
+                [[1,10,5,4],23,10],
+                [[26, 51, 49, 20],47,1]]
+        for cardsInHand,turn,scoreCorrect in cases:
+            self.assertEqual(scorerTable(cardsInHand,turn),scoreCorrect)
+            self.assertEqual(scorerTable(cardsInHand[::-1],turn),scoreCorrect) # order independent
+
+        rng = random.Random(0)
+        for ii in range(2000):
+            cards = rng.sample(range(52),5)
+            self.assertEqual(scorerTable(cards[:4],cards[4]),scorer(cards[:4],cards[4]))
+
+    def test_score_batch(self):
+        '''
+        Verify batch scoring matches scoring each hand, with and without turn cards
+        '''
+        scorer = HandScorer()
+        rng = random.Random(0)
+        hands = []
+        turns = []
+        for ii in range(2000):
+            cards = rng.sample(range(52),5)
+            hands.append(cards[:4])
+            turns.append(cards[4] if ii%4 else -1) # every 4th hand is scored without a turn
+
+        scores = scorer.score_batch(np.array(hands),np.array(turns))
+        self.assertEqual(scores.shape,(2000,))
+        for hand,turn,score in zip(hands,turns,scores):
+            self.assertEqual(score,scorer(hand,turn if turn >= 0 else None))
+
+        self.assertRaises(ValueError,scorer.score_batch,np.zeros((3,5)),np.zeros(3))
+        self.assertRaises(ValueError,scorer.score_batch,np.zeros((3,4)),np.zeros(2))
+
+    def test_scorePossibleCribHands(self):
+        '''
+        Verify the per discard statistics match the full map of crib scores
+        '''
+        scorer = HandScorer()
+        hand = [6, 39, 47, 24, 13, 14] # 7 H,  A S,  9 S,  Q D,  A D,  2 D
+        result = scorer.scorePossibleCribHands(hand)
+        resultNoMap = scorer.scorePossibleCribHands(hand,includeScoreMap=False)
+        self.assertNotIn("scoreMap",resultNoMap)
+
+        scoreMap = result['scoreMap']
+        self.assertEqual(scoreMap.count(),15*1035) # 46 choose 2 crib completions per discard
+        np.testing.assert_allclose(resultNoMap['means'],scoreMap.mean(axis=(-2,-1)),rtol=1e-6)
+        np.testing.assert_array_equal(resultNoMap['mins'],scoreMap.min(axis=(-2,-1)))
+        np.testing.assert_array_equal(resultNoMap['maxs'],scoreMap.max(axis=(-2,-1)))
+
+        histograms = resultNoMap['histograms']
+        self.assertTrue((histograms.sum(axis=-1) == 1035).all())
+        # discarding the 2 aces gives a pair in the crib, so no completion scores less than 2
+        self.assertEqual(histograms[1,4,:2].sum(),0)
+        self.assertEqual(resultNoMap['mins'][1,4],2)
+
+    def test_saveLoad(self):
+        '''
+        Verify a saved cache loads memory mapped and fully warm
+        '''
+        scorer = HandScorer()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory,"scorer.cache")
+            scorer.save(path)
+
+            loaded = HandScorer(cachePath=path)
+            self.assertIsInstance(loaded.scores_pairs,np.memmap)
+            self.assertIsInstance(loaded.scoreTable,np.memmap)
+            self.assertTrue(loaded.useScoreTable)
+            np.testing.assert_array_equal(loaded.scores_pairs,scorer.scores_pairs)
+            np.testing.assert_array_equal(loaded.scoreTable,scorer.scoreTable)
+            self.assertEqual(loaded.scores_pairs[1,1,3,4,5],2)
+            self.assertEqual(loaded([0,1,2,3],4),12)
+            self.assertEqual(loaded([0,1,2,3],None),8)
+            del loaded
+
+            # wrong version can not be loaded
+            with open(path,'r+b') as fp:
+                fp.seek(8)
+                fp.write(struct.pack("<I",cacheVersion+1))
+            self.assertRaises(ValueError,HandScorer,cachePath=path)
+
+    def test_lazy(self):
+        '''
+        Verify caches are allocated on first use, the default scorer is shared and
+            importing the package does not import numpy
+        '''
+        scorer = HandScorer()
+        self.assertIsNone(scorer.scores_pairs)
+        self.assertIsNone(scorer.scores_straight)
+        scorer.scorePairs([0,1,2,3],4)
+        self.assertIsNotNone(scorer.scores_pairs)
+        self.assertIsNone(scorer.scores_straight)
+
+        self.assertIs(getDefaultScorer(),getDefaultScorer())
+        self.assertIs(Game("random","random").handScorer,getDefaultScorer())
+
+        code = "import sys, Cribbage; sys.exit('numpy' in sys.modules)"
+        self.assertEqual(subprocess.call([sys.executable,"-c",code]),0)
+
+def _referencePairs(values):
+    '''
+    The pair scoring HandScorer.scorePairs used before the histogram, for sorted face values
+    '''
+    scoreForMatchCount = [0,0,2,6,12,None]
+    score = 0
+    previousValue = -1
+    startIdx = -1
+    for idx,value in enumerate(values):
+        if value == previousValue:
+            continue
+        else:
+            matchCount = idx-startIdx
+            score += scoreForMatchCount[matchCount]
+            startIdx = idx
+            previousValue = value
+    matchCount = idx - startIdx + 1
+    score += scoreForMatchCount[matchCount]
+    return score
+
+def _referenceStraight(values):
+    '''
+    The run scoring HandScorer.scoreStraight used before the histogram, for sorted face values
+    '''
+    score = 0
+    foundRun = False
+    for runLength in range(len(values),2,-1):
+        for subset in combinations(values,runLength):
+            for idx in range(runLength-1):
+                if (subset[idx] + 1) != (subset[idx+1]):
+                    break
+            else:
+                foundRun = True
+                score += runLength
+        if foundRun:
+            break
+    return score
@@ -0,0 +1,102 @@
+from unittest import TestCase
+from Cribbage import Game
+from Cribbage.Deck import Deck
+from Cribbage.HandScorer import getDefaultScorer
+from Cribbage.PlayerRegistry import createPlayer, playerTypes
+from Cribbage.PeggingSearch import PeggingSearch, searchStateForPlayer, defaultNodeBudget
+from Cribbage.PeggingState import PeggingState
+
+class test_PeggingSearch(TestCase):
+
+    def test_bestPlay(self):
+        '''
+        Verify exact values of small end games, including points for gos and the last card
+        '''
+        search = PeggingSearch(nodeBudget=None)
+        noCards = (0,)*13
+
+        # 7 makes 15, other player goes for 1, 5 for the last card
+        face, value = search.bestPlay((5,7),noCards,0,8)
+        self.assertEqual(face,7)
+        self.assertEqual(value,4)
+        # laying the 5 the other player goes for 1 and the 7 is the last card
+        self.assertEqual(search.playValues((5,7),noCards,0,8),{5:2,7:4})
+        self.assertEqual(search.playValues((5,7),noCards,0,25),{5:None})
+        self.assertEqual(search.playValues((5,7),noCards,0,30),{})
+
+        # other player holds a 4 for sure: laying the 4 lets them pair it for 2 before the last card
+        # laying the 6 gives them 15 for 2, but the 4 then pairs theirs and takes the last card
+        pool = (0,0,0,1) + (0,)*9
+        face, value = search.bestPlay((4,6),pool,1,5)
+        self.assertEqual(face,6)
+        self.assertEqual(value,-2 + 2 + 1)
+
+        # the other player already called a go, so no more go points and they cannot answer until the 31
+        # then their 4 is the last card
+        face, value = search.bestPlay((2,3),pool,1,26,lastWasGo=True,inGo=True,oppBlocked=True)
+        self.assertIn(face,(2,3))
+        self.assertEqual(value,2 - 1)
+
+    def test_budget(self):
+        '''
+        Verify the node budget is respected and a legal card is still chosen
+        '''
+        search = PeggingSearch(nodeBudget=50)
+        pool = tuple([4]*13)
+        face, _ = search.bestPlay((1,5,10,13),pool,4,0)
+        self.assertIn(face,(1,5,10,13))
+        self.assertLessEqual(search.nodes,51)
+
+        # leading from 2,3,5,6 the 3 is best, 2 plies deep the 2 looks best
+        unseen = tuple(count - (face in (2,3,5,6)) for face, count in enumerate(pool,1))
+        face, _ = PeggingSearch(nodeBudget=None).bestPlay((2,3,5,6),unseen,4,0)
+        self.assertEqual(face,3)
+        search = PeggingSearch()
+        self.assertEqual(search.nodeBudget,defaultNodeBudget)
+        self.assertEqual(search.bestPlay((2,3,5,6),unseen,4,0)[0],face)
+        self.assertGreater(search.depthReached,2)
+
+        search = PeggingSearch(nodeBudget=None)
+        search.bestPlay((1,5,13),pool,3,20)
+        self.assertGreater(search.depthReached,0)
+        self.assertLessEqual(search.depthReached,search.maxDepth)
+
+    def test_searchStateForPlayer(self):
+        '''
+        Verify the search state is built from what the player has seen
+        '''
+        hand = [0,14,28,9] # A, 2, 3, 10
+        state = searchStateForPlayer(hand,[True,False,False,False],hand+[39,41],PeggingState.fromTable([0,13+4],2))
+        self.assertEqual(state['myFaces'],(2,3,10))
+        self.assertEqual(state['oppLeft'],3)
+        self.assertEqual(sum(state['pool']),52-7)
+        self.assertEqual(state['pool'][0],2) # A of hearts held and A of spades discarded
+        self.assertEqual((state['lastFace'],state['pairCount'],state['runLength']),(5,0,1))
+        self.assertFalse(state['oppBlocked'])
+
+        # the other player called a go and the player has laid since, so they still cannot lay
+        state = searchStateForPlayer(hand,[True,True,False,False],hand,PeggingState.fromTable([9,17,0,14],3,False,True))
+        self.assertTrue(state['oppBlocked'])
+        self.assertFalse(state['lastWasGo'])
+
+    def test_SearchPeggingPlayer(self):
+        '''
+        Verify a full game can be played with the search player
+        '''
+        game = Game("bestexpectedvalueandsearchpegging","searchpegging",verbose=False,seed=3)
+        game.playGame()
+        self.assertTrue(game.gameOver)
+
+    def test_dealtCards(self):
+        '''
+        Verify every player records the 6 cards it was dealt, including its discards
+        '''
+        for typeName in playerTypes():
+            deck = Deck(seed=5)
+            dealt = deck.cards[-6:]
+            player = createPlayer(typeName)
+            cribCards = player.deal(deck,False,getDefaultScorer())
+            self.assertEqual(sorted(player.dealtCards),sorted(dealt))
+            self.assertEqual(sorted(player.hand + cribCards),sorted(dealt))
+            player.resetHands()
+            self.assertIsNone(player.dealtCards)
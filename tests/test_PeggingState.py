@@ -0,0 +1,99 @@
+from unittest import TestCase
+from Cribbage.PeggingState import PeggingState
+from Cribbage.cribbage import cardIdToCountValue, cardIdToFaceValue
+import random
+
+def rescanScore(cardsPlayed, cardsSinceReset, cardTotal):
+    '''
+    Score the last card by scanning back through the cards since the reset
+    '''
+    score = 0
+    faceValues = [cardIdToFaceValue[card] for card in cardsPlayed][::-1]
+    pairCount = 0
+    for idx in range(cardsSinceReset-1):
+        if faceValues[idx] == faceValues[idx+1]:
+            pairCount += 1
+        else:
+            break
+    score += [0,2,6,12][pairCount]
+    runCount = 1
+    for idx in range(cardsSinceReset-1):
+        if faceValues[idx] == (faceValues[idx+1] + 1):
+            runCount += 1
+        else:
+            break
+    score += [0,0,0,3,4,5,6,7,8][runCount]
+    if cardTotal in (15,31):
+        score += 2
+    return score
+
+class test_PeggingState(TestCase):
+
+    def test_play(self):
+        '''
+        Verify incremental scoring matches rescanning the cards since the reset
+        '''
+        rng = random.Random(0)
+        for trial in range(2000):
+            state = PeggingState()
+            cardsSinceReset = 0
+            cardTotal = 0
+            for cardId in rng.sample(range(52),8):
+                if not state.canPlay(cardId):
+                    self.assertEqual(state.go(),1)
+                    self.assertEqual(state.go(),0)
+                    cardsSinceReset, cardTotal = 0, 0
+                cardsSinceReset += 1
+                cardTotal += cardIdToCountValue[cardId]
+                expected = rescanScore(state.cardsPlayed+[cardId],cardsSinceReset,cardTotal)
+                self.assertEqual(state.pointsFor(cardId),expected)
+                self.assertEqual(state.play(cardId),expected)
+                if cardTotal == 31:
+                    cardsSinceReset, cardTotal = 0, 0
+                self.assertEqual(state.cardsSinceReset,cardsSinceReset)
+                self.assertEqual(state.cardTotal,cardTotal)
+
+            rebuilt = PeggingState.fromTable(state.cardsPlayed,state.cardsSinceReset)
+            self.assertEqual((rebuilt.cardTotal,rebuilt.lastFace,rebuilt.pairCount,rebuilt.runLength),
+                             (state.cardTotal,state.lastFace,state.pairCount,state.runLength))
+
+    def test_go(self):
+        '''
+        Verify the go flags and points, the same sequence as test_Game.test__checkGo
+        '''
+        state = PeggingState.fromTable([9,10,4],3)
+        self.assertEqual(state.go(),1) # first go scores for the other player
+        self.assertTrue(state.lastPlayWasGo and state.inGoState)
+        self.assertEqual(state.play(0),0)
+        self.assertEqual((state.cardTotal,state.cardsSinceReset),(26,4))
+        self.assertFalse(state.lastPlayWasGo)
+        self.assertTrue(state.inGoState)
+        self.assertEqual(state.go(),0) # still in the go state
+        self.assertEqual(state.go(),0) # neither can lay, reset
+        self.assertEqual((state.cardTotal,state.cardsSinceReset,state.lastPlayWasGo,state.inGoState),(0,0,False,False))
+        self.assertEqual((state.lastFace,state.pairCount,state.runLength),(0,0,0))
+
+    def test_undo(self):
+        '''
+        Verify undo restores every earlier state and copies are independent
+        '''
+        def snapshot(state):
+            return (list(state.cardsPlayed),state.cardTotal,state.cardsSinceReset,state.lastFace,
+                    state.pairCount,state.runLength,state.lastPlayWasGo,state.inGoState)
+
+        rng = random.Random(1)
+        for trial in range(200):
+            state = PeggingState()
+            snapshots = []
+            for cardId in rng.sample(range(52),12):
+                snapshots.append(snapshot(state))
+                if state.canPlay(cardId):
+                    state.play(cardId)
+                else:
+                    state.go()
+            copied = state.copy()
+            final = snapshot(state)
+            while snapshots:
+                state.undo()
+                self.assertEqual(snapshot(state),snapshots.pop())
+            self.assertEqual(snapshot(copied),final)
@@ -0,0 +1,80 @@
+from unittest import TestCase
+from Cribbage import Game
+from Cribbage.PlayerRegistry import registerPlayer, unregisterPlayer, createPlayer, playerTypes, specName, clearSharedResources
+from Cribbage.Players import RandomPlayer, WinProbabilityPlayer
+import subprocess
+import sys
+
+class test_PlayerRegistry(TestCase):
+
+    def tearDown(self):
+        for typeName in ["testregistered","testlazy"]:
+            unregisterPlayer(typeName)
+        clearSharedResources()
+
+    def test_createPlayer(self):
+        '''
+        Verify every registered type can be created by name and parameters are passed through
+        '''
+        for typeName in playerTypes():
+            player = createPlayer(typeName,name="test")
+            self.assertEqual(player.name,"test")
+        self.assertEqual(type(createPlayer("ScorePegging")).__name__,"ScorePeggingPlayer")
+        self.assertIs(type(createPlayer("winprobability")),WinProbabilityPlayer) # registered by its decorator
+
+        game = Game({"type":"searchpegging","nodeBudget":17},"random")
+        self.assertEqual(game.player1.peggingSearch.nodeBudget,17)
+        self.assertEqual(game.player2.name,"Player2")
+
+        self.assertRaises(ValueError,createPlayer,"notaplayer")
+        self.assertRaises(ValueError,createPlayer,{"nodeBudget":17})
+        self.assertRaises(ValueError,Game,"random","notaplayer")
+        self.assertEqual(specName({"type":"searchpegging","nodeBudget":17}),"searchpegging(nodeBudget=17)")
+
+    def test_registerPlayer(self):
+        '''
+        Verify classes can register themselves and lazy paths are imported on first use
+        '''
+        @registerPlayer("testregistered",label="a")
+        class TestPlayer(RandomPlayer):
+            def __init__(self,name,label):
+                super().__init__(name)
+                self.label = label
+
+        self.assertIn("testregistered",playerTypes())
+        unregisterPlayer("testregistered")
+        self.assertNotIn("testregistered",playerTypes())
+        self.assertRaises(ValueError,createPlayer,"testregistered")
+        registerPlayer("testregistered",TestPlayer,label="a")
+        self.assertEqual(createPlayer("testregistered").label,"a")
+        self.assertEqual(createPlayer({"type":"testregistered","label":"b"}).label,"b")
+
+        registerPlayer("testlazy","Cribbage.Players:ScorePeggingPlayer")
+        self.assertEqual(type(createPlayer("testlazy")).__name__,"ScorePeggingPlayer")
+
+        # the strategies are imported by the first game, not by importing Game
+        code = "import sys; from Cribbage import Game; imported = 'Cribbage.Players' in sys.modules; " + \
+            "Game('random','random'); sys.exit(imported or 'Cribbage.Players' not in sys.modules)"
+        self.assertEqual(subprocess.call([sys.executable,"-c",code]),0)
+
+    def test_sharedResources(self):
+        '''
+        Verify players only share resources when the spec asks for it, one per set of parameters
+        '''
+        clearSharedResources()
+        spec = {"type":"searchpegging","shareResources":True}
+        player1 = createPlayer(spec)
+        player2 = createPlayer(spec)
+        self.assertIs(player1.peggingSearch,player2.peggingSearch)
+        self.assertIsNot(player1.peggingSearch,createPlayer({"type":"searchpegging","shareResources":True,"nodeBudget":10}).peggingSearch)
+        self.assertIsNot(player1.peggingSearch,createPlayer("searchpegging").peggingSearch)
+        clearSharedResources()
+        self.assertIsNot(player1.peggingSearch,createPlayer(spec).peggingSearch)
+
+        # only the search budgets go to the shared search, the other parameters are the player's
+        player3 = createPlayer({"type":"winprobability","shareResources":True,"winTolerance":0.01,"endgameScore":100})
+        player4 = createPlayer({"type":"winprobability","shareResources":True})
+        self.assertEqual(player3.winTolerance,0.01)
+        self.assertEqual(player3.endgameScore,100)
+        self.assertIs(player3.peggingSearch,player4.peggingSearch)
+        self.assertIsNot(player3.peggingSearch,createPlayer({"type":"winprobability","shareResources":True,"nodeBudget":10}).peggingSearch)
@@ -0,0 +1,77 @@
+from unittest import TestCase
+from Cribbage import Game
+from Cribbage.HandScorer import getDefaultScorer
+from Cribbage.SimEngine import SimEngine, shuffleCards, dealBlock
+from Cribbage.Players import BestExpectedValueAndScorePeggingPlayer, RandomPlayer, ScorePeggingPlayer
+import numpy as np
+import random
+
+class test_SimEngine(TestCase):
+
+    def test_shuffleCards(self):
+        '''
+        Verify the shuffle matches random.Random.shuffle and leaves the generator in the same state
+        '''
+        for count in [None,0,13,52]:
+            for seed in range(100):
+                rng1 = random.Random(seed)
+                rng2 = random.Random(seed)
+                cards1 = list(range(52))
+                cards2 = list(range(52))
+                rng1.shuffle(cards1)
+                shuffleCards(cards2,rng2,count)
+                shuffled = 52 if count is None else count
+                self.assertEqual(cards1[52-shuffled:],cards2[52-shuffled:])
+                self.assertEqual(sorted(cards2),list(range(52)))
+                self.assertEqual(rng1.random(),rng2.random())
+
+    def test_scoreHand(self):
+        '''
+        Verify hands are scored the same as the HandScorer
+        '''
+        scorer = getDefaultScorer()
+        engine = SimEngine(scorer=scorer)
+        rng = random.Random(0)
+        for trial in range(20000):
+            cards = rng.sample(range(52),5)
+            self.assertEqual(engine.scoreHand(cards[:4],cards[4]),scorer(cards[:4],cards[4]))
+
+    def test_dealBlock(self):
+        '''
+        Verify every deal is 13 distinct cards and every card is dealt in every position
+        '''
+        dealt = dealBlock(np.random.default_rng(0),2000)
+        self.assertEqual(dealt.shape,(2000,13))
+        self.assertTrue((np.sort(dealt,axis=1)[:,1:] != np.sort(dealt,axis=1)[:,:-1]).all())
+        for column in range(13):
+            self.assertEqual(len(np.unique(dealt[:,column])),52)
+
+    def test_playGame(self):
+        '''
+        Verify seeded exact games end with the same scores as Game
+        '''
+        engine = SimEngine(exact=True)
+        for seed in range(300):
+            game = Game("random","random",verbose=False,seed=seed)
+            game.playGame()
+            self.assertEqual(engine.playGame(seed=seed),[game.player1Score,game.player2Score])
+
+        engine = SimEngine(BestExpectedValueAndScorePeggingPlayer("Player1"),ScorePeggingPlayer("Player2"),exact=True)
+        for seed in range(20):
+            game = Game("bestexpectedvalueandscorepegging","scorepegging",verbose=False,seed=seed)
+            game.playGame()
+            self.assertEqual(engine.playGame(rng=random.Random(seed)),[game.player1Score,game.player2Score])
+
+    def test_blockDeals(self):
+        '''
+        Verify the built in players play the same games as RandomPlayer objects with the same deals
+        '''
+        builtIn = SimEngine(seed=0)
+        players = SimEngine(RandomPlayer("Player1"),RandomPlayer("Player2"),seed=0)
+        mixed = SimEngine(None,RandomPlayer("Player2"),seed=0)
+        for game in range(200):
+            scores = builtIn.playGame()
+            self.assertGreaterEqual(max(scores),121)
+            self.assertEqual(players.playGame(),scores)
+            self.assertEqual(mixed.playGame(),scores)
+        self.assertEqual(builtIn.playGame(seed=5),builtIn.playGame(rng=np.random.default_rng(5)))
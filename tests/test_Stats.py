@@ -0,0 +1,62 @@
+from unittest import TestCase
+from Cribbage import Game, HandScorer
+from Cribbage.Stats import Stats
+
+class test_Stats(TestCase):
+
+    def test_counters(self):
+        '''
+        Verify hits, misses, times and merging
+        '''
+        stats = Stats()
+        stats.hit("a")
+        stats.hit("a")
+        stats.miss("a")
+        stats.addTime("t",0.5)
+        with stats.timer("t"):
+            pass
+        self.assertEqual(stats.caches["a"],[2,1])
+        self.assertAlmostEqual(stats.hitRate("a"),2/3)
+        self.assertIsNone(stats.hitRate("b"))
+        self.assertEqual(stats.timers["t"][0],2)
+        other = Stats()
+        other.merge(stats)
+        other.merge(stats)
+        self.assertEqual(other.caches["a"],[4,2])
+        self.assertEqual(other.asDict()["timers"]["t"]["calls"],4)
+        stats.reset()
+        self.assertEqual(stats.asDict(),{"caches":{},"timers":{}})
+
+    def test_scorer(self):
+        '''
+        Verify the scorer counts a miss then a hit for each cache and still scores the same
+        '''
+        stats = Stats()
+        scorer = HandScorer(stats=stats)
+        plain = HandScorer()
+        hand, turnCard = [0,1,2,3], 17
+        self.assertEqual(scorer(hand,turnCard),plain(hand,turnCard))
+        self.assertEqual(scorer(hand,turnCard),plain(hand,turnCard))
+        for name in ["scorer.scores_pairs","scorer.scores_straight"]:
+            self.assertEqual(stats.caches[name],[1,1])
+        for name in ["scorer.15s","scorer.pairs","scorer.flush","scorer.straight","scorer.knobs"]:
+            self.assertEqual(stats.timers[name][0],2)
+        scorer.possibleHandScores([0,1,2,3,4,5])
+        scorer.possibleHandScores([13,14,15,16,17,18]) # same deal in another suite
+        self.assertEqual(stats.caches["scorer.canonicalHandScores"],[1,1])
+        self.assertGreater(stats.timers["scorer.score_batch"][0],0)
+
+    def test_game(self):
+        '''
+        Verify the phases of every hand are timed and the game plays the same
+        '''
+        stats = Stats()
+        game = Game("bestexpectedvalueandscorepegging","random",verbose=False,seed=3,stats=stats)
+        game.playGame()
+        plain = Game("bestexpectedvalueandscorepegging","random",verbose=False,seed=3)
+        plain.playGame()
+        self.assertEqual([game.player1Score,game.player2Score],[plain.player1Score,plain.player2Score])
+        self.assertEqual(stats.timers["game.discard"][0],2*game.handNumber)
+        self.assertGreaterEqual(stats.timers["game.deal"][0],game.handNumber-1)
+        self.assertEqual(stats.timers["game.counting"][0],game.handNumber-1)
+        self.assertGreaterEqual(stats.timers["game.playCard"][0],8*(game.handNumber-1))
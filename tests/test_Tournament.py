@@ -0,0 +1,48 @@
+from unittest import TestCase
+from Cribbage.Tournament import Tournament, wilsonInterval
+
+class test_Tournament(TestCase):
+
+    def test_reproducible(self):
+        '''
+        Verify the same seed gives the same games no matter how the games are split up
+        '''
+        serial = Tournament("random","bestminimalscore",6,processes=1,seed=3,chunkSize=4).run()
+        parallel = Tournament("random","bestminimalscore",6,processes=2,seed=3,chunkSize=1).run()
+        self.assertEqual(serial.scores.tolist(),parallel.scores.tolist())
+
+        other = Tournament("random","bestminimalscore",6,processes=1,seed=4).run()
+        self.assertNotEqual(serial.scores.tolist(),other.scores.tolist())
+
+    def test_result(self):
+        '''
+        Verify the aggregate statistics
+        '''
+        result = Tournament("random","random",10,processes=1,seed=0).run()
+        self.assertEqual(result.games,10)
+        self.assertEqual(result.player1Wins + result.player2Wins,10)
+        self.assertTrue((result.scores.max(axis=1) >= 121).all())
+        self.assertEqual(result.meanSpread,(result.scores[:,0]-result.scores[:,1]).mean())
+        self.assertTrue(result.player1WinRateCI[0] <= result.player1WinRate <= result.player1WinRateCI[1])
+        self.assertTrue(result.meanSpreadCI[0] <= result.meanSpread <= result.meanSpreadCI[1])
+
+    def test_wilsonInterval(self):
+        low, high = wilsonInterval(50,100)
+        self.assertAlmostEqual(low,.4038,places=4)
+        self.assertAlmostEqual(high,.5962,places=4)
+
+    def test_duplicate(self):
+        '''
+        Verify duplicate mode plays 2 games per seed and reports the paired differences
+        '''
+        result = Tournament("bestminimalscore","random",4,processes=1,seed=1,duplicate=True).run()
+        self.assertEqual(result.games,8)
+        self.assertEqual(result.winDifferences.shape,(4,))
+        self.assertEqual(result.meanSpreadDifference,result.spreadDifferences.mean())
+        # player1 is always bestminimalscore, so the spread over both games of a pair sums to the paired difference
+        spreads = result.spreads.reshape(2,4)
+        self.assertEqual(result.spreadDifferences.tolist(),(spreads[0]+spreads[1]).tolist())
+
+        result = Tournament("random","random",3,processes=1,seed=1,duplicate=True).run()
+        self.assertEqual(result.winDifferences.tolist(),[0,0,0])
+        self.assertEqual(result.player1Wins,3)
@@ -0,0 +1,123 @@
+from unittest import TestCase
+from Cribbage import Game, HandScorer
+from Cribbage.DiscardOptimizer import getDiscardOptimizer
+from Cribbage.GameLog import GameLogWriter, readGameLog
+from Cribbage.PeggingSearch import PeggingSearch, searchStateForPlayer
+from Cribbage.PeggingState import PeggingState
+from Cribbage.Players import WinProbabilityPlayer
+from Cribbage.WinProbability import (handDistributionsFromRecords, buildWinProbabilityTables, saveWinProbabilityTables,
+                                        loadWinProbabilityTable, getWinProbabilityTable)
+import numpy as np
+import os
+import tempfile
+
+class _OpponentTable:
+    '''
+    Win table that favours the opponent's points, so a choice it changes is easy to spot
+    '''
+    def winProbabilityAfterPegging(self, myScore, oppScore, isDealer):
+        return (oppScore - myScore + 200)/400.
+
+class test_WinProbability(TestCase):
+
+    def test_shippedTable(self):
+        '''
+        Verify the shipped tables are probabilities that grow with the player's score
+        '''
+        table = getWinProbabilityTable()
+        for values in [table.dealerWins,table.afterPegging]:
+            self.assertEqual(values.shape,(121,121))
+            self.assertTrue(((values >= 0) & (values <= 1)).all())
+            self.assertTrue((np.diff(values,axis=0) >= -1e-4).all())
+            self.assertTrue((np.diff(values,axis=1) <= 1e-4).all())
+
+        # the dealer counts first, from 120 after the pegging only a hand of 0 can lose
+        self.assertTrue((table.afterPegging[120,:] >= 1. - table.distributions["dealerHand"][0] - 1e-4).all())
+        self.assertEqual(table.afterPegging[120,0],1.)
+        self.assertGreater(table.winProbability(0,0,True),0.5)
+        self.assertAlmostEqual(table.winProbability(0,0,True)+table.winProbability(0,0,False),1.,places=4)
+        self.assertEqual(table.winProbability(121,119,False),1.)
+        self.assertEqual(table.winProbabilityAfterPegging(100,125,True),0.)
+
+    def test_buildFromLog(self):
+        '''
+        Verify tables built from a game log are saved and loaded and the discards
+            are valued the same way as the tables
+        '''
+        with tempfile.TemporaryDirectory() as tmpDir:
+            logPath = os.path.join(tmpDir,"games.log")
+            with GameLogWriter(logPath) as writer:
+                for seed in range(20):
+                    Game("bestexpectedvalueandscorepegging","random",verbose=False,seed=seed,recorder=writer).playGame()
+            records = readGameLog(logPath)
+            distributions = handDistributionsFromRecords(records)
+            del records
+            for name in ["pegging","dealerHand","poneHand","crib"]:
+                self.assertAlmostEqual(distributions[name].sum(),1.)
+            self.assertEqual(distributions["pegging"][0,0],0.) # there is always a point for the last card
+
+            dealerWins, afterPegging = buildWinProbabilityTables(distributions)
+            path = os.path.join(tmpDir,"winProbability.npz")
+            saveWinProbabilityTables(path,dealerWins,afterPegging,distributions)
+            table = loadWinProbabilityTable(path)
+        np.testing.assert_allclose(table.dealerWins,dealerWins,atol=1e-4)
+        np.testing.assert_allclose(table.afterPegging,afterPegging,atol=1e-4)
+
+        # a discard with the measured hand distribution and an average crib is the table entry
+        crib = table.distributions["crib"]
+        for isDealer, name in [(True,"dealerHand"),(False,"poneHand")]:
+            counts = np.round(table.distributions[name]*100000).astype(np.int64)
+            handScores = np.repeat(np.arange(counts.shape[0]),counts)[None,:]
+            for myScore, oppScore in [(0,0),(60,75),(110,115),(119,100)]:
+                wins = table.discardWinProbabilities(handScores,[crib @ np.arange(crib.shape[0])],myScore,oppScore,isDealer)
+                self.assertAlmostEqual(wins[0],table.winProbability(myScore,oppScore,isDealer),places=3)
+
+    def test_discardWinProbabilities(self):
+        '''
+        Verify better discards win more often and the scores decide close to the end
+        '''
+        scorer = HandScorer()
+        table = getWinProbabilityTable()
+        hand = [4,17,10,11,12,0] # 5 H, 5 D, J H, Q H, K H, A H
+        handValues, cribValues = getDiscardOptimizer(scorer).expectedValues(hand)
+        handScores, _ = scorer.possibleHandScores(hand)
+        wins = table.discardWinProbabilities(handScores,cribValues,0,0,True)
+        self.assertEqual(int(np.argmax(wins)),int(np.argmax(handValues+cribValues)))
+
+        # 1 point short of winning, against a dealer who cannot win this hand
+        self.assertTrue((table.discardWinProbabilities(handScores,cribValues,120,0,False) > 0.99).all())
+        self.assertTrue((table.discardWinProbabilities(handScores,cribValues,0,120,True) < 0.01).all())
+
+    def test_WinProbabilityPlayer(self):
+        '''
+        Verify the player plays whole games and is passed the scores
+        '''
+        scorer = HandScorer()
+        for seed in range(3):
+            game = Game("winprobability","bestexpectedvalueandscorepegging",scorer=scorer,verbose=False,seed=seed)
+            game.playGame()
+            self.assertTrue(max(game.player1Score,game.player2Score) >= 121)
+            self.assertLessEqual(game.player1.myScore,game.player1Score)
+            self.assertLessEqual(game.player1.opponentScore,game.player2Score)
+            self.assertGreater(game.player1.myScore + game.player1.opponentScore,0)
+
+    def test_WinProbabilityPlayerPegging(self):
+        '''
+        Verify the search chooses the card until either player has endgameScore points,
+            then the table replaces it with the card the table values most
+        '''
+        hand = [0,4,9,12] # A, 5, 10, K
+        peggingState = PeggingState.fromTable([],0)
+        state = searchStateForPlayer(hand,[False]*4,hand+[20,30],peggingState)
+        values = PeggingSearch().playValues(**state)
+        searchFace = max(values,key=values.get)
+        tableFace = min(values,key=values.get)
+        self.assertNotEqual(searchFace,tableFace)
+
+        for myScore, oppScore, expectedFace in [(0,0,searchFace),(94,50,searchFace),(50,95,tableFace)]:
+            player = WinProbabilityPlayer("test",winProbabilityTable=_OpponentTable())
+            player.hand = list(hand)
+            player.dealtCards = hand + [20,30]
+            player.updateScores(myScore,oppScore)
+            cardId = player.playCard([],0,0,peggingState=peggingState)
+            self.assertEqual(hand.index(cardId),[1,5,10,13].index(expectedFace))
@@ -0,0 +1,72 @@
+'''
+Run the benchmark suite in Cribbage.Benchmark and optionally compare it against a baseline
+
+Usage:
+    PYTHONPATH=. python tools/benchmark.py [--output results.json] [--baseline baseline.json]
+        [--trials 5] [--warmup 1] [--scale 1.0] [--filter scorer --filter game.random]
+        [--tolerance 0.1]
+
+    * --output writes the results as JSON, save one as the baseline for later runs
+    * --baseline prints the change in time per operation of every benchmark and exits
+        with status 1 if any is slower than the baseline by more than the tolerance
+    * exits with status 1 if any benchmark with a time limit, such as the budget.* games,
+        is over its limit, or if sim.random.vs.random is not 10 times faster than
+        game.random.vs.random
+'''
+
+from Cribbage.Benchmark import standardBenchmarks, runBenchmarks, compareResults, checkLimits, checkSpeedups
+
+import argparse
+import json
+import sys
+
+def printResult(name, result):
+    print("{:80s} {:12.3f} ms/op  (stdev {:.1f}%)".format(name,
+                                                        result["perOperation"]*1e3,
+                                                        100*result["stdev"]/result["median"] if result["median"] > 0 else 0.))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the scorer, the players and whole games")
+    parser.add_argument("--output",help="write the results as JSON to this path")
+    parser.add_argument("--baseline",help="JSON results to compare against")
+    parser.add_argument("--trials",type=int,default=5,help="timed trials per benchmark")
+    parser.add_argument("--warmup",type=int,default=1,help="untimed trials before the timed ones")
+    parser.add_argument("--scale",type=float,default=1.,help="multiplies the work in every benchmark")
+    parser.add_argument("--seed",type=int,default=0,help="seed for the hands and games")
+    parser.add_argument("--filter",action="append",default=[],help="only run benchmarks with a name containing this")
+    parser.add_argument("--tolerance",type=float,default=0.1,help="fraction slower than the baseline that is a regression")
+    args = parser.parse_args()
+
+    benchmarks = standardBenchmarks(scale=args.scale,seed=args.seed)
+    if len(args.filter) > 0:
+        benchmarks = [benchmark for benchmark in benchmarks if any(text in benchmark.name for text in args.filter)]
+
+    results = runBenchmarks(benchmarks,trials=args.trials,warmup=args.warmup,progress=printResult)
+
+    if args.output is not None:
+        with open(args.output,'w') as fp:
+            json.dump(results,fp,indent=2)
+        print("Saved results to {}".format(args.output))
+
+    overLimit = checkLimits(results)
+    for name, perOperation, limit in overLimit:
+        print("{:80s} {:12.3f} ms/op  over the limit of {:.3f} ms/op".format(name,perOperation*1e3,limit*1e3))
+    tooSlow = checkSpeedups(results)
+    for name, reference, speedup, required in tooSlow:
+        print("{:80s} {:8.2f}x faster than {}, needs {:.1f}x".format(name,speedup,reference,required))
+    failed = len(overLimit) > 0 or len(tooSlow) > 0
+
+    if args.baseline is not None:
+        with open(args.baseline,'r') as fp:
+            baseline = json.load(fp)
+        comparison = compareResults(results,baseline,tolerance=args.tolerance)
+        print("\nCompared to {}".format(args.baseline))
+        for name, baselineTime, currentTime, ratio, status in comparison:
+            if ratio is None:
+                print("{:80s} {}".format(name,status))
+            else:
+                print("{:80s} {:8.2f}x {}".format(name,ratio,status))
+        failed = failed or any(item[-1] == "regression" for item in comparison)
+
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,23 @@
+'''
+Build the expected crib points table used by Cribbage.CribEquity and save it
+    to the package data directory
+
+Usage:
+    PYTHONPATH=. python tools/buildCribEquityTable.py [output path]
+'''
+
+from Cribbage import HandScorer
+from Cribbage.CribEquity import buildCribEquityTable, cribEquityPath
+
+import numpy as np
+import sys
+import time
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else cribEquityPath
+
+    startTime = time.time()
+    table = buildCribEquityTable(HandScorer())
+    np.save(path,table)
+    print("Saved crib equity table to {} in {:.1f}s".format(path,time.time()-startTime))
+    print("Dealer, off suite:\n{}".format(np.round(table[1,:,:,0],2)))
@@ -0,0 +1,54 @@
+'''
+Simulate games, measure the points scored in each phase of a hand and build the win
+    probability tables used by Cribbage.WinProbability, saved to the package data directory
+
+Usage:
+    PYTHONPATH=. python tools/buildWinProbabilityTable.py [--games 20000] [--player bestexpectedvalueandscorepegging]
+        [--seed 0] [--log games.log] [--output path]
+
+    * both seats are played by --player, the tables describe games between players of that strength
+    * --log keeps the recorded hands, otherwise they are written to a temporary file
+'''
+
+from Cribbage.Game import Game
+from Cribbage.GameLog import GameLogWriter, readGameLog
+from Cribbage.HandScorer import HandScorer
+from Cribbage.WinProbability import (handDistributionsFromRecords, buildWinProbabilityTables,
+                                        saveWinProbabilityTables, winProbabilityPath)
+
+import argparse
+import numpy as np
+import os
+import tempfile
+import time
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the win probability tables from simulated games")
+    parser.add_argument("--games",type=int,default=20000,help="number of games to simulate")
+    parser.add_argument("--player",default="bestexpectedvalueandscorepegging",help="player type in both seats")
+    parser.add_argument("--seed",type=int,default=0,help="seed of the first game")
+    parser.add_argument("--log",help="write the recorded hands to this path and keep it")
+    parser.add_argument("--output",default=winProbabilityPath,help="path of the tables")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        logPath = args.log if args.log is not None else os.path.join(tmpDir,"games.log")
+
+        startTime = time.time()
+        scorer = HandScorer()
+        with GameLogWriter(logPath) as writer:
+            for idx in range(args.games):
+                Game(args.player,args.player,scorer=scorer,verbose=False,seed=args.seed+idx,recorder=writer).playGame()
+                if (idx + 1) % 1000 == 0:
+                    print("Played {} games in {:.1f}s".format(idx+1,time.time()-startTime))
+
+        records = readGameLog(logPath)
+        distributions = handDistributionsFromRecords(records)
+        print("Measured {} hands".format(int((records['gameOver'] == 0).sum())))
+        del records
+
+    dealerWins, afterPegging = buildWinProbabilityTables(distributions)
+    saveWinProbabilityTables(args.output,dealerWins,afterPegging,distributions)
+    print("Saved win probability tables to {} in {:.1f}s".format(args.output,time.time()-startTime))
+    print("Dealer wins from 0 to 0: {:.3f}".format(dealerWins[0,0]))
+    print("Dealer wins, scores 0 to 120 by 20:\n{}".format(np.round(dealerWins[::20,::20],2)))
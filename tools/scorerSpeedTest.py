@@ -34,10 +34,10 @@ generateData = False
 
 deck = Deck()
 
-modes = {"No Cache": {"useCacheLarge":False,"useCache15":False,"useCachePair":False,"useCacheStraight":False},
-        "All Caches": {"useCacheLarge":True,"useCache15":True,"useCachePair":True,"useCacheStraight":True},
-        "No Large": {"useCacheLarge":False,"useCache15":True,"useCachePair":True,"useCacheStraight":True},
-        "Only Large": {"useCacheLarge":True,"useCache15":False,"useCachePair":False,"useCacheStraight":False}}
+modes = {"No Cache": {"useCacheLarge":False,"useCachePair":False,"useCacheStraight":False},
+        "All Caches": {"useCacheLarge":True,"useCachePair":True,"useCacheStraight":True},
+        "No Large": {"useCacheLarge":False,"useCachePair":True,"useCacheStraight":True},
+        "Only Large": {"useCacheLarge":True,"useCachePair":False,"useCacheStraight":False}}
 
 if generateData:
     for mode,props in modes.items():